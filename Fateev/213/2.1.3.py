@@ -11,6 +11,8 @@ import pdfkit
 import doctest
 import datetime
 
+html_tag = re.compile(r"<[^>]+>")
+
 experienceToRus = {
     "noExperience": "Нет опыта",
     "between1And3": "От 1 года до 3 лет",
@@ -102,6 +104,8 @@ class Salary:
         salary_currency (str): Валюта оклада
     """
 
+    __slots__ = ("salary_from", "salary_to", "salary_gross", "salary_currency")
+
     def __init__(self, salary_from: str, salary_to: str, salary_gross: str, salary_currency: str):
         """Инициализирует объект Salary, выполняет конвертацию для полей.
 
@@ -161,6 +165,9 @@ class Vacancy:
         published_at (str): Дата публикации вакансии
     """
 
+    __slots__ = ("name", "_description_raw", "_description", "_key_skills_raw", "_key_skills", "experience_id",
+                 "premium", "employer_name", "salary", "area_name", "published_at")
+
     def __init__(self, name: str, description: str, key_skills: str, experience_id: str,
                  premium: str, employer_name: str, salary: Salary, area_name: str, published_at: str):
         """Инициализирует объект Vacancy, выполняет конвертацию дляполей.
@@ -182,8 +189,10 @@ class Vacancy:
         'xyz'
         """
         self.name = name
-        self.description = TextEditor.beautifulStr(description)
-        self.key_skills = list(key_skills.split("\n"))
+        self._description_raw = description
+        self._description = None
+        self._key_skills_raw = key_skills
+        self._key_skills = None
         self.experience_id = experience_id
         self.premium = premium
         self.employer_name = employer_name
@@ -191,6 +200,28 @@ class Vacancy:
         self.area_name = area_name
         self.published_at = published_at
 
+    @property
+    def description(self):
+        """Описание вакансии без HTML тегов, очищается при первом обращении
+
+            Returns:
+                str: Описание вакансии
+        """
+        if self._description is None:
+            self._description = TextEditor.beautifulStr(self._description_raw)
+        return self._description
+
+    @property
+    def key_skills(self):
+        """Ключевые навыки вакансии, разделяются при первом обращении
+
+            Returns:
+                list: Ключевые навыки
+        """
+        if self._key_skills is None:
+            self._key_skills = list(self._key_skills_raw.split("\n"))
+        return self._key_skills
+
     def date_to_string(self):
         """Переводит аттрибут published_at класса Vacancy в формат dd.mm.yyyy
 
@@ -217,7 +248,7 @@ class Vacancy:
         >>> Vacancy("x", "<br><b>x</b>yz</br>", 'z', "noExperience", "true", "x", Salary("100", "2000", "true", "RUR"), "x", "2012-10-03T17:12:09+0300").date_get_year()
         2012
         """
-        return int(self.date_to_string().split(".")[-1])
+        return int(self.published_at[0:4])
 
     def premium_to_string(self):
         """Переводит аттрибут premium класса Vacancy в строку на Русском языке
@@ -295,7 +326,7 @@ class TextEditor:
             Returns:
                 str: Текст с удаленными HTML тегами
         """
-        return ' '.join(re.sub(r"<[^>]+>", '', string).split()).replace("  ", " ").replace(" ", " ")
+        return ' '.join(html_tag.sub('', string).split()).replace("  ", " ").replace(" ", " ")
 
     def line_trim(string: str):
         """Обрезает str до 100 символов
@@ -1,42 +1,56 @@
 import csv
+from collections import OrderedDict
 
-def save_as_csv(file_name, fields, lines):
-    """Сохраняет файл в виде csv файла 
+def open_year_file(file_name, fields, created):
+    """Открывает файл года для дозаписи, при первом открытии создает его и пишет заголовок
 
         Args:
             file_name (str): Название файла
-            fields (str): Поля csv файла
-            lines (str): Вакансии через \n
+            fields (list): Поля csv файла
+            created (set): Уже созданные файлы
+
+        Returns:
+            file, csv.writer: Открытый файл и writer для него
     """
-    print("Saving", file_name)
-    with open("csv/"+file_name, 'w', encoding="utf-8-sig") as f_out:
-        f_out.write(','.join(fields)+ "\n")
-        f_out.writelines(lines[:-1])
-        f_out.close()
+    if file_name not in created:
+        print("Saving", file_name)
+        created.add(file_name)
+        f_out = open("csv/" + file_name, 'w', encoding="utf-8-sig", newline="", buffering=1024 * 1024)
+        writer = csv.writer(f_out, lineterminator="\n")
+        writer.writerow(fields)
+    else:
+        f_out = open("csv/" + file_name, 'a', encoding="utf-8-sig", newline="", buffering=1024 * 1024)
+        writer = csv.writer(f_out, lineterminator="\n")
+    return f_out, writer
 
-def сsv_chuncker(file_name):
-    """Разделяет вакансии по годам и сохраняет их
+def сsv_chuncker(file_name, max_open_files=64):
+    """Потоково разделяет вакансии по годам и сохраняет их.
+    Строки сразу пишутся в буферизованные файлы годов, открыто не более max_open_files файлов
 
         Args:
             file_name (str): Название файла для разделения
+            max_open_files (int): Максимальное число одновременно открытых файлов
     """
     fields = []
-    csvs = {}
-    with open(ﬁle_name, encoding="UTF-8-sig") as File:
+    created = set()
+    opened = OrderedDict()
+    with open(ﬁle_name, encoding="UTF-8-sig", newline="") as File:
         reader = csv.reader(File, delimiter=',')
         for row in reader:
             if (fields == []):
                 fields = row
+                date_index = fields.index('published_at')
             elif (len(fields) == len(row) and not ("" in row)):
-                year = row[fields.index('published_at')].split("-")[0]
-                if year not in csvs:
-                    csvs[year] = []
-                csvs[year].append(row)
-    for year in csvs:
-        year_str = ""
-        for row in csvs[year]:
-            year_str += ','.join(row) + "\n"
-        save_as_csv("vacancies_" + year + ".csv", fields, year_str)
+                year_file = "vacancies_" + row[date_index].split("-")[0] + ".csv"
+                if year_file in opened:
+                    opened.move_to_end(year_file)
+                else:
+                    if len(opened) >= max_open_files:
+                        opened.popitem(last=False)[1][0].close()
+                    opened[year_file] = open_year_file(year_file, fields, created)
+                opened[year_file][1].writerow(row)
+    for f_out, _ in opened.values():
+        f_out.close()
 
 file_name = input("Введите название файла: ")
-сsv_chuncker(file_name)
\ No newline at end of file
+сsv_chuncker(file_name)
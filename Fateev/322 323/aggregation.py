@@ -0,0 +1,40 @@
+import numpy as np
+
+
+def encode(values):
+    """Кодирует значения столбца целыми числами в порядке их первого появления
+
+        Args:
+            values (np.ndarray): Значения столбца
+
+        Returns:
+            np.ndarray, np.ndarray: Уникальные значения и код каждого значения столбца
+
+    >>> uniques, codes = encode(np.array(["Москва", "Казань", "Москва"], dtype=object))
+    >>> uniques.tolist(), codes.tolist()
+    (['Москва', 'Казань'], [0, 1, 0])
+    """
+    uniques, first, codes = np.unique(values, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return uniques[order], rank[codes.ravel()]
+
+
+def group_sum(codes, groups_count, values):
+    """Считает сумму и количество значений для каждой группы
+
+        Args:
+            codes (np.ndarray): Код группы для каждого значения
+            groups_count (int): Количество групп
+            values (np.ndarray): Значения
+
+        Returns:
+            np.ndarray, np.ndarray: Суммы и количества по группам
+
+    >>> sums, counts = group_sum(np.array([0, 1, 0]), 2, np.array([1.0, 2.0, 3.0]))
+    >>> sums.tolist(), counts.tolist()
+    ([4.0, 2.0], [2, 1])
+    """
+    return (np.bincount(codes, weights=values, minlength=groups_count),
+            np.bincount(codes, minlength=groups_count))
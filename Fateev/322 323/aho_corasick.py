@@ -0,0 +1,107 @@
+from collections import deque
+import numpy as np
+
+
+class AhoCorasick:
+    """Класс автомата Ахо-Корасик для поиска сразу нескольких подстрок за один проход по строке.
+    Для каждого состояния хранится битовая маска найденных ключевых слов, поэтому
+    результат поиска в строке - это одно целое число
+
+    Attributes:
+        keywords (list): Ключевые слова
+        casefold (bool): Искать без учета регистра
+    """
+    def __init__(self, keywords : list, casefold : bool = False):
+        """Инициализирует объект AhoCorasick и строит автомат
+
+            Args:
+                keywords (list): Ключевые слова
+                casefold (bool): Искать без учета регистра
+        """
+        self.keywords = list(keywords)
+        self.casefold = casefold
+        self.__goto = [{}]
+        self.__fail = [0]
+        self.__output = [0]
+        for number, keyword in enumerate(self.keywords):
+            self.add_keyword(keyword.casefold() if casefold else keyword, number)
+        self.build_fail()
+
+    def add_keyword(self, keyword : str, number : int):
+        """Добавляет ключевое слово в бор
+
+            Args:
+                keyword (str): Ключевое слово
+                number (int): Номер ключевого слова
+        """
+        state = 0
+        for char in keyword:
+            if char not in self.__goto[state]:
+                self.__goto.append({})
+                self.__fail.append(0)
+                self.__output.append(0)
+                self.__goto[state][char] = len(self.__goto) - 1
+            state = self.__goto[state][char]
+        self.__output[state] |= 1 << number
+
+    def build_fail(self):
+        """Строит суффиксные ссылки обходом бора в ширину и объединяет маски найденных слов
+        """
+        queue = deque(self.__goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.__goto[state].items():
+                queue.append(next_state)
+                fail = self.__fail[state]
+                while fail != 0 and char not in self.__goto[fail]:
+                    fail = self.__fail[fail]
+                fail = self.__goto[fail].get(char, 0)
+                self.__fail[next_state] = fail if fail != next_state else 0
+                self.__output[next_state] |= self.__output[self.__fail[next_state]]
+
+    def find(self, text : str):
+        """Находит все ключевые слова в строке за один проход
+
+            Args:
+                text (str): Строка для поиска
+
+            Returns:
+                int: Битовая маска найденных ключевых слов
+
+        >>> automaton = AhoCorasick(["he", "she", "his", "hers"])
+        >>> bin(automaton.find("ushers"))
+        '0b1011'
+        >>> AhoCorasick(["Программист"], casefold=True).find("Ведущий ПРОГРАММИСТ")
+        1
+        """
+        goto = self.__goto
+        fail = self.__fail
+        output = self.__output
+        state = 0
+        found = 0
+        for char in text.casefold() if self.casefold else text:
+            while state != 0 and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found |= output[state]
+        return found
+
+    def match_matrix(self, texts : list):
+        """Находит ключевые слова во всех строках
+
+            Args:
+                texts (list): Строки для поиска
+
+            Returns:
+                np.ndarray: Булева матрица, строка i и столбец j - найдено ли слово j в строке i
+
+        >>> AhoCorasick(["a", "b"]).match_matrix(["ab", "b", "c"]).tolist()
+        [[True, True], [False, True], [False, False]]
+        """
+        masks = [self.find(text) for text in texts]
+        matrix = np.zeros((len(masks), len(self.keywords)), dtype=bool)
+        for start in range(0, len(self.keywords), 63):
+            bits = np.arange(min(63, len(self.keywords) - start), dtype=np.uint64)
+            chunk = np.array([(mask >> start) & ((1 << 63) - 1) for mask in masks], dtype=np.uint64)
+            matrix[:, start:start + len(bits)] = (chunk[:, None] >> bits) & np.uint64(1) == 1
+        return matrix
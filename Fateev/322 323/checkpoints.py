@@ -0,0 +1,176 @@
+import csv
+import hashlib
+import json
+import mmap
+import os
+import time
+from vacancy_columns import ColumnsReader, VacancyColumns, count_quotes, find_line_end, read_range
+from ingest import open_reader
+
+checkpoint_version = 2
+check_size = 64 * 1024
+
+
+def hash_range(data, start : int, end : int):
+    """Считает хэш диапазона байт файла
+
+        Args:
+            data (mmap.mmap): Содержимое файла
+            start (int): Начало диапазона
+            end (int): Конец диапазона
+
+        Returns:
+            str: Хэш диапазона
+
+    >>> hash_range(b"abcdef", 0, 3) == hash_range(b"abcxyz", 0, 3)
+    True
+    """
+    return hashlib.blake2b(data[start:end], digest_size=16).hexdigest()
+
+
+def find_last_line_end(data, start : int, at_eof : bool = False):
+    """Находит конец последней полной строки CSV после start, чтобы не разбирать недописанную строку
+
+        Args:
+            data (mmap.mmap): Содержимое файла
+            start (int): Начало первой непрочитанной строки
+            at_eof (bool): Считать конец файла концом строки, если все кавычки закрыты.
+                Используется, когда запись в файл закончена и последняя строка без перевода строки
+
+        Returns:
+            int: Позиция сразу после последней полной строки
+
+    >>> find_last_line_end(b'h\\n1\\n"2\\n', 2)
+    4
+    >>> find_last_line_end(b'h\\n1\\n2', 2), find_last_line_end(b'h\\n1\\n2', 2, at_eof=True)
+    (4, 5)
+    """
+    if at_eof and len(data) > start and count_quotes(data, start, len(data)) % 2 == 0:
+        return len(data)
+    end = data.rfind(b"\n", start) + 1
+    while end > start and count_quotes(data, start, end) % 2 == 1:
+        end = data.rfind(b"\n", start, end - 1) + 1
+    return max(end, start)
+
+
+class Checkpoints:
+    """Класс для хранения контрольных точек обработки файлов, которые дописываются новыми вакансиями.
+    Контрольная точка хранит смещение в байтах до которого файл уже прочитан, настройки чтения файла
+    и накопленную статистику, поэтому при следующем запуске разбираются только новые строки.
+    Последняя строка без перевода строки читается, только если файл не изменялся settle_seconds секунд,
+    иначе она может быть еще не дописана
+
+    Attributes:
+        folder (str): Папка для файлов контрольных точек
+        settle_seconds (float): Через сколько секунд после последнего изменения запись в файл считается законченной
+    """
+    def __init__(self, folder : str = "checkpoints", settle_seconds : float = 1.0):
+        """Инициализирует объект Checkpoints
+
+            Args:
+                folder (str): Папка для файлов контрольных точек
+                settle_seconds (float): Через сколько секунд после последнего изменения запись в файл
+                    считается законченной
+        """
+        self.folder = folder
+        self.settle_seconds = settle_seconds
+
+    def get_path(self, file_name : str, key : str):
+        """Возвращает путь к контрольной точке файла
+
+            Args:
+                file_name (str): Имя исходного файла
+                key (str): Параметры обработки, например название профессии
+
+            Returns:
+                str: Путь к json файлу контрольной точки
+        """
+        name = os.path.abspath(file_name) + "\n" + key
+        return os.path.join(self.folder, hashlib.sha1(name.encode("utf-8")).hexdigest() + ".json")
+
+    def load(self, file_name : str, key : str):
+        """Читает контрольную точку файла
+
+            Args:
+                file_name (str): Имя исходного файла
+                key (str): Параметры обработки, например название профессии
+
+            Returns:
+                dict: Контрольная точка или None, если ее нет
+        """
+        path = self.get_path(file_name, key)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as file:
+            checkpoint = json.load(file)
+        return checkpoint if checkpoint.get("version") == checkpoint_version else None
+
+    def save(self, file_name : str, key : str, checkpoint : dict):
+        """Сохраняет контрольную точку, файл заменяется целиком
+
+            Args:
+                file_name (str): Имя исходного файла
+                key (str): Параметры обработки, например название профессии
+                checkpoint (dict): Контрольная точка
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        path = self.get_path(file_name, key)
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(checkpoint, file, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def is_valid(self, data, checkpoint : dict):
+        """Проверяет, что уже прочитанная часть файла не изменилась, то есть файл только дописывался
+
+            Args:
+                data (mmap.mmap): Содержимое файла
+                checkpoint (dict): Контрольная точка
+
+            Returns:
+                bool: Можно ли продолжить чтение со смещения контрольной точки
+        """
+        if checkpoint is None or len(data) < checkpoint["offset"]:
+            return False
+        offset = checkpoint["offset"]
+        return (hash_range(data, 0, min(offset, check_size)) == checkpoint["head_hash"]
+                and hash_range(data, max(offset - check_size, 0), offset) == checkpoint["tail_hash"])
+
+    def read_appended(self, file_name : str, checkpoint : dict = None):
+        """Читает строки, дописанные в файл после контрольной точки.
+        Если файла не было в контрольных точках или он был перезаписан, файл читается с начала
+        и накопленная статистика сбрасывается
+
+            Args:
+                file_name (str): Имя исходного файла
+                checkpoint (dict): Предыдущая контрольная точка или None
+
+            Returns:
+                VacancyColumns, dict: Новые вакансии и обновленная контрольная точка без статистики за новые строки
+        """
+        stat = os.stat(file_name)
+        if stat.st_size == 0:
+            return VacancyColumns.concat([]), None
+        with open(file_name, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if not self.is_valid(data, checkpoint):
+                    reader = open_reader(file_name)
+                    start = find_line_end(data, 0)
+                    fields = next(csv.reader([data[:start].decode(reader.encoding)], delimiter=reader.delimiter), [])
+                    checkpoint = {"version": checkpoint_version, "encoding": reader.encoding,
+                                  "delimiter": reader.delimiter, "indexes": reader.indexes,
+                                  "date_format": reader.date_format, "fields": fields, "offset": start}
+                start = checkpoint["offset"]
+                if data[start:start + 2] == b"\r\n":
+                    start += 2
+                elif data[start:start + 1] == b"\n":
+                    start += 1
+                end = find_last_line_end(data, start, time.time() - stat.st_mtime >= self.settle_seconds)
+                checkpoint = dict(checkpoint, offset=end,
+                                  head_hash=hash_range(data, 0, min(end, check_size)),
+                                  tail_hash=hash_range(data, max(end - check_size, 0), end))
+        reader = ColumnsReader(file_name, encoding=checkpoint["encoding"], delimiter=checkpoint["delimiter"],
+                               indexes=checkpoint["indexes"], date_format=checkpoint["date_format"])
+        columns, rejects = read_range(reader, start, end, checkpoint["fields"])
+        checkpoint["rejects"] = {reason: checkpoint.get("rejects", {}).get(reason, 0) + count
+                                 for reason, count in rejects.items()}
+        return columns, checkpoint
@@ -0,0 +1,262 @@
+import numpy as np
+from aggregation import encode, group_sum
+from aho_corasick import AhoCorasick
+
+cube_dimensions = ("year", "month", "area_name", "salary_currency", "professions")
+
+
+def group_extremes(codes, groups_count, values):
+    """Считает минимум и максимум значений для каждой группы
+
+        Args:
+            codes (np.ndarray): Код группы для каждого значения
+            groups_count (int): Количество групп
+            values (np.ndarray): Значения
+
+        Returns:
+            np.ndarray, np.ndarray: Минимумы и максимумы по группам
+
+    >>> minimum, maximum = group_extremes(np.array([0, 1, 0]), 2, np.array([1.0, 2.0, 3.0]))
+    >>> minimum.tolist(), maximum.tolist()
+    ([1.0, 2.0], [3.0, 2.0])
+    """
+    minimum = np.full(groups_count, np.inf)
+    maximum = np.full(groups_count, -np.inf)
+    np.minimum.at(minimum, codes, values)
+    np.maximum.at(maximum, codes, values)
+    return minimum, maximum
+
+
+class AggregateCube:
+    """Класс куба агрегатов зарплат по году, месяцу, городу, валюте и профессиям.
+    Для каждой встретившейся комбинации измерений хранятся сумма, количество, минимум и максимум зарплат,
+    поэтому любой отчет получается срезом (slice) или сверткой (rollup) куба без повторного чтения вакансий.
+    Измерение professions - битовая маска профессий из prof_names, названия которых содержатся в названии вакансии
+
+    Attributes:
+        prof_names (list): Профессии, по которым построено измерение professions
+        values (dict): Значения каждого измерения, код значения - его номер
+        codes (np.ndarray): Коды измерений для каждой комбинации, форма (число комбинаций, число измерений)
+        sum (np.ndarray): Сумма зарплат для каждой комбинации
+        count (np.ndarray): Количество вакансий для каждой комбинации
+        min (np.ndarray): Минимальная зарплата для каждой комбинации
+        max (np.ndarray): Максимальная зарплата для каждой комбинации
+    """
+    def __init__(self, prof_names, values, codes, sum, count, min, max):
+        """Инициализирует объект AggregateCube
+
+            Args:
+                prof_names (list): Профессии, по которым построено измерение professions
+                values (dict): Значения каждого измерения
+                codes (np.ndarray): Коды измерений для каждой комбинации
+                sum (np.ndarray): Сумма зарплат для каждой комбинации
+                count (np.ndarray): Количество вакансий для каждой комбинации
+                min (np.ndarray): Минимальная зарплата для каждой комбинации
+                max (np.ndarray): Максимальная зарплата для каждой комбинации
+        """
+        self.prof_names = list(prof_names)
+        self.values = values
+        self.codes = codes
+        self.sum = sum
+        self.count = count
+        self.min = min
+        self.max = max
+
+    @property
+    def total(self):
+        """Возвращает число вакансий в кубе
+
+            Returns:
+                int: Число вакансий
+        """
+        return int(self.count.sum())
+
+    @staticmethod
+    def build(columns, salaries, prof_names=()):
+        """Строит куб по столбцам вакансий
+
+            Args:
+                columns (VacancyColumns): Столбцы вакансий
+                salaries (np.ndarray): Средняя зарплата каждой вакансии в рублях
+                prof_names (list): Профессии для измерения professions
+
+            Returns:
+                AggregateCube: Куб агрегатов
+        """
+        prof_names = list(dict.fromkeys(prof_names))
+        if len(prof_names) > 63:
+            raise ValueError("Куб строится не более чем по 63 профессиям")
+        names, name_codes = encode(columns.name)
+        matches = AhoCorasick(prof_names).match_matrix(names.tolist())
+        name_masks = (matches.astype(np.int64) << np.arange(len(prof_names), dtype=np.int64)).sum(axis=1)
+        dimensions = {"year": columns.year, "month": columns.month, "area_name": columns.area_name,
+                      "salary_currency": columns.salary_currency,
+                      "professions": name_masks[name_codes] if len(names) != 0 else np.zeros(0, dtype=np.int64)}
+        values = {}
+        codes = []
+        for dimension in cube_dimensions:
+            values[dimension], dimension_codes = encode(dimensions[dimension])
+            codes.append(dimension_codes)
+        return AggregateCube.aggregate(prof_names, values, np.stack(codes, axis=1).reshape(len(columns), len(codes)),
+                                       salaries, np.ones(len(columns), dtype=np.int64), salaries, salaries)
+
+    @staticmethod
+    def aggregate(prof_names, values, codes, sum, count, min, max):
+        """Объединяет строки с одинаковыми кодами измерений
+
+            Args:
+                prof_names (list): Профессии для измерения professions
+                values (dict): Значения каждого измерения
+                codes (np.ndarray): Коды измерений для каждой строки
+                sum (np.ndarray): Суммы зарплат строк
+                count (np.ndarray): Количества вакансий строк
+                min (np.ndarray): Минимальные зарплаты строк
+                max (np.ndarray): Максимальные зарплаты строк
+
+            Returns:
+                AggregateCube: Куб агрегатов
+        """
+        groups, inverse = np.unique(codes, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        group_sums, _ = group_sum(inverse, len(groups), sum)
+        group_counts, _ = group_sum(inverse, len(groups), count)
+        group_min, _ = group_extremes(inverse, len(groups), min)
+        _, group_max = group_extremes(inverse, len(groups), max)
+        return AggregateCube(prof_names, values, groups, group_sums, group_counts.astype(np.int64), group_min, group_max)
+
+    def get_mask(self, dimension : str, selected):
+        """Находит комбинации, у которых значение измерения входит в выбранные
+
+            Args:
+                dimension (str): Название измерения
+                selected (object): Значение или список значений, для professions - название профессии
+
+            Returns:
+                np.ndarray: Булева маска комбинаций
+        """
+        column = self.codes[:, cube_dimensions.index(dimension)]
+        if dimension == "professions":
+            bit = np.int64(1) << np.int64(self.prof_names.index(selected))
+            return (self.values["professions"][column] & bit) != 0
+        selected = selected if isinstance(selected, (list, tuple, set)) else [selected]
+        return np.isin(self.values[dimension][column], list(selected))
+
+    def slice(self, **filters):
+        """Возвращает часть куба, в которой измерения имеют выбранные значения
+
+            Args:
+                filters (dict): Значение или список значений для каждого измерения,
+                    для professions - название профессии
+
+            Returns:
+                AggregateCube: Часть куба
+        """
+        mask = np.ones(len(self.codes), dtype=bool)
+        for dimension, selected in filters.items():
+            mask &= self.get_mask(dimension, selected)
+        return AggregateCube(self.prof_names, self.values, self.codes[mask], self.sum[mask], self.count[mask],
+                             self.min[mask], self.max[mask])
+
+    def rollup(self, dimensions : list):
+        """Сворачивает куб до выбранных измерений
+
+            Args:
+                dimensions (list): Названия оставляемых измерений
+
+            Returns:
+                dict: Для каждого значения (или кортежа значений) измерений список [сумма, количество, минимум, максимум]
+        """
+        indexes = [cube_dimensions.index(dimension) for dimension in dimensions]
+        rolled = AggregateCube.aggregate(self.prof_names, self.values, self.codes[:, indexes],
+                                         self.sum, self.count, self.min, self.max)
+        values = [self.values[dimension].tolist() for dimension in dimensions]
+        result = {}
+        for i, group in enumerate(rolled.codes.tolist()):
+            key = tuple(values[number][code] for number, code in enumerate(group))
+            result[key[0] if len(key) == 1 else key] = [rolled.sum[i].item(), rolled.count[i].item(),
+                                                        rolled.min[i].item(), rolled.max[i].item()]
+        return result
+
+    def merge(self, other):
+        """Объединяет два куба, построенных по одинаковым профессиям
+
+            Args:
+                other (AggregateCube): Второй куб
+
+            Returns:
+                AggregateCube: Общий куб
+        """
+        values = {}
+        other_codes = np.empty_like(other.codes)
+        for number, dimension in enumerate(cube_dimensions):
+            known = {value: code for code, value in enumerate(self.values[dimension].tolist())}
+            merged = self.values[dimension].tolist()
+            for value in other.values[dimension].tolist():
+                if value not in known:
+                    known[value] = len(merged)
+                    merged.append(value)
+            remap = np.array([known[value] for value in other.values[dimension].tolist()], dtype=np.int64)
+            other_codes[:, number] = remap[other.codes[:, number]] if len(remap) != 0 else other.codes[:, number]
+            values[dimension] = np.array(merged, dtype=self.values[dimension].dtype)
+        return AggregateCube.aggregate(self.prof_names, values, np.concatenate([self.codes, other_codes]),
+                                       np.concatenate([self.sum, other.sum]), np.concatenate([self.count, other.count]),
+                                       np.concatenate([self.min, other.min]), np.concatenate([self.max, other.max]))
+
+    def save(self, path : str):
+        """Сохраняет куб в npz файл
+
+            Args:
+                path (str): Путь к файлу куба
+        """
+        values = {"values_" + dimension: self.values[dimension] for dimension in cube_dimensions}
+        values["values_area_name"] = values["values_area_name"].astype(str)
+        values["values_salary_currency"] = values["values_salary_currency"].astype(str)
+        with open(path, "wb") as file:
+            np.savez(file, prof_names=np.array(self.prof_names, dtype=str), codes=self.codes, sum=self.sum,
+                     count=self.count, min=self.min, max=self.max, **values)
+
+    @staticmethod
+    def load(path : str):
+        """Читает куб из npz файла
+
+            Args:
+                path (str): Путь к файлу куба
+
+            Returns:
+                AggregateCube: Куб агрегатов
+        """
+        with np.load(path, allow_pickle=False) as data:
+            values = {dimension: data["values_" + dimension] for dimension in cube_dimensions}
+            values["area_name"] = values["area_name"].astype(object)
+            values["salary_currency"] = values["salary_currency"].astype(object)
+            return AggregateCube(data["prof_names"].tolist(), values, data["codes"], data["sum"], data["count"],
+                                 data["min"], data["max"])
+
+    def to_report_data(self, prof_name : str):
+        """Возвращает данные для print_data по выбранной профессии срезами куба
+
+            Args:
+                prof_name (str): Имя выбранной профессии из prof_names
+
+            Returns:
+                dict: Статистические данные: суммы зарплат и количества вакансий
+
+        >>> from vacancy_columns import VacancyColumns
+        >>> columns = VacancyColumns.from_rows([["Программист", "100", "200", "RUR", "Москва", "2007-12-03T17:40:09+0300"],
+        ...                                     ["Аналитик", "300", "500", "RUR", "Казань", "2008-01-03T17:40:09+0300"]],
+        ...                                    {"name": 0, "salary_from": 1, "salary_to": 2, "salary_currency": 3,
+        ...                                     "area_name": 4, "published_at": 5})
+        >>> cube = AggregateCube.build(columns, (columns.salary_from + columns.salary_to) / 2, ["Программист"])
+        >>> data = cube.to_report_data("Программист")
+        >>> data["salary"], data["amount_prof"], data["amount_city"]
+        ({2007: 150.0, 2008: 400.0}, {2007: 1, 2008: 0}, {'Москва': 1, 'Казань': 1})
+        """
+        years = self.rollup(["year"])
+        profession = self.slice(professions=prof_name).rollup(["year"])
+        cities = self.rollup(["area_name"])
+        return {"salary": {year: years[year][0] for year in sorted(years)},
+                "amount": {year: years[year][1] for year in sorted(years)},
+                "salary_prof": {year: profession.get(year, [0, 0])[0] for year in sorted(years)},
+                "amount_prof": {year: profession.get(year, [0, 0])[1] for year in sorted(years)},
+                "salary_city": {city: cities[city][0] for city in cities},
+                "amount_city": {city: cities[city][1] for city in cities}}
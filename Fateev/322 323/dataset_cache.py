@@ -0,0 +1,208 @@
+import glob
+import hashlib
+import json
+import os
+import numpy as np
+from vacancy_columns import VacancyColumns
+from ingest import open_reader
+from trigram_index import TrigramIndex
+
+text_fields = ("name", "salary_currency", "area_name")
+number_fields = ("salary_from", "salary_to", "year", "month", "day")
+cache_version = 3
+
+
+def file_fingerprint(file_name : str):
+    """Возвращает быстрый отпечаток файла: полный путь, размер и время изменения
+
+        Args:
+            file_name (str): Имя файла
+
+        Returns:
+            dict: Отпечаток файла
+    """
+    stat = os.stat(file_name)
+    return {"path": os.path.abspath(file_name), "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+def content_hash(file_name : str, block_size : int = 1024 * 1024):
+    """Считает хэш содержимого файла, читая его блоками
+
+        Args:
+            file_name (str): Имя файла
+            block_size (int): Размер блока чтения
+
+        Returns:
+            str: Хэш содержимого
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_name, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """Класс для хранения разобранных столбцов CSV файлов в бинарном формате npz.
+    Строковые столбцы хранятся как уникальные значения и коды строк, чтобы не копировать каждую строку
+    в массив фиксированной ширины.
+    Запись кэша сверяется по пути, размеру, времени изменения и хэшу содержимого,
+    поэтому при изменении файла кэш автоматически пересоздается.
+
+    Attributes:
+        folder (str): Папка для файлов кэша
+    """
+    def __init__(self, folder : str = "cache"):
+        """Инициализирует объект DatasetCache
+
+            Args:
+                folder (str): Папка для файлов кэша
+        """
+        self.folder = folder
+
+    def get_paths(self, file_name : str):
+        """Возвращает пути к данным и описанию записи кэша для файла
+
+            Args:
+                file_name (str): Имя исходного файла
+
+            Returns:
+                str, str: Путь к npz файлу и путь к json описанию
+        """
+        key = hashlib.sha1(os.path.abspath(file_name).encode("utf-8")).hexdigest()
+        return os.path.join(self.folder, key + ".npz"), os.path.join(self.folder, key + ".json")
+
+    def get_index_path(self, file_name : str):
+        """Возвращает путь к индексу триграмм названий, он хранится рядом с записью кэша
+
+            Args:
+                file_name (str): Имя исходного файла
+
+            Returns:
+                str: Путь к npz файлу индекса
+        """
+        return self.get_paths(file_name)[0][:-len(".npz")] + ".trigrams.npz"
+
+    def get_cube_path(self, file_name : str, prof_names : list):
+        """Возвращает путь к кубу агрегатов файла для выбранных профессий, он хранится рядом с записью кэша
+
+            Args:
+                file_name (str): Имя исходного файла
+                prof_names (list): Профессии измерения professions
+
+            Returns:
+                str: Путь к npz файлу куба
+        """
+        key = hashlib.sha1("\n".join(prof_names).encode("utf-8")).hexdigest()
+        return self.get_paths(file_name)[0][:-len(".npz")] + ".cube." + key + ".npz"
+
+    def load_index(self, file_name : str, columns : VacancyColumns):
+        """Возвращает индекс триграмм названий файла, при отсутствии строит и сохраняет его.
+        Индекс удаляется при каждой перезаписи кэша файла, поэтому всегда соответствует столбцам из кэша
+
+            Args:
+                file_name (str): Имя исходного файла
+                columns (VacancyColumns): Столбцы файла из кэша
+
+            Returns:
+                TrigramIndex: Индекс названий
+        """
+        index_path = self.get_index_path(file_name)
+        if os.path.exists(index_path):
+            return TrigramIndex.load(index_path)
+        index = TrigramIndex.build(columns.name)
+        os.makedirs(self.folder, exist_ok=True)
+        index.save(index_path + ".tmp")
+        os.replace(index_path + ".tmp", index_path)
+        return index
+
+    def is_valid(self, file_name : str):
+        """Проверяет, соответствует ли запись кэша текущему содержимому файла.
+        Если изменилось только время изменения, а содержимое то же, обновляет описание записи
+
+            Args:
+                file_name (str): Имя исходного файла
+
+            Returns:
+                bool: Можно ли использовать запись кэша
+        """
+        data_path, meta_path = self.get_paths(file_name)
+        if not os.path.exists(data_path) or not os.path.exists(meta_path):
+            return False
+        with open(meta_path, encoding="utf-8") as file:
+            meta = json.load(file)
+        if meta.get("version") != cache_version:
+            return False
+        fingerprint = file_fingerprint(file_name)
+        if all(meta[key] == fingerprint[key] for key in fingerprint):
+            return True
+        if meta["size"] != fingerprint["size"] or meta["hash"] != content_hash(file_name):
+            return False
+        self.write_meta(meta_path, dict(meta, **fingerprint))
+        return True
+
+    def load(self, file_name : str):
+        """Возвращает столбцы файла из кэша, при отсутствии или устаревании записи разбирает файл и сохраняет его
+
+            Args:
+                file_name (str): Имя исходного файла
+
+            Returns:
+                VacancyColumns: Все вакансии файла
+        """
+        if self.is_valid(file_name):
+            return self.read(file_name)
+        fingerprint = file_fingerprint(file_name)
+        columns = open_reader(file_name).read()
+        self.save(file_name, columns, dict(fingerprint, hash=content_hash(file_name), version=cache_version))
+        return columns
+
+    def read(self, file_name : str):
+        """Читает столбцы из записи кэша
+
+            Args:
+                file_name (str): Имя исходного файла
+
+            Returns:
+                VacancyColumns: Все вакансии файла
+        """
+        data_path, _ = self.get_paths(file_name)
+        with np.load(data_path, allow_pickle=False) as data:
+            values = {field: data[field + "_values"].astype(object)[data[field + "_codes"]] for field in text_fields}
+            values.update({field: data[field] for field in number_fields})
+        return VacancyColumns(**values)
+
+    def save(self, file_name : str, columns : VacancyColumns, meta : dict):
+        """Сохраняет столбцы и описание записи кэша, файлы заменяются целиком.
+        Построенные по старым столбцам индекс и кубы удаляются
+
+            Args:
+                file_name (str): Имя исходного файла
+                columns (VacancyColumns): Столбцы для сохранения
+                meta (dict): Отпечаток и хэш исходного файла
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        data_path, meta_path = self.get_paths(file_name)
+        values = {field: getattr(columns, field) for field in number_fields}
+        for field in text_fields:
+            uniques, codes = np.unique(getattr(columns, field), return_inverse=True)
+            values[field + "_values"] = uniques.astype(str)
+            values[field + "_codes"] = codes.ravel().astype(np.int32)
+        with open(data_path + ".tmp", "wb") as file:
+            np.savez(file, **values)
+        os.replace(data_path + ".tmp", data_path)
+        for path in [self.get_index_path(file_name)] + glob.glob(glob.escape(data_path[:-len(".npz")]) + ".cube.*.npz"):
+            if os.path.exists(path):
+                os.remove(path)
+        self.write_meta(meta_path, meta)
+
+    def write_meta(self, meta_path : str, meta : dict):
+        """Записывает описание записи кэша
+
+            Args:
+                meta_path (str): Путь к json описанию
+                meta (dict): Отпечаток и хэш исходного файла
+        """
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(meta, file)
+        os.replace(meta_path + ".tmp", meta_path)
@@ -0,0 +1,119 @@
+import csv
+import re
+from vacancy_columns import ColumnsReader, default_values, find_field
+
+date_patterns = {
+    "iso": re.compile(r"^\d{4}-\d{2}-\d{2}"),
+    "dmy": re.compile(r"^\d{2}\.\d{2}\.\d{4}")
+}
+
+
+def sniff_encoding(sample : bytes):
+    """Определяет кодировку файла по его началу
+
+        Args:
+            sample (bytes): Начало файла
+
+        Returns:
+            str: UTF-8-sig, UTF-8 или cp1251
+
+    >>> sniff_encoding("name".encode("utf-8-sig"))
+    'UTF-8-sig'
+    >>> sniff_encoding("Название".encode("cp1251"))
+    'cp1251'
+    """
+    if sample.startswith(b"\xef\xbb\xbf"):
+        return "UTF-8-sig"
+    try:
+        sample.decode("UTF-8")
+    except UnicodeDecodeError as error:
+        if error.start < len(sample) - 3:
+            return "cp1251"
+    return "UTF-8"
+
+
+def sniff_delimiter(header : str):
+    """Определяет разделитель столбцов по строке заголовков
+
+        Args:
+            header (str): Строка заголовков
+
+        Returns:
+            str: Разделитель столбцов
+
+    >>> sniff_delimiter("Column1;name;salary_from")
+    ';'
+    """
+    return max([",", ";", "\t"], key=header.count)
+
+
+def map_fields(fields : list):
+    """Сопоставляет заголовки файла с полями вакансии, лишние столбцы (например, индекс) пропускаются
+
+        Args:
+            fields (list): Заголовки CSV файла
+
+        Returns:
+            dict: Номер столбца для каждого поля, None если поля нет в файле
+
+    >>> map_fields(["", "name", "salary", "area_name", "published_at"])["salary_to"]
+    2
+    """
+    return {field: find_field(fields, field) for field in default_values}
+
+
+def sniff_date_format(values : list):
+    """Определяет формат дат по нескольким значениям столбца published_at
+
+        Args:
+            values (list): Значения столбца published_at
+
+        Returns:
+            str: iso или dmy
+
+    >>> sniff_date_format(["01.12.2022 0:38"])
+    'dmy'
+    """
+    for date_format, pattern in date_patterns.items():
+        if len(values) != 0 and all(pattern.match(value) for value in values):
+            return date_format
+    return "iso"
+
+
+def open_reader(file_name : str, sample_size : int = 64 * 1024, batch_size : int = 100000):
+    """Определяет кодировку, разделитель, заголовки и формат дат по началу файла
+    и возвращает настроенный читатель столбцов. Поддерживает выгрузки по годам, выгрузки API
+    и hh_unloading.csv (cp1251, ';', столбец индекса, даты dd.mm.yyyy H:MM)
+
+        Args:
+            file_name (str): Имя файла
+            sample_size (int): Количество байт для определения формата
+            batch_size (int): Количество строк в одном пакете
+
+        Returns:
+            ColumnsReader: Читатель столбцов для файла
+    """
+    with open(file_name, "rb") as file:
+        sample = file.read(sample_size)
+    encoding = sniff_encoding(sample)
+    lines = sample.decode(encoding, errors="ignore").splitlines()
+    delimiter = sniff_delimiter(lines[0] if len(lines) != 0 else "")
+    rows = list(csv.reader(lines[:-1] if len(lines) > 2 else lines, delimiter=delimiter))
+    fields = rows[0] if len(rows) != 0 else []
+    indexes = map_fields(fields)
+    dates = []
+    if indexes["published_at"] is not None:
+        dates = [row[indexes["published_at"]] for row in rows[1:] if len(row) == len(fields)]
+    return ColumnsReader(file_name, batch_size, encoding, delimiter, indexes, sniff_date_format(dates))
+
+
+def read_any(file_name : str):
+    """Читает файл любого поддерживаемого формата в столбцы
+
+        Args:
+            file_name (str): Имя файла
+
+        Returns:
+            VacancyColumns: Все вакансии файла
+    """
+    return open_reader(file_name).read()
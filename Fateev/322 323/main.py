@@ -10,6 +10,20 @@ import pdfkit
 import doctest
 import concurrent.futures
 from functools import partial
+from ingest import open_reader
+from dataset_cache import DatasetCache
+from checkpoints import Checkpoints
+from validation import RowValidator
+from vacancy_columns import VacancyColumns
+from aggregation import encode, group_sum
+from stats_shard import StatsShard
+from aho_corasick import AhoCorasick
+from sketches import group_digests, SpaceSaving, CountMinSketch
+from cube import AggregateCube
+from skills import SkillStats
+from result_cache import ResultCache
+
+html_tag = re.compile(r"<[^>]+>")
 
 experienceToRus = {
     "noExperience": "Нет опыта",
@@ -77,6 +91,8 @@ fieldToRus = {
     "":""
 }
 
+skill_fields = ("name", "published_at", "key_skills")
+
 def files(path):
     for file in os.listdir(path):
         if os.path.isfile(os.path.join(path, file)):
@@ -114,7 +130,7 @@ class TextEditor:
             Returns:
                 str: Текст с удаленными HTML тегами
         """
-        return ' '.join(re.sub(r"<[^>]+>", '', string).split()).replace("  ", " ").replace(" ", " ")
+        return ' '.join(html_tag.sub('', string).split()).replace("  ", " ").replace(" ", " ")
 
     def line_trim(string : str):
         """Обрезает str до 100 символов
@@ -276,6 +292,8 @@ class Salary:
         salary_gross (str): Наличие включенного налога
         salary_currency (str): Валюта оклада
     """
+    __slots__ = ("salary_from", "salary_to", "salary_gross", "salary_currency")
+
     def __init__(self, salary_from : str, salary_to : str, salary_gross : str, salary_currency : str):
         """Инициализирует объект Salary, выполняет конвертацию для полей.
 
@@ -333,6 +351,9 @@ class Vacancy:
         area_name (str): Город работы
         published_at (str): Дата публикации вакансии
     """
+    __slots__ = ("name", "_description_raw", "_description", "_key_skills_raw", "_key_skills", "experience_id",
+                 "premium", "employer_name", "salary", "area_name", "published_at")
+
     def __init__(self, name : str, description : str, key_skills : str, experience_id : str, 
                     premium : str, employer_name : str, salary : Salary, area_name : str, published_at : str):
         """Инициализирует объект Vacancy, выполняет конвертацию дляполей.
@@ -354,8 +375,10 @@ class Vacancy:
         'xyz'
         """
         self.name = name
-        self.description = TextEditor.beautifulStr(description)
-        self.key_skills = list(key_skills.split("\n"))
+        self._description_raw = description
+        self._description = None
+        self._key_skills_raw = key_skills
+        self._key_skills = None
         self.experience_id = experience_id
         self.premium = premium
         self.employer_name = employer_name
@@ -363,6 +386,28 @@ class Vacancy:
         self.area_name = area_name
         self.published_at = published_at
 
+    @property
+    def description(self):
+        """Описание вакансии без HTML тегов, очищается при первом обращении
+
+            Returns:
+                str: Описание вакансии
+        """
+        if self._description is None:
+            self._description = TextEditor.beautifulStr(self._description_raw)
+        return self._description
+
+    @property
+    def key_skills(self):
+        """Ключевые навыки вакансии, разделяются при первом обращении
+
+            Returns:
+                list: Ключевые навыки
+        """
+        if self._key_skills is None:
+            self._key_skills = list(self._key_skills_raw.split("\n"))
+        return self._key_skills
+
     def date_to_string(self):
         """Переводит аттрибут published_at класса Vacancy в формат dd.mm.yyyy
 
@@ -389,7 +434,7 @@ class Vacancy:
         >>> Vacancy("x", "<br><b>x</b>yz</br>", 'z', "noExperience", "true", "x", Salary("100", "2000", "true", "RUR"), "x", "2012-10-03T17:12:09+0300").date_get_year()
         2012
         """
-        return int(self.date_to_string().split(".")[-1])
+        return int(self.published_at[0:4])
 
     def premium_to_string(self):
         """Переводит аттрибут premium класса Vacancy в строку на Русском языке
@@ -452,6 +497,104 @@ class Vacancy:
         return [TextEditor.beautifulStr(self.name), self.description_to_string(), self.skills_to_string(), self.experience_to_string(), self.premium_to_string(),  
                 self.employer_name, self.salary.to_string(), self.area_name, self.date_to_string()]
 
+class SalaryRow:
+    """Класс для представления зарплаты как строки общих столбцов VacancyColumns без копирования данных.
+
+    Attributes:
+        columns (VacancyColumns): Столбцы вакансий
+        index (int): Номер строки
+    """
+    __slots__ = ("columns", "index")
+    salary_gross = ""
+    to_string = Salary.to_string
+
+    def __init__(self, columns, index : int):
+        """Инициализирует объект SalaryRow
+
+            Args:
+                columns (VacancyColumns): Столбцы вакансий
+                index (int): Номер строки
+        """
+        self.columns = columns
+        self.index = index
+
+    @property
+    def salary_from(self):
+        value = self.columns.salary_from[self.index]
+        return int(value) if value == value else value
+
+    @property
+    def salary_to(self):
+        value = self.columns.salary_to[self.index]
+        return int(value) if value == value else value
+
+    @property
+    def salary_currency(self):
+        return self.columns.salary_currency[self.index]
+
+
+class VacancyRow:
+    """Класс для представления вакансии как строки общих столбцов VacancyColumns.
+    Хранит только ссылку на столбцы и номер строки, поддерживает те же методы, что и Vacancy.
+    Поля, которых нет в столбцах, пустые.
+
+    Attributes:
+        columns (VacancyColumns): Столбцы вакансий
+        index (int): Номер строки
+    """
+    __slots__ = ("columns", "index")
+    description = ""
+    key_skills = ()
+    experience_id = ""
+    premium = ""
+    employer_name = ""
+    date_to_string = Vacancy.date_to_string
+    date_get_year = Vacancy.date_get_year
+    premium_to_string = Vacancy.premium_to_string
+    description_to_string = Vacancy.description_to_string
+    skills_to_string = Vacancy.skills_to_string
+    experience_to_string = Vacancy.experience_to_string
+    to_list = Vacancy.to_list
+
+    def __init__(self, columns, index : int):
+        """Инициализирует объект VacancyRow
+
+            Args:
+                columns (VacancyColumns): Столбцы вакансий
+                index (int): Номер строки
+        """
+        self.columns = columns
+        self.index = index
+
+    @staticmethod
+    def rows(columns):
+        """Возвращает все строки столбцов в виде вакансий
+
+            Args:
+                columns (VacancyColumns): Столбцы вакансий
+
+            Returns:
+                list: Вакансии VacancyRow
+        """
+        return [VacancyRow(columns, index) for index in range(len(columns))]
+
+    @property
+    def name(self):
+        return self.columns.name[self.index]
+
+    @property
+    def area_name(self):
+        return self.columns.area_name[self.index]
+
+    @property
+    def salary(self):
+        return SalaryRow(self.columns, self.index)
+
+    @property
+    def published_at(self):
+        columns = self.columns
+        return f"{columns.year[self.index]:04}-{columns.month[self.index]:02}-{columns.day[self.index]:02}"
+
 class HtmlGenerator:
     """Класс для генерации HTML страницы
     """
@@ -826,21 +969,30 @@ class CsvWorker:
         vacancy = Vacancy(name, description, key_skills, experience_id, premium, employer_name, salary, area_name, published_at)
         return vacancy        
 
-    def сsv_reader(self):
-        """Читает файл, создает list Вакансий и list Полей
+    def сsv_reader(self, batch_size=100000):
+        """Читает файл, создает list Вакансий и list Полей.
+        Строки проверяются пакетами до создания вакансий, количество отброшенных строк по причинам
+        сохраняется в self.rejects
+
+            Args:
+                batch_size (int): Количество строк в одном пакете проверки
 
             Returns:
                 list, list: Вакансии, Поля
         """
-        fields = []
         vacancies = []
         with open(ﬁle_name, encoding="UTF-8-sig") as File:
             reader = csv.reader(File, delimiter=',')
+            fields = next(reader, [])
+            validator = RowValidator(len(fields), {field: i for i, field in enumerate(fields)}, fields)
+            rows = []
             for row in reader:
-                if (fields == []):
-                    fields = row
-                elif (len(fields) == len(row) and not ("" in row)):
-                    vacancies.append(self.csv_ﬁler(row, fields))
+                rows.append(row)
+                if len(rows) == batch_size:
+                    vacancies.extend(self.csv_ﬁler(row, fields) for row in validator.check(rows))
+                    rows = []
+            vacancies.extend(self.csv_ﬁler(row, fields) for row in validator.check(rows))
+        self.rejects = validator.rejects
         return vacancies, fields
 
 class CSVReader:
@@ -894,57 +1046,224 @@ class CSVReader:
             File.close()
         return [year, vacancies]
 
+    def get_columns(self, file_name, cache=None):
+        """Считывает все вакансии с файла в виде столбцов, не создавая объекты Vacancy
+
+            Args:
+                file_name (str): Название файла
+                cache (DatasetCache): Кэш разобранных файлов, None чтобы всегда читать файл
+
+            Returns:
+                [int, VacancyColumns] : Массив из года вакансий (None, если вакансий нет) и столбцов вакансий
+        """
+        columns = cache.load(file_name) if cache is not None else open_reader(file_name).read()
+        return [int(columns.year[-1]) if len(columns) != 0 else None, columns]
+
 class DataWorker:
     """Класс для статистической обработки вакансий
     """
-    def get_data(self, prof_name, vacancies_objects):
-        """Обрабатывает вакансии и возвращает статистические данные
+    def get_data(self, prof_name, vacancies_columns):
+        """Обрабатывает вакансии и возвращает статистические данные в виде сумм и количеств,
+        которые можно складывать между файлами
 
             Args:
-                vacancies_objects (list): Список вакансий
+                vacancies_columns (list): Год и столбцы вакансий (VacancyColumns)
                 prof_name (str): Имя выбранной профессии
             
             Returns:
-                dict: Статистические данные
+                list: Год, сумма зарплат, количество вакансий, сумма зарплат и количество вакансий для профессии,
+                    суммы зарплат и количества вакансий по городам
         """
-        year = vacancies_objects[0]
-        vacancies_objects = vacancies_objects[1]
-        salary_out = []
-        amount_out = 0
-        salary_prof_out = []
-        amount_prof_out = 0
-        cities_salary = {}
-        cities_amount = {}
-        for vacancy in vacancies_objects:
-            avg_salary = (vacancy.salary.salary_from + vacancy.salary.salary_to) / 2 * currency_to_rub[
-                vacancy.salary.salary_currency]
-            # Динамика уровня зарплат по годам
-            salary_out += [avg_salary]
-            # Динамика количества вакансий по годам
-            amount_out += 1
-            if prof_name in vacancy.name:
-                # Динамика уровня зарплат по годам для выбранной профессии
-                salary_prof_out += [avg_salary]
-                # Динамика количества вакансий по годам для выбранной профессии
-                amount_prof_out += 1
-
-            # Уровень зарплат по городам (в порядке убывания)
-            if vacancy.area_name not in cities_salary:
-                cities_salary[vacancy.area_name] = [avg_salary]
-            else:
-                cities_salary[vacancy.area_name] += [avg_salary]
-            # Доля вакансий по городам (в порядке убывания)
-            if vacancy.area_name not in cities_amount:
-                cities_amount[vacancy.area_name] = 1
-            else:
-                cities_amount[vacancy.area_name] += 1
-        return [year, salary_out, amount_out, salary_prof_out, amount_prof_out, cities_salary, cities_amount]
+        columns = vacancies_columns[1]
+        return self.aggregate(prof_name, columns, [vacancies_columns[0]], np.zeros(len(columns), dtype=np.int64))[0]
+
+    def get_years_data(self, prof_name, columns, index=None, with_cities=True):
+        """Обрабатывает вакансии нескольких лет и возвращает статистические данные для каждого года
+
+            Args:
+                prof_name (str): Имя выбранной профессии
+                columns (VacancyColumns): Столбцы вакансий
+                index (TrigramIndex): Индекс названий для поиска профессии, None чтобы проверять все названия
+                with_cities (bool): Считать суммы и количества по городам, иначе словари городов пустые
+
+            Returns:
+                list: Статистические данные по годам в порядке возрастания годов
+        """
+        years, year_codes = np.unique(columns.year, return_inverse=True)
+        return self.aggregate(prof_name, columns, years.tolist(), year_codes.ravel(), index, with_cities)
+
+    def get_shard(self, prof_name, columns, index=None, quantiles=False, top_k=None):
+        """Обрабатывает вакансии и возвращает их статистику в виде части, которую можно объединять с другими
+
+            Args:
+                prof_name (str): Имя выбранной профессии
+                columns (VacancyColumns): Столбцы вакансий
+                index (TrigramIndex): Индекс названий для поиска профессии, None чтобы проверять все названия
+                quantiles (bool): Строить t-digest зарплат по годам, городам и для профессии
+                top_k (int): Число отслеживаемых городов в режиме top-K, None чтобы считать все города точно.
+                    В режиме top-K точные словари городов не строятся: Space-Saving и Count-Min заполняются
+                    пакетами кодов городов, t-digest строятся только для отслеживаемых городов
+
+            Returns:
+                StatsShard: Статистика вакансий
+        """
+        years_data = self.get_years_data(prof_name, columns, index, with_cities=top_k is None)
+        shard = StatsShard.from_years(prof_name, years_data, len(columns))
+        if top_k is not None:
+            shard.city_top, shard.city_counts = self.get_city_sketches(columns, top_k)
+        if quantiles:
+            self.add_digests(shard, columns, {prof_name: self.get_prof_mask(prof_name, columns, index)})
+        return shard
+
+    def get_city_sketches(self, columns, top_k, batch_size=100000):
+        """Считает самые частые города и приближенные количества вакансий по городам пакетами строк,
+        поэтому память зависит от числа отслеживаемых городов и размера пакета, а не от числа всех городов
+
+            Args:
+                columns (VacancyColumns): Столбцы вакансий
+                top_k (int): Число отслеживаемых городов
+                batch_size (int): Количество строк в пакете
+
+            Returns:
+                SpaceSaving, CountMinSketch: Самые частые города и приближенные количества вакансий
+        """
+        avg_salaries = self.get_avg_salaries(columns)
+        city_top = SpaceSaving(top_k)
+        city_counts = CountMinSketch()
+        for start in range(0, len(columns), batch_size):
+            cities, city_codes = encode(columns.area_name[start:start + batch_size])
+            salary, amount = group_sum(city_codes, len(cities), avg_salaries[start:start + batch_size])
+            cities = cities.tolist()
+            city_top.add(cities, amount.tolist(), salary.tolist())
+            city_counts.add(cities, amount)
+        return city_top, city_counts
+
+    def add_digests(self, shard, columns, prof_masks):
+        """Строит t-digest зарплат по годам, по городам и по годам для каждой профессии и добавляет их в shard.
+        В режиме top-K t-digest по городам строятся только для отслеживаемых городов
+
+            Args:
+                shard (StatsShard): Статистика вакансий
+                columns (VacancyColumns): Столбцы вакансий
+                prof_masks (dict): Булева маска вакансий для каждой профессии
+        """
+        avg_salaries = self.get_avg_salaries(columns)
+        years, year_codes = np.unique(columns.year, return_inverse=True)
+        years = years.tolist()
+        year_codes = year_codes.ravel()
+        is_city = slice(None)
+        if shard.city_top is not None:
+            is_city = np.isin(columns.area_name, np.array(list(shard.city_top.counts), dtype=object))
+        cities, city_codes = encode(columns.area_name[is_city])
+        shard.year_digests = group_digests(years, year_codes, avg_salaries)
+        shard.city_digests = group_digests(cities.tolist(), city_codes, avg_salaries[is_city])
+        for prof_name, is_prof in prof_masks.items():
+            shard.profession_digests[prof_name] = group_digests(years, year_codes[is_prof], avg_salaries[is_prof])
+
+    def get_prof_mask(self, prof_name, columns, index=None):
+        """Находит вакансии выбранной профессии. Без индекса каждое уникальное название проверяется один раз,
+        результат переносится на вакансии по кодам названий
+
+            Args:
+                prof_name (str): Имя выбранной профессии, None если профессия не выбрана
+                columns (VacancyColumns): Столбцы вакансий
+                index (TrigramIndex): Индекс названий для поиска профессии, None чтобы проверять все названия
+
+            Returns:
+                np.ndarray: Булева маска вакансий профессии
+        """
+        is_prof = np.zeros(len(columns), dtype=bool)
+        if prof_name is not None and index is not None:
+            is_prof[index.search(prof_name)] = True
+        elif prof_name is not None:
+            names, name_codes = encode(columns.name)
+            matches = np.fromiter((prof_name in name for name in names.tolist()), dtype=bool, count=len(names))
+            is_prof = matches[name_codes]
+        return is_prof
+
+    def get_professions_shard(self, prof_names, columns, casefold=False, quantiles=False):
+        """Обрабатывает вакансии сразу для нескольких профессий за один проход.
+        Одинаковые названия вакансий разбираются один раз автоматом Ахо-Корасик
+
+            Args:
+                prof_names (list): Названия профессий
+                columns (VacancyColumns): Столбцы вакансий
+                casefold (bool): Искать профессии без учета регистра
+                quantiles (bool): Строить t-digest зарплат по годам, городам и профессиям
+
+            Returns:
+                StatsShard: Статистика вакансий с данными по годам для каждой профессии
+        """
+        prof_names = list(dict.fromkeys(prof_names))
+        years, year_codes = np.unique(columns.year, return_inverse=True)
+        years = years.tolist()
+        year_codes = year_codes.ravel()
+        shard = StatsShard.from_years(None, self.aggregate(None, columns, years, year_codes), len(columns))
+        avg_salaries = self.get_avg_salaries(columns)
+        names, name_codes = encode(columns.name)
+        matches = AhoCorasick(prof_names, casefold).match_matrix(names.tolist())
+        prof_masks = {prof_name: matches[name_codes, number] for number, prof_name in enumerate(prof_names)}
+        for prof_name, is_prof in prof_masks.items():
+            salary, amount = group_sum(year_codes[is_prof], len(years), avg_salaries[is_prof])
+            shard.professions[prof_name] = [dict(zip(years, salary.tolist())), dict(zip(years, amount.tolist()))]
+        if quantiles:
+            self.add_digests(shard, columns, prof_masks)
+        return shard
+
+    def get_avg_salaries(self, columns):
+        """Считает среднюю зарплату каждой вакансии в рублях
+
+            Args:
+                columns (VacancyColumns): Столбцы вакансий
+
+            Returns:
+                np.ndarray: Средние зарплаты
+        """
+        currencies, currency_codes = encode(columns.salary_currency)
+        rates = np.array([currency_to_rub[currency] for currency in currencies], dtype=np.float64)[currency_codes]
+        return (columns.salary_from + columns.salary_to) / 2 * rates
+
+    def aggregate(self, prof_name, columns, years, year_codes, index=None, with_cities=True):
+        """Считает суммы и количества по годам и городам для всех вакансий сразу.
+        Города и пары год-город кодируются целыми числами, суммы считаются через np.bincount,
+        поэтому память зависит только от числа групп
+
+            Args:
+                prof_name (str): Имя выбранной профессии, None чтобы не считать данные по профессии
+                columns (VacancyColumns): Столбцы вакансий
+                years (list): Годы, номер года в списке совпадает с его кодом
+                year_codes (np.ndarray): Код года для каждой вакансии
+                index (TrigramIndex): Индекс названий для поиска профессии, None чтобы проверять все названия
+                with_cities (bool): Считать суммы и количества по городам, иначе словари городов пустые
+
+            Returns:
+                list: Статистические данные для каждого года
+        """
+        avg_salaries = self.get_avg_salaries(columns)
+        is_prof = self.get_prof_mask(prof_name, columns, index)
+        # Динамика уровня зарплат и количества вакансий по годам
+        salary_out, amount_out = group_sum(year_codes, len(years), avg_salaries)
+        # Динамика уровня зарплат и количества вакансий по годам для выбранной профессии
+        salary_prof_out, amount_prof_out = group_sum(year_codes[is_prof], len(years), avg_salaries[is_prof])
+        # Уровень зарплат и доля вакансий по городам
+        cities_salary = [{} for _ in years]
+        cities_amount = [{} for _ in years]
+        if with_cities:
+            cities, city_codes = encode(columns.area_name)
+            pairs, pair_codes = encode(year_codes * len(cities) + city_codes)
+            pairs_salary, pairs_amount = group_sum(pair_codes, len(pairs), avg_salaries)
+            for pair, salary, amount in zip(pairs.tolist(), pairs_salary.tolist(), pairs_amount.tolist()):
+                year_code, city_code = divmod(pair, len(cities))
+                cities_salary[year_code][cities[city_code]] = salary
+                cities_amount[year_code][cities[city_code]] = amount
+        return [[years[i], salary_out[i].item(), amount_out[i].item(), salary_prof_out[i].item(),
+                 amount_prof_out[i].item(), cities_salary[i], cities_amount[i]] for i in range(len(years))]
 
 def print_data(data, total_vacancies):
     """Обрабатывает вакансии и возвращает словари для создания таблиц, графиков и выводит данные этих словарей
 
             Args:
-                data (list): Статистические данные
+                data (dict): Статистические данные: суммы зарплат и количества вакансий
                 total_vacancies (int): Общеее число вакансий
             
             Returns:
@@ -954,7 +1273,7 @@ def print_data(data, total_vacancies):
     salaryDict = []
     cityDict = []
     for x in data["salary"].keys():
-        temp[x] = int(sum(data["salary"][x]) / len(data["salary"][x]))
+        temp[x] = int(data["salary"][x] / data["amount"][x])
     print("Динамика уровня зарплат по годам:", temp)
     salaryDict.append(list(list(data["salary"].keys())[i] for i in range(len(data["salary"].keys()))))
     salaryDict.append(temp)
@@ -962,7 +1281,8 @@ def print_data(data, total_vacancies):
     salaryDict.append(data["amount"])
     temp = {list(data["salary"].keys())[i]: 0 for i in range(len(data["salary"].keys()))}
     for x in data["salary_prof"].keys():
-        temp[x] = int(sum(data["salary_prof"][x]) / len(data["salary_prof"][x]))
+        if data["amount_prof"][x] != 0:
+            temp[x] = int(data["salary_prof"][x] / data["amount_prof"][x])
     print("Динамика уровня зарплат по годам для выбранной профессии:", temp)
     salaryDict.append(temp)
 
@@ -979,9 +1299,9 @@ def print_data(data, total_vacancies):
     if "Россия" in data["salary_city"]:
         data["salary_city"].pop("Россия")
     for x in data["salary_city"].keys():
-        percent = len(data["salary_city"][x]) / total_vacancies
+        percent = data["amount_city"][x] / total_vacancies
         if (percent >= 0.01):
-            temp[x] = int(sum(data["salary_city"][x]) / len(data["salary_city"][x]))
+            temp[x] = int(data["salary_city"][x] / data["amount_city"][x])
     temp = dict(sorted(temp.items(), key=lambda x: x[1], reverse=True)[:10])
     print("Уровень зарплат по городам (в порядке убывания):", temp)
     cityDict.append(temp)
@@ -1039,65 +1359,326 @@ def print_data(data, total_vacancies):
     report = Report("graph.jpg", print_data(dict, sum(len(x[1]) for x in vacancies)), prof_name)
     pdfkit.from_string(report.html, 'report.pdf', configuration=config, options=options) """
 
-def main_futures(file_names, prof_name):
-    """Обрабатывает и считывает вакансии в многопоточном режиме
+def print_quantiles(shard, prof_name):
+    """Выводит квантили зарплат (p25, p50, p75, p90) по годам, по городам и по годам для выбранной профессии
+
+        Args:
+            shard (StatsShard): Общая статистика с t-digest зарплат
+            prof_name (str): Имя выбранной профессии
+    """
+    years, cities, profession = shard.get_quantiles(prof_name)
+    cities_amount = shard.get_cities()[1]
+    cities = {city: cities[city] for city in cities
+              if city != "Россия" and cities_amount.get(city, 0) / max(shard.total, 1) >= 0.01}
+    cities = dict(sorted(cities.items(), key=lambda x: x[1][1], reverse=True)[:10])
+    print("Квантили зарплат по годам (p25, p50, p75, p90):", years)
+    print("Квантили зарплат по годам для выбранной профессии (p25, p50, p75, p90):", profession)
+    print("Квантили зарплат по городам (p25, p50, p75, p90):", cities)
+
+def read_get_data(prof_name, cache_folder, file_name, quantiles=False, top_k=None):
+    """Считывает файл и возвращает только его статистику, используется процессами-обработчиками
+
+        Args:
+            prof_name (str): Имя выбранной профессии
+            cache_folder (str): Папка кэша разобранных файлов, None чтобы не использовать кэш
+            file_name (str): Название файла
+            quantiles (bool): Строить t-digest зарплат
+            top_k (int): Число отслеживаемых городов в режиме top-K, None чтобы считать все города точно
+
+        Returns:
+            StatsShard: Статистика файла
+    """
+    cache = DatasetCache(cache_folder) if cache_folder is not None else None
+    columns = CSVReader().get_columns(file_name, cache)[1]
+    index = cache.load_index(file_name, columns) if cache is not None else None
+    return DataWorker().get_shard(prof_name, columns, index, quantiles, top_k)
+
+def read_get_data_incremental(prof_name, checkpoint_folder, file_name, quantiles=False, top_k=None):
+    """Считывает только строки, дописанные в файл с прошлого запуска, и добавляет их статистику
+    к сохраненной в контрольной точке
+
+        Args:
+            prof_name (str): Имя выбранной профессии
+            checkpoint_folder (str): Папка контрольных точек
+            file_name (str): Название файла
+            quantiles (bool): Строить t-digest зарплат
+            top_k (int): Число отслеживаемых городов в режиме top-K, None чтобы считать все города точно
+
+        Returns:
+            StatsShard: Статистика файла
+    """
+    checkpoints = Checkpoints(checkpoint_folder)
+    key = prof_name + ("\nquantiles" if quantiles else "") + ("\ntop " + str(top_k) if top_k is not None else "")
+    columns, checkpoint = checkpoints.read_appended(file_name, checkpoints.load(file_name, key))
+    if checkpoint is None:
+        return StatsShard()
+    shard = StatsShard.from_dict(checkpoint["shard"]) if "shard" in checkpoint else StatsShard()
+    shard = shard.merge(DataWorker().get_shard(prof_name, columns, quantiles=quantiles, top_k=top_k))
+    checkpoint["shard"] = shard.to_dict()
+    checkpoints.save(file_name, key, checkpoint)
+    return shard
+
+def get_futures_shard(file_names, prof_name, cache_folder="cache", use_processes=True, checkpoint_folder=None,
+                      quantiles=False, top_k=None, result_folder=None):
+    """Считает общую статистику файлов в нескольких процессах или берет готовый результат.
+    Каждый процесс возвращает только статистику своего файла, которые затем объединяются
+
+        Args:
+            file_names(list): Названия файлов
+            prof_name (str): Имя выбранной профессии, пробелы по краям не учитываются
+            cache_folder (str): Папка кэша разобранных файлов, None чтобы не использовать кэш
+            use_processes (bool): Использовать пул процессов, иначе пул потоков
+            checkpoint_folder (str): Папка контрольных точек, если указана, из файлов читаются только дописанные строки
+            quantiles (bool): Строить t-digest зарплат
+            top_k (int): Число отслеживаемых городов: статистика по городам хранится в ограниченной памяти
+                (Space-Saving и Count-Min), None чтобы считать все города точно
+            result_folder (str): Папка готовых результатов, None чтобы всегда считать заново
+
+        Returns:
+            StatsShard: Общая статистика
+    """
+    prof_name = prof_name.strip()
+    results = ResultCache(result_folder) if result_folder is not None else None
+    if results is not None:
+        key = results.get_key(file_names, {"mode": "futures", "incremental": checkpoint_folder is not None,
+                                           "prof_name": prof_name, "quantiles": quantiles, "top_k": top_k})
+        data = results.get(key)
+        if data is not None:
+            return StatsShard.loads(data)
+    if checkpoint_folder is not None:
+        worker = partial(read_get_data_incremental, prof_name, checkpoint_folder, quantiles=quantiles, top_k=top_k)
+    else:
+        worker = partial(read_get_data, prof_name, cache_folder, quantiles=quantiles, top_k=top_k)
+    if use_processes:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=min(len(file_names), cpu_count()) or 1)
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=10)
+    with executor:
+        shards = list(executor.map(worker, file_names))
+    shards = sorted(shards, key=lambda shard: min(shard.amount, default=0))
+    shard = StatsShard.reduce(shards)
+    if results is not None:
+        results.put(key, shard.dumps())
+    return shard
+
+def main_futures(file_names, prof_name, cache_folder="cache", use_processes=True, checkpoint_folder=None,
+                 quantiles=False, top_k=None, result_folder=None):
+    """Обрабатывает и считывает вакансии в нескольких процессах и выводит отчет
 
         Args:
             file_names(list): Названия файлов
             prof_name (str): Имя выбранной профессии
+            cache_folder (str): Папка кэша разобранных файлов, None чтобы не использовать кэш
+            use_processes (bool): Использовать пул процессов, иначе пул потоков
+            checkpoint_folder (str): Папка контрольных точек, если указана, из файлов читаются только дописанные строки
+            quantiles (bool): Дополнительно вывести квантили зарплат
+            top_k (int): Число отслеживаемых городов: статистика по городам хранится в ограниченной памяти
+                (Space-Saving и Count-Min), None чтобы считать все города точно
+            result_folder (str): Папка готовых результатов, None чтобы всегда считать заново
     """
-    def read_get_data(prof_name, file_name):
-        dataWorker = DataWorker()
-        csvReader = CSVReader()
-        vacancies = csvReader.get_vacancies(file_name)
-        return [dataWorker.get_data(prof_name, vacancies), len(vacancies[1])]
-
-    years = []
-    total_vacancies = 0
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        queue = {executor.submit(partial(read_get_data, prof_name), file_name): file_name for file_name in file_names}
-        for answer in concurrent.futures.as_completed(queue):
-            result = answer.result()
-            years.append(result[0])
-            total_vacancies += result[1]
-            years = sorted(years, key=lambda year: year[0])
+    prof_name = prof_name.strip()
+    shard = get_futures_shard(file_names, prof_name, cache_folder, use_processes, checkpoint_folder, quantiles, top_k,
+                              result_folder)
+    make_report(shard, prof_name)
+    if quantiles:
+        print_quantiles(shard, prof_name)
 
-    cities_salary = {}
-    cities_amount = {}
-   
-    for year in years:
-        city_salary = year[5]
-        for city in city_salary:
-            city = city
-            if city not in cities_salary:
-                cities_salary[city] = city_salary[city]
-            else:
-                cities_salary[city] += city_salary[city]
+def read_professions(prof_names, cache_folder, casefold, file_name):
+    """Считывает файл и возвращает его статистику сразу для нескольких профессий
 
-        city_amount = year[6]
-        for city in city_amount:
-            if city not in cities_amount:
-                cities_amount[city] = city_amount[city]
-            else:
-                cities_amount[city] += city_amount[city]
+        Args:
+            prof_names (list): Названия профессий
+            cache_folder (str): Папка кэша разобранных файлов, None чтобы не использовать кэш
+            casefold (bool): Искать профессии без учета регистра
+            file_name (str): Название файла
 
-    dict = {"salary": {x[0]:x[1] for x in years},
-            "amount": {x[0]:x[2] for x in years},
-            "salary_prof": {x[0]:x[3] for x in years},
-            "amount_prof": {x[0]:x[4] for x in years},
-            "salary_city": cities_salary,
-            "amount_city": cities_amount}
+        Returns:
+            StatsShard: Статистика файла
+    """
+    cache = DatasetCache(cache_folder) if cache_folder is not None else None
+    columns = CSVReader().get_columns(file_name, cache)[1]
+    return DataWorker().get_professions_shard(prof_names, columns, casefold)
+
+def main_professions(file_names, prof_names, cache_folder="cache", casefold=False):
+    """Считает динамику зарплат и количества вакансий по годам сразу для нескольких профессий,
+    каждый файл читается один раз
+
+        Args:
+            file_names (list): Названия файлов
+            prof_names (list): Названия профессий
+            cache_folder (str): Папка кэша разобранных файлов, None чтобы не использовать кэш
+            casefold (bool): Искать профессии без учета регистра
+
+        Returns:
+            StatsShard: Общая статистика
+    """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(len(file_names), cpu_count()) or 1) as executor:
+        shards = list(executor.map(partial(read_professions, prof_names, cache_folder, casefold), file_names))
+    shard = StatsShard.reduce(sorted(shards, key=lambda shard: min(shard.amount, default=0)))
+    for prof_name in dict.fromkeys(prof_names):
+        data = shard.to_report_data(prof_name)
+        print(prof_name)
+        print("Динамика уровня зарплат по годам для выбранной профессии:",
+              {year: int(data["salary_prof"][year] / data["amount_prof"][year]) if data["amount_prof"][year] != 0 else 0
+               for year in data["salary_prof"]})
+        print("Динамика количества вакансий по годам для выбранной профессии:", data["amount_prof"])
+    return shard
+
+def read_skills(prof_names, file_name):
+    """Считает статистику ключевых навыков по файлу, читая его пакетами вместе со столбцом key_skills.
+    Оклад для навыков не нужен, поэтому проверяются только название, дата публикации и навыки
+
+        Args:
+            prof_names (list): Профессии, для которых считаются частоты навыков
+            file_name (str): Название файла
+
+        Returns:
+            SkillStats: Статистика навыков файла
+    """
+    stats = SkillStats(prof_names)
+    for columns, extra in open_reader(file_name).read_extra_batches(["key_skills"], skill_fields):
+        stats = stats.merge(SkillStats.build(columns.name, extra["key_skills"], columns.year, prof_names))
+    return stats
+
+def main_skills(file_names, prof_names, top=10):
+    """Считает частоты ключевых навыков по годам для всех вакансий и для выбранных профессий
+    и матрицу совместной встречаемости навыков, файлы обрабатываются параллельно
+
+        Args:
+            file_names (list): Названия файлов
+            prof_names (list): Названия профессий
+            top (int): Количество выводимых навыков
+
+        Returns:
+            SkillStats: Общая статистика навыков
+    """
+    prof_names = list(dict.fromkeys(prof_names))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(len(file_names), cpu_count()) or 1) as executor:
+        parts = list(executor.map(partial(read_skills, prof_names), file_names))
+    stats = SkillStats(prof_names)
+    for part in parts:
+        stats = stats.merge(part)
+    for year in stats.years:
+        print("Самые частые навыки в", year, "году:", stats.top(year, n=top))
+        for prof_name in prof_names:
+            print("Самые частые навыки для профессии", prof_name, "в", year, "году:", stats.top(year, prof_name, top))
+    return stats
+
+def read_cube(prof_names, cache_folder, file_name):
+    """Возвращает куб агрегатов файла, куб строится один раз и хранится рядом с записью кэша
+
+        Args:
+            prof_names (list): Профессии измерения professions
+            cache_folder (str): Папка кэша разобранных файлов
+            file_name (str): Название файла
+
+        Returns:
+            AggregateCube: Куб агрегатов файла
+    """
+    cache = DatasetCache(cache_folder)
+    columns = cache.load(file_name)
+    cube_path = cache.get_cube_path(file_name, prof_names)
+    if os.path.exists(cube_path):
+        return AggregateCube.load(cube_path)
+    cube = AggregateCube.build(columns, DataWorker().get_avg_salaries(columns), prof_names)
+    cube.save(cube_path + ".tmp")
+    os.replace(cube_path + ".tmp", cube_path)
+    return cube
+
+def get_cube(file_names, prof_names, cache_folder="cache"):
+    """Строит общий куб агрегатов по файлам в нескольких процессах.
+    Кубы объединяются начиная с пустого куба, поэтому без файлов возвращается пустой куб
+
+        Args:
+            file_names (list): Названия файлов
+            prof_names (list): Профессии измерения professions
+            cache_folder (str): Папка кэша разобранных файлов
+
+        Returns:
+            AggregateCube: Общий куб агрегатов
+    """
+    prof_names = list(dict.fromkeys(prof_names))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(len(file_names), cpu_count()) or 1) as executor:
+        cubes = list(executor.map(partial(read_cube, prof_names, cache_folder), file_names))
+    cubes = sorted(cubes, key=lambda cube: cube.values["year"].min() if len(cube.values["year"]) != 0 else 0)
+    cube = AggregateCube.build(VacancyColumns.concat([]), np.zeros(0), prof_names)
+    for other in cubes:
+        cube = cube.merge(other)
+    return cube
+
+def main_cube(file_names, prof_names, cache_folder="cache"):
+    """Строит общий куб агрегатов по файлам и выводит отчет для первой профессии.
+    Остальные отчеты получаются срезами и свертками возвращаемого куба
+
+        Args:
+            file_names (list): Названия файлов
+            prof_names (list): Профессии измерения professions
+            cache_folder (str): Папка кэша разобранных файлов
+
+        Returns:
+            AggregateCube: Общий куб агрегатов
+    """
+    cube = get_cube(file_names, prof_names, cache_folder)
+    make_report(cube, prof_names[0])
+    return cube
+
+def main_byte_ranges(file_name, prof_name, result_folder=None):
+    """Обрабатывает один большой файл без разбиения по годам: файл делится на диапазоны байт,
+    которые разбираются в пуле процессов
+
+        Args:
+            file_name (str): Название файла
+            prof_name (str): Имя выбранной профессии, пробелы по краям не учитываются
+            result_folder (str): Папка готовых результатов, None чтобы всегда считать заново
+    """
+    prof_name = prof_name.strip()
+    results = ResultCache(result_folder) if result_folder is not None else None
+    if results is not None:
+        key = results.get_key([file_name], {"mode": "byte_ranges", "prof_name": prof_name})
+        data = results.get(key)
+        if data is not None:
+            make_report(StatsShard.loads(data), prof_name)
+            return
+    columns = open_reader(file_name).read_parallel()
+    shard = DataWorker().get_shard(prof_name, columns)
+    if results is not None:
+        results.put(key, shard.dumps())
+    make_report(shard, prof_name)
+
+def make_report(shard, prof_name):
+    """Выводит статистику и сохраняет отчет
+
+        Args:
+            shard (StatsShard): Общая статистика (или AggregateCube)
+            prof_name (str): Имя выбранной профессии
+    """
     options = {'enable-local-file-access': None}
     config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-    report = Report("graph.jpg", print_data(dict, total_vacancies), prof_name)
+    report = Report("graph.jpg", print_data(shard.to_report_data(prof_name), shard.total), prof_name)
     pdfkit.from_string(report.html, 'report.pdf', configuration=config, options=options)
 
 if __name__ == "__main__":
     doctest.testmod()
-    if input("Выберите программу:\n1-Ваканссии \n2-Статистикa\nВаш выбор: ") == "2":
+    program = input("Выберите программу:\n1-Ваканссии \n2-Статистикa\n3-Статистикa по нескольким профессиям\n"
+                    "4-Статистика навыков\nВаш выбор: ")
+    if program == "4":
         dir = input("Введите название папки: ")
+        prof_names = input("Введите названия профессий через запятую: ")
+        main_skills(list(files(dir)), [prof_name.strip() for prof_name in prof_names.split(",")])
+    elif program == "3":
+        dir = input("Введите название папки: ")
+        prof_names = input("Введите названия профессий через запятую: ")
+        main_professions(list(files(dir)), [prof_name.strip() for prof_name in prof_names.split(",")])
+    elif program == "2":
+        dir = input("Введите название папки или файла: ")
         prof_name = input("Введите название профессии: ")
-        main_futures(list(files(dir)), prof_name)
+        if os.path.isfile(dir):
+            main_byte_ranges(dir, prof_name, result_folder="results")
+        elif input("Файлы дописываются новыми вакансиями (Да / Нет): ") == "Да":
+            main_futures(list(files(dir)), prof_name, cache_folder=None, checkpoint_folder="checkpoints",
+                         result_folder="results")
+        else:
+            main_futures(list(files(dir)), prof_name, cache_folder="cache", result_folder="results")
     else:
         file_name = input("Введите название файла: ")
         filter_parametr_input = input("Введите параметр фильтрации: ")
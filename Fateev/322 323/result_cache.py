@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+from dataset_cache import file_fingerprint
+
+result_version = 1
+
+
+def normalize_query(query : dict):
+    """Приводит параметры запроса к одному виду: у строк убираются пробелы по краям,
+    параметры со значением None отбрасываются, кортежи и множества становятся списками
+
+        Args:
+            query (dict): Параметры запроса
+
+        Returns:
+            dict: Параметры запроса в одном виде
+
+    >>> normalize_query({"prof_name": " Программист ", "top_k": None, "prof_names": ("Аналитик",)})
+    {'prof_name': 'Программист', 'prof_names': ['Аналитик']}
+    """
+    result = {}
+    for key, value in query.items():
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, set):
+            value = sorted(value)
+        elif isinstance(value, tuple):
+            value = list(value)
+        result[key] = value
+    return result
+
+
+class ResultCache:
+    """Класс для хранения готовых результатов статистики на диске.
+    Ключ записи - отпечатки всех файлов набора данных и параметры запроса, поэтому при изменении
+    любого файла запрос получает новый ключ, а старая запись со временем вытесняется.
+    Время изменения файла записи - время последнего обращения к ней: при превышении max_bytes
+    удаляются давно не использованные записи (LRU)
+
+    Attributes:
+        folder (str): Папка для записей
+        max_bytes (int): Наибольший общий размер записей
+    """
+    def __init__(self, folder : str = "results", max_bytes : int = 64 * 1024 * 1024):
+        """Инициализирует объект ResultCache
+
+            Args:
+                folder (str): Папка для записей
+                max_bytes (int): Наибольший общий размер записей
+        """
+        self.folder = folder
+        self.max_bytes = max_bytes
+
+    def get_key(self, file_names : list, query : dict):
+        """Возвращает ключ записи по набору данных и параметрам запроса
+
+            Args:
+                file_names (list): Файлы набора данных
+                query (dict): Параметры запроса
+
+            Returns:
+                str: Ключ записи
+        """
+        fingerprints = sorted((file_fingerprint(file_name) for file_name in file_names), key=lambda item: item["path"])
+        text = json.dumps({"version": result_version, "files": fingerprints, "query": normalize_query(query)},
+                          ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def get_path(self, key : str):
+        """Возвращает путь к файлу записи
+
+            Args:
+                key (str): Ключ записи
+
+            Returns:
+                str: Путь к файлу записи
+        """
+        return os.path.join(self.folder, key + ".bin")
+
+    def get(self, key : str):
+        """Возвращает запись и отмечает обращение к ней
+
+            Args:
+                key (str): Ключ записи
+
+            Returns:
+                bytes: Запись или None, если ее нет
+        """
+        path = self.get_path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def put(self, key : str, data : bytes):
+        """Сохраняет запись целиком и вытесняет старые записи при превышении размера
+
+            Args:
+                key (str): Ключ записи
+                data (bytes): Запись
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        path = self.get_path(key)
+        with open(path + ".tmp", "wb") as file:
+            file.write(data)
+        os.replace(path + ".tmp", path)
+        self.evict()
+
+    def evict(self):
+        """Удаляет давно не использованные записи, пока их общий размер больше max_bytes
+        """
+        entries = []
+        for name in os.listdir(self.folder):
+            if name.endswith(".bin"):
+                try:
+                    stat = os.stat(os.path.join(self.folder, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, name))
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, name in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.folder, name))
+            except FileNotFoundError:
+                pass
+            size -= entry_size
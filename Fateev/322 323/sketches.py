@@ -0,0 +1,412 @@
+import hashlib
+import numpy as np
+
+default_quantiles = (0.25, 0.5, 0.75, 0.9)
+
+
+class TDigest:
+    """Класс t-digest для приближенного подсчета квантилей (например, медианы зарплат) в ограниченной памяти.
+    Значения хранятся в виде центроидов (среднее и вес), около краев распределения центроиды мельче,
+    поэтому крайние квантили точнее. Два t-digest объединяются методом merge
+
+    Attributes:
+        compression (int): Параметр сжатия, число центроидов примерно равно compression / 2
+        means (np.ndarray): Средние центроидов по возрастанию
+        weights (np.ndarray): Веса центроидов
+        minimum (float): Минимальное значение
+        maximum (float): Максимальное значение
+    """
+    def __init__(self, compression : int = 200, means=None, weights=None, minimum : float = np.inf,
+                 maximum : float = -np.inf):
+        """Инициализирует объект TDigest
+
+            Args:
+                compression (int): Параметр сжатия
+                means (np.ndarray): Средние центроидов по возрастанию
+                weights (np.ndarray): Веса центроидов
+                minimum (float): Минимальное значение
+                maximum (float): Максимальное значение
+        """
+        self.compression = compression
+        self.means = np.asarray(means if means is not None else [], dtype=np.float64)
+        self.weights = np.asarray(weights if weights is not None else [], dtype=np.float64)
+        self.minimum = minimum
+        self.maximum = maximum
+
+    @property
+    def count(self):
+        """Возвращает количество добавленных значений
+
+            Returns:
+                float: Сумма весов центроидов
+        """
+        return float(self.weights.sum())
+
+    def compress(self, means, weights):
+        """Сжимает отсортированные центроиды: соседние центроиды объединяются, пока они помещаются
+        в одну единицу шкалы k(q) = compression / (2pi) * asin(2q - 1)
+
+            Args:
+                means (np.ndarray): Средние центроидов по возрастанию
+                weights (np.ndarray): Веса центроидов
+
+            Returns:
+                np.ndarray, np.ndarray: Средние и веса сжатых центроидов
+        """
+        if len(means) == 0:
+            return means, weights
+        cumulative = np.cumsum(weights)
+        middle = (cumulative - weights / 2) / cumulative[-1]
+        buckets = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * middle - 1))
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        new_weights = np.add.reduceat(weights, starts)
+        return np.add.reduceat(means * weights, starts) / new_weights, new_weights
+
+    def add(self, values):
+        """Добавляет значения, значения nan пропускаются
+
+            Args:
+                values (np.ndarray): Значения
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, np.ones(len(values))])
+        order = np.argsort(means, kind="stable")
+        self.means, self.weights = self.compress(means[order], weights[order])
+
+    def merge(self, other):
+        """Объединяет два t-digest, исходные не изменяются
+
+            Args:
+                other (TDigest): Второй t-digest
+
+            Returns:
+                TDigest: Общий t-digest
+        """
+        means = np.concatenate([self.means, other.means])
+        weights = np.concatenate([self.weights, other.weights])
+        order = np.argsort(means, kind="stable")
+        digest = TDigest(self.compression, minimum=min(self.minimum, other.minimum),
+                         maximum=max(self.maximum, other.maximum))
+        digest.means, digest.weights = digest.compress(means[order], weights[order])
+        return digest
+
+    def quantile(self, q : float):
+        """Возвращает приближенное значение квантиля
+
+            Args:
+                q (float): Уровень квантиля от 0 до 1
+
+            Returns:
+                float: Значение квантиля, nan если значений нет
+
+        >>> digest = TDigest()
+        >>> digest.add(np.arange(1, 10001))
+        >>> round(digest.quantile(0.5)), round(digest.quantile(0.9)), digest.quantile(0), digest.quantile(1)
+        (5000, 9000, 1.0, 10000.0)
+        """
+        if len(self.means) == 0:
+            return float("nan")
+        cumulative = np.cumsum(self.weights)
+        positions = np.r_[0, cumulative - self.weights / 2, cumulative[-1]]
+        values = np.r_[self.minimum, self.means, self.maximum]
+        return float(np.interp(q * cumulative[-1], positions, values))
+
+    def to_list(self):
+        """Переводит t-digest в список, который можно сохранить в json
+
+            Returns:
+                list: Сжатие, средние, веса, минимум и максимум
+        """
+        return [self.compression, self.means.tolist(), self.weights.tolist(), self.minimum, self.maximum]
+
+    @staticmethod
+    def from_list(data : list):
+        """Создает t-digest из списка, полученного методом to_list
+
+            Args:
+                data (list): t-digest в виде списка
+
+            Returns:
+                TDigest: t-digest
+        """
+        return TDigest(*data)
+
+
+def group_digests(keys, codes, values, compression : int = 200):
+    """Строит t-digest значений для каждой группы
+
+        Args:
+            keys (list): Ключ каждой группы, номер ключа совпадает с кодом группы
+            codes (np.ndarray): Код группы для каждого значения
+            values (np.ndarray): Значения
+            compression (int): Параметр сжатия
+
+        Returns:
+            dict: t-digest для каждого ключа, у которого есть значения
+
+    >>> digests = group_digests(["Москва", "Казань"], np.array([0, 1, 0]), np.array([1.0, 2.0, 3.0]))
+    >>> digests["Москва"].quantile(0.5), digests["Казань"].count
+    (2.0, 1.0)
+    """
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(order) != 0 else []
+    bounds = list(starts) + [len(order)]
+    digests = {}
+    for i in range(len(starts)):
+        digest = TDigest(compression)
+        digest.add(values[order[bounds[i]:bounds[i + 1]]])
+        if digest.count != 0:
+            digests[keys[sorted_codes[bounds[i]]]] = digest
+    return digests
+
+
+def merge_digests(first : dict, second : dict):
+    """Объединяет два словаря t-digest по ключам
+
+        Args:
+            first (dict): Первый словарь
+            second (dict): Второй словарь
+
+        Returns:
+            dict: Общий словарь
+    """
+    result = dict(first)
+    for key, digest in second.items():
+        result[key] = result[key].merge(digest) if key in result else digest
+    return result
+
+
+def stable_hash(keys : list):
+    """Считает 64-битный хэш ключей, одинаковый во всех процессах (в отличие от hash для строк)
+
+        Args:
+            keys (list): Ключи
+
+        Returns:
+            np.ndarray: Хэши ключей
+
+    >>> stable_hash(["Москва"]).tolist() == stable_hash(["Москва"]).tolist()
+    True
+    """
+    return np.array([int.from_bytes(hashlib.blake2b(str(key).encode("utf-8"), digest_size=8).digest(), "little")
+                     for key in keys], dtype=np.uint64)
+
+
+class CountMinSketch:
+    """Класс Count-Min для приближенного подсчета частот любого числа ключей в ограниченной памяти.
+    Оценка частоты никогда не меньше настоящей и больше нее не более чем на e / width * N
+    с вероятностью 1 - exp(-depth), где N - сумма всех частот
+
+    Attributes:
+        width (int): Ширина таблицы
+        depth (int): Число строк таблицы (хэш-функций)
+        table (np.ndarray): Таблица счетчиков
+    """
+    def __init__(self, width : int = 2048, depth : int = 4, table=None):
+        """Инициализирует объект CountMinSketch
+
+            Args:
+                width (int): Ширина таблицы
+                depth (int): Число строк таблицы (хэш-функций)
+                table (np.ndarray): Таблица счетчиков
+        """
+        self.width = width
+        self.depth = depth
+        self.table = np.asarray(table, dtype=np.int64) if table is not None else np.zeros((depth, width), dtype=np.int64)
+
+    def get_columns(self, keys : list):
+        """Находит столбец таблицы для каждого ключа в каждой строке
+
+            Args:
+                keys (list): Ключи
+
+            Returns:
+                np.ndarray: Номера столбцов, форма (depth, число ключей)
+        """
+        hashes = stable_hash(keys)
+        first = hashes & np.uint64(0xFFFFFFFF)
+        second = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((first[None, :] + rows * second[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, keys : list, counts=None):
+        """Добавляет частоты ключей
+
+            Args:
+                keys (list): Ключи
+                counts (np.ndarray): Частота каждого ключа, по умолчанию 1
+        """
+        counts = np.ones(len(keys), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        columns = self.get_columns(keys)
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], counts)
+
+    def estimate(self, keys : list):
+        """Оценивает частоты ключей
+
+            Args:
+                keys (list): Ключи
+
+            Returns:
+                np.ndarray: Оценки частот
+
+        >>> sketch = CountMinSketch(64, 4)
+        >>> sketch.add(["Москва", "Казань", "Москва"])
+        >>> sketch.estimate(["Москва", "Казань"]).tolist()
+        [2, 1]
+        """
+        columns = self.get_columns(keys)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other):
+        """Объединяет два Count-Min с одинаковыми размерами
+
+            Args:
+                other (CountMinSketch): Второй Count-Min
+
+            Returns:
+                CountMinSketch: Общий Count-Min
+        """
+        return CountMinSketch(self.width, self.depth, self.table + other.table)
+
+    def to_list(self):
+        """Переводит Count-Min в список, который можно сохранить в json
+
+            Returns:
+                list: Ширина, глубина и таблица
+        """
+        return [self.width, self.depth, self.table.tolist()]
+
+    @staticmethod
+    def from_list(data : list):
+        """Создает Count-Min из списка, полученного методом to_list
+
+            Args:
+                data (list): Count-Min в виде списка
+
+            Returns:
+                CountMinSketch: Count-Min
+        """
+        return CountMinSketch(*data)
+
+
+class SpaceSaving:
+    """Класс Space-Saving для поиска самых частых ключей (например, городов) в ограниченной памяти.
+    Хранится не более capacity счетчиков. Для каждого ключа count - оценка сверху, count - error - оценка снизу,
+    ошибка не больше N / capacity. Для отслеживаемых ключей дополнительно хранится сумма значений
+    (например, зарплат), набранная пока ключ отслеживался, и число этих значений
+
+    Attributes:
+        capacity (int): Максимальное число счетчиков
+        counts (dict): Оценка частоты для каждого ключа
+        errors (dict): Максимальная ошибка оценки для каждого ключа
+        sums (dict): Сумма значений для каждого ключа
+        observed (dict): Число значений в sums для каждого ключа
+    """
+    def __init__(self, capacity : int = 100, counts : dict = None, errors : dict = None, sums : dict = None,
+                 observed : dict = None):
+        """Инициализирует объект SpaceSaving
+
+            Args:
+                capacity (int): Максимальное число счетчиков
+                counts (dict): Оценка частоты для каждого ключа
+                errors (dict): Максимальная ошибка оценки для каждого ключа
+                sums (dict): Сумма значений для каждого ключа
+                observed (dict): Число значений в sums для каждого ключа
+        """
+        self.capacity = capacity
+        self.counts = counts if counts is not None else {}
+        self.errors = errors if errors is not None else {}
+        self.sums = sums if sums is not None else {}
+        self.observed = observed if observed is not None else {}
+
+    def get_minimum(self):
+        """Возвращает частоту, которую может иметь любой неотслеживаемый ключ
+
+            Returns:
+                int: Наименьший счетчик, если все счетчики заняты, иначе 0
+        """
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other):
+        """Объединяет два Space-Saving: частоты складываются, неотслеживаемому ключу приписывается
+        наименьший счетчик, затем остаются capacity самых частых ключей
+
+            Args:
+                other (SpaceSaving): Второй Space-Saving
+
+            Returns:
+                SpaceSaving: Общий Space-Saving
+        """
+        first_minimum = self.get_minimum()
+        second_minimum = other.get_minimum()
+        keys = list(self.counts) + [key for key in other.counts if key not in self.counts]
+        counts = {key: self.counts.get(key, first_minimum) + other.counts.get(key, second_minimum) for key in keys}
+        kept = set(sorted(keys, key=lambda key: counts[key], reverse=True)[:self.capacity])
+        kept = [key for key in keys if key in kept]
+        return SpaceSaving(self.capacity,
+                           {key: counts[key] for key in kept},
+                           {key: self.errors.get(key, first_minimum) + other.errors.get(key, second_minimum) for key in kept},
+                           {key: self.sums.get(key, 0) + other.sums.get(key, 0) for key in kept},
+                           {key: self.observed.get(key, 0) + other.observed.get(key, 0) for key in kept})
+
+    def add(self, keys : list, counts, sums=None):
+        """Добавляет точные частоты и суммы значений для пакета ключей
+
+            Args:
+                keys (list): Ключи
+                counts (list): Частота каждого ключа
+                sums (list): Сумма значений для каждого ключа
+
+        >>> top = SpaceSaving(2)
+        >>> top.add(["Москва", "Казань", "Самара"], [10, 2, 1], [100.0, 20.0, 10.0])
+        >>> top.add(["Москва", "Самара"], [5, 4], [50.0, 40.0])
+        >>> top.top(2)
+        [('Москва', 15, 0, 150.0, 15), ('Самара', 6, 2, 40.0, 4)]
+        """
+        sums = sums if sums is not None else [0] * len(keys)
+        batch = SpaceSaving(len(keys) + 1, dict(zip(keys, counts)), dict.fromkeys(keys, 0), dict(zip(keys, sums)),
+                            dict(zip(keys, counts)))
+        merged = self.merge(batch)
+        self.counts, self.errors, self.sums, self.observed = merged.counts, merged.errors, merged.sums, merged.observed
+
+    def top(self, n : int):
+        """Возвращает самые частые ключи
+
+            Args:
+                n (int): Количество ключей
+
+            Returns:
+                list: Кортежи (ключ, оценка частоты, ошибка, сумма значений, число значений) по убыванию частоты
+        """
+        keys = sorted(self.counts, key=lambda key: self.counts[key], reverse=True)[:n]
+        return [(key, self.counts[key], self.errors[key], self.sums[key], self.observed[key]) for key in keys]
+
+    def to_list(self):
+        """Переводит Space-Saving в список, который можно сохранить в json
+
+            Returns:
+                list: Емкость и строки (ключ, частота, ошибка, сумма, число значений)
+        """
+        return [self.capacity, [list(row) for row in self.top(len(self.counts))]]
+
+    @staticmethod
+    def from_list(data : list):
+        """Создает Space-Saving из списка, полученного методом to_list
+
+            Args:
+                data (list): Space-Saving в виде списка
+
+            Returns:
+                SpaceSaving: Space-Saving
+        """
+        rows = data[1]
+        return SpaceSaving(data[0], {row[0]: row[1] for row in rows}, {row[0]: row[2] for row in rows},
+                           {row[0]: row[3] for row in rows}, {row[0]: row[4] for row in rows})
@@ -0,0 +1,220 @@
+import numpy as np
+from aggregation import encode
+from aho_corasick import AhoCorasick
+from stats_shard import add_dicts
+
+
+def split_skills(values):
+    """Разбивает столбец key_skills на навыки. Навыки в ячейке разделены переводом строки,
+    пустые навыки и повторы внутри одной вакансии отбрасываются
+
+        Args:
+            values (list): Значения столбца key_skills
+
+        Returns:
+            np.ndarray, np.ndarray: Номер вакансии для каждого навыка и сами навыки
+
+    >>> rows, skills = split_skills(["SQL\\nPython\\nSQL", "", "Git"])
+    >>> rows.tolist(), skills.tolist()
+    ([0, 0, 2], ['SQL', 'Python', 'Git'])
+    """
+    lists = [list(dict.fromkeys(skill.strip() for skill in value.split("\n") if skill.strip())) for value in values]
+    rows = np.repeat(np.arange(len(lists)), [len(skills) for skills in lists])
+    return rows, np.array([skill for skills in lists for skill in skills], dtype=object)
+
+
+def count_pairs(rows, codes, skills_count):
+    """Считает матрицу совместной встречаемости навыков X^T X, где X - матрица вакансия x навык.
+    Пары навыков каждой вакансии строятся векторно, матрица возвращается в формате CSR
+
+        Args:
+            rows (np.ndarray): Номер вакансии для каждого навыка, по неубыванию
+            codes (np.ndarray): Код каждого навыка
+            skills_count (int): Количество навыков в словаре
+
+        Returns:
+            np.ndarray, np.ndarray, np.ndarray: Массивы data, indices и indptr матрицы CSR
+
+    >>> data, indices, indptr = count_pairs(np.array([0, 0, 1]), np.array([0, 1, 1]), 2)
+    >>> data.tolist(), indices.tolist(), indptr.tolist()
+    ([1, 1, 1, 2], [0, 1, 0, 1], [0, 2, 4])
+    """
+    if len(rows) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(skills_count + 1, dtype=np.int64)
+    starts = np.searchsorted(rows, rows, side="left")
+    sizes = np.searchsorted(rows, rows, side="right") - starts
+    left = np.repeat(np.arange(len(rows)), sizes)
+    right = np.repeat(starts, sizes) + np.arange(len(left)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    keys, data = np.unique(codes[left] * skills_count + codes[right], return_counts=True)
+    return data, keys % skills_count, np.searchsorted(keys // skills_count, np.arange(skills_count + 1))
+
+
+class SkillStats:
+    """Класс статистики ключевых навыков: частоты навыков по годам и по профессиям
+    и матрица совместной встречаемости навыков в формате CSR. Части объединяются методом merge,
+    поэтому файлы можно обрабатывать параллельно
+
+    Attributes:
+        prof_names (list): Профессии, для которых считаются частоты
+        skills (list): Словарь навыков, номер навыка - строка и столбец матрицы
+        years (dict): Частоты навыков по годам
+        professions (dict): Для каждой профессии частоты навыков по годам
+        data (np.ndarray): Значения матрицы совместной встречаемости
+        indices (np.ndarray): Номера столбцов значений матрицы
+        indptr (np.ndarray): Начала строк матрицы
+    """
+    def __init__(self, prof_names=(), skills=None, years=None, professions=None, data=None, indices=None, indptr=None):
+        """Инициализирует объект SkillStats
+
+            Args:
+                prof_names (list): Профессии, для которых считаются частоты
+                skills (list): Словарь навыков
+                years (dict): Частоты навыков по годам
+                professions (dict): Для каждой профессии частоты навыков по годам
+                data (np.ndarray): Значения матрицы совместной встречаемости
+                indices (np.ndarray): Номера столбцов значений матрицы
+                indptr (np.ndarray): Начала строк матрицы
+        """
+        self.prof_names = list(prof_names)
+        self.skills = list(skills) if skills is not None else []
+        self.years = years if years is not None else {}
+        self.professions = professions if professions is not None else {prof_name: {} for prof_name in self.prof_names}
+        self.data = data if data is not None else np.zeros(0, dtype=np.int64)
+        self.indices = indices if indices is not None else np.zeros(0, dtype=np.int64)
+        self.indptr = indptr if indptr is not None else np.zeros(len(self.skills) + 1, dtype=np.int64)
+
+    @staticmethod
+    def count_years(years, codes, skills):
+        """Считает частоты навыков по годам по кодам навыков
+
+            Args:
+                years (np.ndarray): Год для каждого навыка
+                codes (np.ndarray): Код каждого навыка
+                skills (np.ndarray): Словарь навыков
+
+            Returns:
+                dict: Для каждого года словарь навык - количество вакансий
+        """
+        result = {}
+        for year in np.unique(years).tolist():
+            counts = np.bincount(codes[years == year], minlength=len(skills))
+            found = np.flatnonzero(counts)
+            result[year] = dict(zip(skills[found].tolist(), counts[found].tolist()))
+        return result
+
+    @staticmethod
+    def build(names, key_skills, years, prof_names=()):
+        """Считает статистику навыков по пакету вакансий
+
+            Args:
+                names (np.ndarray): Названия вакансий
+                key_skills (list): Значения столбца key_skills
+                years (np.ndarray): Годы публикации вакансий
+                prof_names (list): Профессии, для которых считаются частоты
+
+            Returns:
+                SkillStats: Статистика навыков
+
+        >>> stats = SkillStats.build(np.array(["Python-программист", "Аналитик"], dtype=object),
+        ...                          ["Python\\nSQL", "SQL\\nExcel"], np.array([2022, 2022]), ["программист"])
+        >>> stats.top(2022), stats.top(2022, "программист")
+        ([('SQL', 2), ('Excel', 1), ('Python', 1)], [('Python', 1), ('SQL', 1)])
+        >>> stats.get_related("SQL")
+        [('Excel', 1), ('Python', 1)]
+        """
+        prof_names = list(dict.fromkeys(prof_names))
+        rows, skills = split_skills(key_skills)
+        uniques, codes = encode(skills) if len(skills) != 0 else (np.zeros(0, dtype=object), np.zeros(0, dtype=np.int64))
+        skill_years = np.asarray(years)[rows]
+        matches = AhoCorasick(prof_names).match_matrix(np.asarray(names).tolist())
+        professions = {prof_name: SkillStats.count_years(skill_years[matches[rows, number]], codes[matches[rows, number]],
+                                                         uniques)
+                       for number, prof_name in enumerate(prof_names)}
+        data, indices, indptr = count_pairs(rows, codes, len(uniques))
+        return SkillStats(prof_names, uniques.tolist(), SkillStats.count_years(skill_years, codes, uniques), professions,
+                          data, indices, indptr)
+
+    def to_coo(self, skills : list):
+        """Переводит матрицу в пары номеров навыков другого словаря
+
+            Args:
+                skills (list): Словарь, в котором есть все навыки этой статистики
+
+            Returns:
+                np.ndarray, np.ndarray, np.ndarray: Строки, столбцы и значения матрицы
+        """
+        known = {skill: code for code, skill in enumerate(skills)}
+        remap = np.array([known[skill] for skill in self.skills], dtype=np.int64)
+        rows = np.repeat(np.arange(len(self.skills)), np.diff(self.indptr))
+        return remap[rows], remap[self.indices], self.data
+
+    def merge(self, other):
+        """Объединяет статистику навыков, посчитанную по разным частям данных
+
+            Args:
+                other (SkillStats): Вторая статистика
+
+            Returns:
+                SkillStats: Общая статистика
+        """
+        skills = list(dict.fromkeys(self.skills + other.skills))
+        first_rows, first_columns, first_data = self.to_coo(skills)
+        second_rows, second_columns, second_data = other.to_coo(skills)
+        keys = np.concatenate([first_rows, second_rows]) * len(skills) + np.concatenate([first_columns, second_columns])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        data = np.bincount(inverse.ravel(), weights=np.concatenate([first_data, second_data]),
+                           minlength=len(keys)).astype(np.int64)
+        years = {year: add_dicts(self.years.get(year, {}), other.years.get(year, {}))
+                 for year in sorted(set(self.years) | set(other.years))}
+        professions = {prof_name: {year: add_dicts(self.professions[prof_name].get(year, {}),
+                                                   other.professions.get(prof_name, {}).get(year, {}))
+                                   for year in sorted(set(self.professions[prof_name]) |
+                                                      set(other.professions.get(prof_name, {})))}
+                       for prof_name in self.prof_names}
+        return SkillStats(self.prof_names, skills, years, professions, data, keys % max(len(skills), 1),
+                          np.searchsorted(keys // max(len(skills), 1), np.arange(len(skills) + 1)))
+
+    def top(self, year : int, prof_name : str = None, n : int = 10):
+        """Возвращает самые частые навыки года
+
+            Args:
+                year (int): Год
+                prof_name (str): Профессия из prof_names, None для всех вакансий
+                n (int): Количество навыков
+
+            Returns:
+                list: Пары (навык, количество вакансий) по убыванию количества
+        """
+        counts = self.years if prof_name is None else self.professions[prof_name]
+        return sorted(counts.get(year, {}).items(), key=lambda item: (-item[1], item[0]))[:n]
+
+    def get_related(self, skill : str, n : int = 10):
+        """Возвращает навыки, чаще всего встречающиеся вместе с выбранным
+
+            Args:
+                skill (str): Навык
+                n (int): Количество навыков
+
+            Returns:
+                list: Пары (навык, количество совместных вакансий) по убыванию количества
+        """
+        if skill not in self.skills:
+            return []
+        row = self.skills.index(skill)
+        start, end = self.indptr[row], self.indptr[row + 1]
+        pairs = [(self.skills[column], count) for column, count in
+                 zip(self.indices[start:end].tolist(), self.data[start:end].tolist()) if column != row]
+        return sorted(pairs, key=lambda item: (-item[1], item[0]))[:n]
+
+    def get_matrix(self):
+        """Возвращает матрицу совместной встречаемости как scipy.sparse.csr_matrix,
+        если SciPy не установлен - тройку массивов (data, indices, indptr)
+
+            Returns:
+                object: Матрица совместной встречаемости
+        """
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError:
+            return self.data, self.indices, self.indptr
+        return csr_matrix((self.data, self.indices, self.indptr), shape=(len(self.skills), len(self.skills)))
@@ -0,0 +1,351 @@
+import copy
+import json
+import zlib
+from sketches import TDigest, CountMinSketch, SpaceSaving, merge_digests, default_quantiles
+
+
+def add_dicts(first : dict, second : dict):
+    """Складывает значения двух словарей по ключам, порядок ключей первого словаря сохраняется
+
+        Args:
+            first (dict): Первый словарь
+            second (dict): Второй словарь
+
+        Returns:
+            dict: Новый словарь с суммами
+
+    >>> add_dicts({"a": 1, "b": 2}, {"b": 3, "c": 4})
+    {'a': 1, 'b': 5, 'c': 4}
+    """
+    result = dict(first)
+    for key, value in second.items():
+        result[key] = result.get(key, 0) + value
+    return result
+
+
+def merge_optional(first, second):
+    """Объединяет два необязательных скетча, если одного нет, возвращается другой
+
+        Args:
+            first (object): Первый скетч или None
+            second (object): Второй скетч или None
+
+        Returns:
+            object: Общий скетч или None
+    """
+    if first is None or second is None:
+        return first if first is not None else second
+    return first.merge(second)
+
+
+class StatsShard:
+    """Класс для частичной статистики по вакансиям: файлу, диапазону байт или целой машине.
+    Части объединяются ассоциативным методом merge, поэтому их можно складывать в любом порядке разбиения,
+    и сохраняются в компактном виде методом dumps.
+
+    Attributes:
+        total (int): Число вакансий
+        salary (dict): Сумма зарплат по годам
+        amount (dict): Количество вакансий по годам
+        cities_salary (dict): Сумма зарплат по городам
+        cities_amount (dict): Количество вакансий по городам
+        professions (dict): Для каждой профессии пара словарей: сумма зарплат и количество вакансий по годам
+        year_digests (dict): t-digest зарплат по годам
+        city_digests (dict): t-digest зарплат по городам
+        profession_digests (dict): Для каждой профессии t-digest зарплат по годам
+        city_top (SpaceSaving): Самые частые города в режиме top-K, тогда cities_salary и cities_amount пустые
+        city_counts (CountMinSketch): Приближенные количества вакансий для любого города в режиме top-K
+    """
+    def __init__(self, total : int = 0, salary : dict = None, amount : dict = None, cities_salary : dict = None,
+                 cities_amount : dict = None, professions : dict = None, year_digests : dict = None,
+                 city_digests : dict = None, profession_digests : dict = None, city_top : SpaceSaving = None,
+                 city_counts : CountMinSketch = None):
+        """Инициализирует объект StatsShard
+
+            Args:
+                total (int): Число вакансий
+                salary (dict): Сумма зарплат по годам
+                amount (dict): Количество вакансий по годам
+                cities_salary (dict): Сумма зарплат по городам
+                cities_amount (dict): Количество вакансий по городам
+                professions (dict): Для каждой профессии пара словарей: сумма зарплат и количество вакансий по годам
+                year_digests (dict): t-digest зарплат по годам
+                city_digests (dict): t-digest зарплат по городам
+                profession_digests (dict): Для каждой профессии t-digest зарплат по годам
+                city_top (SpaceSaving): Самые частые города в режиме top-K
+                city_counts (CountMinSketch): Приближенные количества вакансий для любого города в режиме top-K
+        """
+        self.total = total
+        self.salary = salary if salary is not None else {}
+        self.amount = amount if amount is not None else {}
+        self.cities_salary = cities_salary if cities_salary is not None else {}
+        self.cities_amount = cities_amount if cities_amount is not None else {}
+        self.professions = professions if professions is not None else {}
+        self.year_digests = year_digests if year_digests is not None else {}
+        self.city_digests = city_digests if city_digests is not None else {}
+        self.profession_digests = profession_digests if profession_digests is not None else {}
+        self.city_top = city_top
+        self.city_counts = city_counts
+
+    def to_top_k(self, capacity : int = 100, width : int = 2048, depth : int = 4):
+        """Переводит точную статистику по городам в режим top-K: вместо словарей всех городов
+        хранятся Space-Saving самых частых городов и Count-Min для остальных,
+        t-digest остаются только у отслеживаемых городов
+
+            Args:
+                capacity (int): Число отслеживаемых городов
+                width (int): Ширина таблицы Count-Min
+                depth (int): Глубина таблицы Count-Min
+
+        >>> shard = StatsShard(3, cities_salary={"Москва": 20.0, "Казань": 5.0}, cities_amount={"Москва": 2, "Казань": 1})
+        >>> shard.to_top_k(1)
+        >>> shard.city_top.top(1), shard.cities_amount, shard.city_counts.estimate(["Казань"]).tolist()
+        ([('Москва', 2, 0, 20.0, 2)], {}, [1])
+        """
+        cities = list(self.cities_amount)
+        self.city_top = SpaceSaving(capacity)
+        self.city_top.add(cities, [self.cities_amount[city] for city in cities],
+                          [self.cities_salary[city] for city in cities])
+        self.city_counts = CountMinSketch(width, depth)
+        self.city_counts.add(cities, [self.cities_amount[city] for city in cities])
+        self.cities_salary = {}
+        self.cities_amount = {}
+        self.city_digests = {city: digest for city, digest in self.city_digests.items() if city in self.city_top.counts}
+
+    def as_top_k(self, other):
+        """Возвращает часть статистики в режиме top-K с такими же размерами скетчей, как у other.
+        Если часть уже в режиме top-K, она возвращается без изменений
+
+            Args:
+                other (StatsShard): Часть статистики в режиме top-K
+
+            Returns:
+                StatsShard: Часть статистики в режиме top-K
+
+        >>> other = StatsShard(1, cities_salary={"Казань": 5.0}, cities_amount={"Казань": 1})
+        >>> other.to_top_k(1, 64, 2)
+        >>> shard = StatsShard(2, cities_salary={"Москва": 20.0}, cities_amount={"Москва": 2}).as_top_k(other)
+        >>> shard.city_top.capacity, shard.city_counts.width, shard.cities_amount
+        (1, 64, {})
+        """
+        if self.city_top is not None:
+            return self
+        shard = copy.copy(self)
+        shard.to_top_k(other.city_top.capacity, other.city_counts.width, other.city_counts.depth)
+        return shard
+
+    @staticmethod
+    def from_years(prof_name : str, years : list, total : int):
+        """Создает часть статистики из статистических данных по годам (результат DataWorker.get_years_data)
+
+            Args:
+                prof_name (str): Имя выбранной профессии, None чтобы не сохранять данные по профессии
+                years (list): Статистические данные по годам
+                total (int): Число вакансий
+
+            Returns:
+                StatsShard: Часть статистики
+
+        >>> shard = StatsShard.from_years("Программист", [[2007, 300.0, 2, 100.0, 1, {"Москва": 300.0}, {"Москва": 2}]], 2)
+        >>> shard.amount, shard.professions
+        ({2007: 2}, {'Программист': [{2007: 100.0}, {2007: 1}]})
+        """
+        shard = StatsShard(total)
+        if prof_name is not None:
+            shard.professions[prof_name] = [{}, {}]
+        for year in years:
+            shard.salary[year[0]] = year[1]
+            shard.amount[year[0]] = year[2]
+            if prof_name is not None:
+                shard.professions[prof_name][0][year[0]] = year[3]
+                shard.professions[prof_name][1][year[0]] = year[4]
+            shard.cities_salary = add_dicts(shard.cities_salary, year[5])
+            shard.cities_amount = add_dicts(shard.cities_amount, year[6])
+        return shard
+
+    def merge(self, other):
+        """Объединяет две части статистики, исходные части не изменяются.
+        Если только одна часть в режиме top-K, другая сначала переводится в режим top-K,
+        у общей части t-digest остаются только у отслеживаемых городов
+
+            Args:
+                other (StatsShard): Вторая часть статистики
+
+            Returns:
+                StatsShard: Общая статистика
+
+        >>> first = StatsShard(1, {2007: 10.0}, {2007: 1}, {"Москва": 10.0}, {"Москва": 1}, {"Аналитик": [{}, {}]})
+        >>> second = StatsShard(1, {2007: 20.0}, {2007: 1}, {"Казань": 20.0}, {"Казань": 1}, {"Аналитик": [{2007: 20.0}, {2007: 1}]})
+        >>> merged = first.merge(second)
+        >>> merged.total, merged.salary, merged.cities_amount, merged.professions
+        (2, {2007: 30.0}, {'Москва': 1, 'Казань': 1}, {'Аналитик': [{2007: 20.0}, {2007: 1}]})
+        """
+        if self.city_top is not None or other.city_top is not None:
+            first = self.as_top_k(other)
+            second = other.as_top_k(self)
+            if first is not self or second is not other:
+                return first.merge(second)
+        professions = {}
+        for prof_name in list(self.professions) + [name for name in other.professions if name not in self.professions]:
+            first = self.professions.get(prof_name, [{}, {}])
+            second = other.professions.get(prof_name, [{}, {}])
+            professions[prof_name] = [add_dicts(first[0], second[0]), add_dicts(first[1], second[1])]
+        profession_digests = dict(self.profession_digests)
+        for prof_name, digests in other.profession_digests.items():
+            profession_digests[prof_name] = merge_digests(profession_digests.get(prof_name, {}), digests)
+        city_top = merge_optional(self.city_top, other.city_top)
+        city_digests = merge_digests(self.city_digests, other.city_digests)
+        if city_top is not None:
+            city_digests = {city: digest for city, digest in city_digests.items() if city in city_top.counts}
+        return StatsShard(self.total + other.total,
+                          add_dicts(self.salary, other.salary),
+                          add_dicts(self.amount, other.amount),
+                          add_dicts(self.cities_salary, other.cities_salary),
+                          add_dicts(self.cities_amount, other.cities_amount),
+                          professions,
+                          merge_digests(self.year_digests, other.year_digests),
+                          city_digests,
+                          profession_digests,
+                          city_top,
+                          merge_optional(self.city_counts, other.city_counts))
+
+    @staticmethod
+    def reduce(shards : list):
+        """Объединяет список частей статистики попарно, как дерево
+
+            Args:
+                shards (list): Части статистики
+
+            Returns:
+                StatsShard: Общая статистика
+        """
+        shards = list(shards)
+        if len(shards) == 0:
+            return StatsShard()
+        while len(shards) > 1:
+            merged = [shards[i].merge(shards[i + 1]) for i in range(0, len(shards) - 1, 2)]
+            shards = merged + ([shards[-1]] if len(shards) % 2 == 1 else [])
+        return shards[0]
+
+    def to_dict(self):
+        """Переводит часть статистики в словарь, который можно сохранить в json
+
+            Returns:
+                dict: Часть статистики, годы записаны в виде отдельных списков
+        """
+        years = sorted(self.amount)
+        return {"total": self.total, "years": years,
+                "salary": [self.salary[year] for year in years],
+                "amount": [self.amount[year] for year in years],
+                "cities": list(self.cities_amount),
+                "cities_salary": [self.cities_salary[city] for city in self.cities_amount],
+                "cities_amount": list(self.cities_amount.values()),
+                "professions": {prof_name: [list(values[0].items()), list(values[1].items())]
+                                for prof_name, values in self.professions.items()},
+                "year_digests": [[year, digest.to_list()] for year, digest in self.year_digests.items()],
+                "city_digests": [[city, digest.to_list()] for city, digest in self.city_digests.items()],
+                "profession_digests": {prof_name: [[year, digest.to_list()] for year, digest in digests.items()]
+                                       for prof_name, digests in self.profession_digests.items()},
+                "city_top": self.city_top.to_list() if self.city_top is not None else None,
+                "city_counts": self.city_counts.to_list() if self.city_counts is not None else None}
+
+    @staticmethod
+    def from_dict(data : dict):
+        """Создает часть статистики из словаря, полученного методом to_dict
+
+            Args:
+                data (dict): Часть статистики в виде словаря
+
+            Returns:
+                StatsShard: Часть статистики
+        """
+        return StatsShard(data["total"],
+                          dict(zip(data["years"], data["salary"])),
+                          dict(zip(data["years"], data["amount"])),
+                          dict(zip(data["cities"], data["cities_salary"])),
+                          dict(zip(data["cities"], data["cities_amount"])),
+                          {prof_name: [{year: value for year, value in values[0]}, {year: value for year, value in values[1]}]
+                           for prof_name, values in data["professions"].items()},
+                          {year: TDigest.from_list(digest) for year, digest in data.get("year_digests", [])},
+                          {city: TDigest.from_list(digest) for city, digest in data.get("city_digests", [])},
+                          {prof_name: {year: TDigest.from_list(digest) for year, digest in digests}
+                           for prof_name, digests in data.get("profession_digests", {}).items()},
+                          SpaceSaving.from_list(data["city_top"]) if data.get("city_top") is not None else None,
+                          CountMinSketch.from_list(data["city_counts"]) if data.get("city_counts") is not None else None)
+
+    def dumps(self):
+        """Сохраняет часть статистики в компактном виде: сжатый json
+
+            Returns:
+                bytes: Часть статистики
+
+        >>> shard = StatsShard(1, {2007: 10.0}, {2007: 1}, {"Москва": 10.0}, {"Москва": 1}, {"Аналитик": [{2007: 0}, {2007: 0}]})
+        >>> StatsShard.loads(shard.dumps()).to_dict() == shard.to_dict()
+        True
+        """
+        return zlib.compress(json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    @staticmethod
+    def loads(data : bytes):
+        """Читает часть статистики, сохраненную методом dumps
+
+            Args:
+                data (bytes): Часть статистики
+
+            Returns:
+                StatsShard: Часть статистики
+        """
+        return StatsShard.from_dict(json.loads(zlib.decompress(data).decode("utf-8")))
+
+    def to_report_data(self, prof_name : str):
+        """Возвращает данные для print_data по выбранной профессии
+
+            Args:
+                prof_name (str): Имя выбранной профессии
+
+            Returns:
+                dict: Статистические данные: суммы зарплат и количества вакансий
+        """
+        years = sorted(self.amount)
+        profession = self.professions.get(prof_name, [{}, {}])
+        return {"salary": {year: self.salary[year] for year in years},
+                "amount": {year: self.amount[year] for year in years},
+                "salary_prof": {year: profession[0].get(year, 0) for year in years},
+                "amount_prof": {year: profession[1].get(year, 0) for year in years},
+                "salary_city": self.get_cities()[0],
+                "amount_city": self.get_cities()[1]}
+
+    def get_cities(self):
+        """Возвращает суммы зарплат и количества вакансий по городам.
+        В режиме top-K возвращаются только отслеживаемые города: количество - оценка Space-Saving,
+        сумма зарплат пересчитана по средней зарплате, набранной пока город отслеживался
+
+            Returns:
+                dict, dict: Суммы зарплат и количества вакансий по городам
+        """
+        if self.city_top is None:
+            return dict(self.cities_salary), dict(self.cities_amount)
+        rows = self.city_top.top(self.city_top.capacity)
+        return ({row[0]: row[3] / row[4] * row[1] for row in rows if row[4] != 0},
+                {row[0]: row[1] for row in rows if row[4] != 0})
+
+    def get_quantiles(self, prof_name : str, quantiles : tuple = default_quantiles):
+        """Возвращает квантили зарплат по годам, по городам и по годам для выбранной профессии
+
+            Args:
+                prof_name (str): Имя выбранной профессии
+                quantiles (tuple): Уровни квантилей
+
+            Returns:
+                dict, dict, dict: Квантили по годам, по городам и по годам для профессии
+
+        >>> shard = StatsShard(year_digests={2007: TDigest()})
+        >>> shard.year_digests[2007].add([10.0, 20.0, 30.0])
+        >>> shard.get_quantiles("Аналитик", (0.5,))[0]
+        {2007: [20]}
+        """
+        def to_quantiles(digests):
+            return {key: [int(digests[key].quantile(q)) for q in quantiles] for key in digests}
+        return (to_quantiles({year: self.year_digests[year] for year in sorted(self.year_digests)}),
+                to_quantiles(self.city_digests),
+                to_quantiles(self.profession_digests.get(prof_name, {})))
@@ -1,5 +1,37 @@
 from unittest import TestCase
-from main import Salary, Vacancy
+import os
+import shutil
+import tempfile
+from main import Salary, Vacancy, VacancyRow, CSVReader, DataWorker, read_get_data, read_get_data_incremental, \
+    read_skills, get_futures_shard, get_cube, print_data
+from vacancy_columns import ColumnsReader, split_ranges
+from dataset_cache import DatasetCache
+from ingest import open_reader
+from validation import RowValidator
+from stats_shard import StatsShard
+from sketches import TDigest, SpaceSaving, CountMinSketch
+from cube import AggregateCube
+from skills import SkillStats
+from result_cache import ResultCache
+from vacancy_columns import VacancyColumns
+import numpy as np
+
+
+csv_header = "name,salary_from,salary_to,salary_currency,area_name,published_at\n"
+
+
+def write_temp_csv(test, text, encoding="utf-8-sig"):
+    file = tempfile.NamedTemporaryFile("w", suffix=".csv", encoding=encoding, newline="", delete=False)
+    file.write(text)
+    file.close()
+    test.addCleanup(os.remove, file.name)
+    return file.name
+
+
+def make_temp_folder(test):
+    folder = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, folder, ignore_errors=True)
+    return folder
 
 class SalaryTests(TestCase):
     def test_salary_type(self):
@@ -72,4 +104,441 @@ class VacancyTest(TestCase):
     def test_vacancy_experience_to_list(self):
         self.assertEqual(Vacancy("x", "<br><b>x</b>yz</br>", 'z', "between3And6", "true", "x", Salary("100", "2000", "true", "RUR"), "x",
                                  "2007-12-03T17:40:09+0300").to_list(),
-        ['x', 'xyz', 'z', 'От 3 до 6 лет', 'Да', 'x', '100 - 2 000 (Рубли) (Без вычета налогов)', 'x', '03.12.2007'])
\ No newline at end of file
+        ['x', 'xyz', 'z', 'От 3 до 6 лет', 'Да', 'x', '100 - 2 000 (Рубли) (Без вычета налогов)', 'x', '03.12.2007'])
+
+class ColumnsReaderTests(TestCase):
+    def setUp(self):
+        self.file_name = write_temp_csv(self, csv_header +
+                                        "Программист,100.0,200.0,RUR,Москва,2007-12-03T17:40:09+0300\n"
+                                        "\"Аналитик, BI\",300.0,,EUR,Казань,2008-01-03T17:40:09+0300\n"
+                                        "битая строка,1\n")
+
+    def test_columns_values(self):
+        columns = ColumnsReader(self.file_name).read()
+        self.assertEqual(columns.name.tolist(), ["Программист", "Аналитик, BI"])
+        self.assertEqual(columns.salary_from.tolist(), [100.0, 300.0])
+        self.assertEqual(columns.salary_currency.tolist(), ["RUR", "EUR"])
+        self.assertEqual(columns.year.tolist(), [2007, 2008])
+        self.assertEqual(columns.month.tolist(), [12, 1])
+
+    def test_columns_rows(self):
+        vacancy = VacancyRow.rows(ColumnsReader(self.file_name).read())[0]
+        self.assertEqual(vacancy.salary.salary_currency, "RUR")
+        self.assertEqual(vacancy.date_get_year(), 2007)
+        self.assertEqual(vacancy.to_list(), ['Программист', '', '', '', '', '', '100 - 200 (Рубли) ()', 'Москва', '03.12.2007'])
+
+    def test_vacancy_slots(self):
+        vacancy = Vacancy("x", "y", 'z', "noExperience", "true", "x", Salary("100", "2000", "true", "RUR"), "x",
+                          "2007-12-03T17:40:09+0300")
+        self.assertFalse(hasattr(vacancy, "__dict__"))
+        self.assertFalse(hasattr(vacancy.salary, "__dict__"))
+
+    def test_columns_batches(self):
+        batches = list(ColumnsReader(self.file_name, batch_size=1).read_batches())
+        self.assertEqual([len(batch) for batch in batches], [1, 1])
+
+    def test_columns_read_parallel(self):
+        columns = ColumnsReader(self.file_name).read_parallel(workers=2)
+        self.assertEqual(columns.name.tolist(), ["Программист", "Аналитик, BI"])
+        self.assertEqual(columns.year.tolist(), [2007, 2008])
+
+    def test_columns_rejects(self):
+        reader = ColumnsReader(self.file_name)
+        reader.read_parallel(workers=2)
+        self.assertEqual(reader.rejects, {"columns": 1, "empty": 0, "salary": 0, "currency": 0, "bad_date": 0})
+
+    def test_columns_rejects_after_read(self):
+        reader = ColumnsReader(self.file_name)
+        reader.read()
+        reader.read_parallel(workers=2)
+        self.assertEqual(reader.rejects, {"columns": 2, "empty": 0, "salary": 0, "currency": 0, "bad_date": 0})
+
+
+class RowValidatorTests(TestCase):
+    def test_validator_reasons(self):
+        fields = ["name", "salary_from", "salary_to", "salary_currency", "area_name"]
+        validator = RowValidator(len(fields), {field: i for i, field in enumerate(fields)}, fields)
+        rows = validator.check([["a", "1", "2", "RUR", "Москва"], ["b", "", "2", "RUR", "Москва"],
+                                ["c", "1", "две", "RUR", "Москва"], ["d", "1", "2", "XXX", "Москва"], ["e", "1"]])
+        self.assertEqual(rows, [["a", "1", "2", "RUR", "Москва"]])
+        self.assertEqual(validator.rejects, {"columns": 1, "empty": 1, "salary": 1, "currency": 1, "bad_date": 0})
+
+    def test_validator_bad_date(self):
+        file_name = write_temp_csv(self, csv_header +
+                                   "Программист,100.0,200.0,RUR,Москва,2007-12-03T17:40:09+0300\n"
+                                   "Программист,100.0,200.0,RUR,Москва,2007-1-3\n"
+                                   "Программист,100.0,200.0,RUR,Москва,вчера\n")
+        reader = ColumnsReader(file_name)
+        self.assertEqual(reader.read().year.tolist(), [2007])
+        self.assertEqual(reader.rejects["bad_date"], 2)
+
+    def test_get_columns_empty_file(self):
+        file_name = write_temp_csv(self, csv_header)
+        year, columns = CSVReader().get_columns(file_name)
+        self.assertEqual((year, len(columns)), (None, 0))
+
+
+class SplitRangesTests(TestCase):
+    def test_split_ranges_multiline_field(self):
+        data = b'name,area_name\n"a\nb\nc\nd",x\ne,y\nf,z\n'
+        self.assertEqual(split_ranges(data, 15, 4), [(15, 27), (27, 31), (31, 35)])
+
+    def test_split_ranges_cover_file(self):
+        data = b'h\n' + b'x,"1\n2"\n' * 50
+        ranges = split_ranges(data, 2, 7)
+        self.assertEqual(ranges[0][0], 2)
+        self.assertEqual(ranges[-1][1], len(data))
+        self.assertTrue(all(data[end - 3:end] == b'2"\n' for _, end in ranges))
+
+
+class DatasetCacheTests(TestCase):
+    def setUp(self):
+        self.folder = make_temp_folder(self)
+        self.file_name = write_temp_csv(self, csv_header +
+                                        "Программист,100.0,200.0,RUR,Москва,2007-12-03T17:40:09+0300\n")
+
+    def test_cache_load_same_columns(self):
+        cache = DatasetCache(self.folder)
+        first = cache.load(self.file_name)
+        second = cache.load(self.file_name)
+        self.assertTrue(cache.is_valid(self.file_name))
+        self.assertEqual(first.name.tolist(), second.name.tolist())
+        self.assertEqual(second.salary_to.tolist(), [200.0])
+
+    def test_cache_text_codes(self):
+        with open(self.file_name, "a", encoding="utf-8") as file:
+            file.write("Аналитик,1,2,RUR,Казань,2008-01-03T17:40:09+0300\n"
+                       "Программист,1,2,RUR,Москва,2008-01-04T17:40:09+0300\n")
+        cache = DatasetCache(self.folder)
+        cache.load(self.file_name)
+        with np.load(cache.get_paths(self.file_name)[0]) as data:
+            self.assertEqual(data["area_name_values"].tolist(), ["Казань", "Москва"])
+            self.assertEqual(data["area_name_codes"].tolist(), [1, 0, 1])
+        columns = cache.load(self.file_name)
+        self.assertEqual(columns.area_name.tolist(), ["Москва", "Казань", "Москва"])
+        self.assertEqual(columns.name.dtype, object)
+
+    def test_cache_invalidated_on_change(self):
+        cache = DatasetCache(self.folder)
+        cache.load(self.file_name)
+        with open(self.file_name, "a", encoding="utf-8") as file:
+            file.write("Аналитик,1,2,RUR,Казань,2008-01-03T17:40:09+0300\n")
+        self.assertFalse(cache.is_valid(self.file_name))
+        self.assertEqual(len(cache.load(self.file_name)), 2)
+
+    def test_cache_trigram_index(self):
+        cache = DatasetCache(self.folder)
+        index = cache.load_index(self.file_name, cache.load(self.file_name))
+        self.assertTrue(os.path.exists(cache.get_index_path(self.file_name)))
+        self.assertEqual(index.search("грамм").tolist(), [0])
+        with open(self.file_name, "a", encoding="utf-8") as file:
+            file.write("Программист 1С,1,2,RUR,Казань,2008-01-03T17:40:09+0300\n")
+        columns = cache.load(self.file_name)
+        self.assertFalse(os.path.exists(cache.get_index_path(self.file_name)))
+        self.assertEqual(cache.load_index(self.file_name, columns).search("Программист").tolist(), [0, 1])
+
+
+class IngestTests(TestCase):
+    def test_ingest_hh_unloading(self):
+        file_name = write_temp_csv(self, "Column1;name;salary_from;salary_to;salary_currency;area_name;published_at\n"
+                                   "0;Тестировщик;40000;None;RUR;Самара;01.12.2022 0:38\n", encoding="cp1251")
+        reader = open_reader(file_name)
+        columns = reader.read()
+        self.assertEqual((reader.encoding, reader.delimiter, reader.date_format), ("cp1251", ";", "dmy"))
+        self.assertEqual(columns.name.tolist(), ["Тестировщик"])
+        self.assertEqual(columns.salary_from.tolist(), [40000.0])
+        self.assertEqual((columns.year.tolist(), columns.month.tolist(), columns.day.tolist()), ([2022], [12], [1]))
+
+    def test_ingest_single_salary(self):
+        file_name = write_temp_csv(self, ",name,salary,area_name,published_at\n"
+                                   "0,Инженер,18000.0,Москва,2007-10-27T12:09:02+0400\n", encoding="utf-8")
+        columns = open_reader(file_name).read()
+        self.assertEqual((columns.salary_from.tolist(), columns.salary_to.tolist()), ([18000.0], [18000.0]))
+        self.assertEqual(columns.salary_currency.tolist(), ["RUR"])
+
+    def test_statistics_both_layouts(self):
+        hh_file = write_temp_csv(self, "Column1;name;salary_from;salary_to;salary_currency;area_name;published_at\n"
+                                 "0;Программист;40000;None;RUR;Самара;01.12.2022 0:38\n"
+                                 "1;Аналитик;None;60000;RUR;Уфа;02.12.2022 2:00\n", encoding="cp1251")
+        api_file = write_temp_csv(self, csv_header +
+                                  "Программист Python,,100000,RUR,Москва,2022-12-22T00:19:19+0300\n"
+                                  "Аналитик,20000,40000,RUR,Москва,2022-12-22T00:34:54+0300\n", encoding="utf-8")
+        for cache_folder in (None, make_temp_folder(self)):
+            shard = get_futures_shard([hh_file, api_file], "Программист", cache_folder, use_processes=False)
+            self.assertEqual(shard.total, 4)
+            self.assertEqual((shard.salary, shard.amount), ({2022: 230000.0}, {2022: 4}))
+            self.assertEqual(shard.professions["Программист"], [{2022: 140000.0}, {2022: 2}])
+            salary_data, _ = print_data(shard.to_report_data("Программист"), shard.total)
+            self.assertEqual((salary_data[1], salary_data[3]), ({2022: 57500}, {2022: 70000}))
+
+
+class StatisticsTests(TestCase):
+    def test_read_get_data_sums(self):
+        file_name = write_temp_csv(self, csv_header +
+                                   "Программист,100.0,200.0,RUR,Москва,2007-12-03T17:40:09+0300\n"
+                                   "Аналитик,300.0,500.0,RUR,Москва,2007-12-04T17:40:09+0300\n")
+        shard = read_get_data("Программист", None, file_name)
+        self.assertEqual(shard.total, 2)
+        self.assertEqual((shard.salary, shard.amount), ({2007: 550.0}, {2007: 2}))
+        self.assertEqual(shard.professions, {"Программист": [{2007: 150.0}, {2007: 1}]})
+        self.assertEqual((shard.cities_salary, shard.cities_amount), ({"Москва": 550.0}, {"Москва": 2}))
+
+    def test_get_years_data_groups(self):
+        file_name = write_temp_csv(self, csv_header +
+                                   "Программист,100.0,200.0,EUR,Казань,2008-12-03T17:40:09+0300\n"
+                                   "Аналитик,300.0,500.0,RUR,Москва,2007-12-04T17:40:09+0300\n"
+                                   "Программист 1С,10.0,20.0,RUR,Москва,2008-12-04T17:40:09+0300\n")
+        columns = ColumnsReader(file_name).read()
+        years = DataWorker().get_years_data("Программист", columns)
+        self.assertEqual([year[:5] for year in years], [[2007, 400.0, 1, 0.0, 0], [2008, 150 * 59.9 + 15.0, 2, 150 * 59.9 + 15.0, 2]])
+        self.assertEqual(list(years[1][6].items()), [("Казань", 1), ("Москва", 1)])
+
+    def test_professions_single_pass(self):
+        file_name = write_temp_csv(self, csv_header +
+                                   "Программист Python,100.0,200.0,RUR,Казань,2008-12-03T17:40:09+0300\n"
+                                   "Ведущий программист,300.0,500.0,RUR,Москва,2008-12-04T17:40:09+0300\n"
+                                   "Аналитик,10.0,20.0,RUR,Москва,2008-12-04T17:40:09+0300\n")
+        columns = ColumnsReader(file_name).read()
+        shard = DataWorker().get_professions_shard(["Программист", "Python", "аналитик"], columns)
+        self.assertEqual(shard.professions["Программист"], [{2008: 150.0}, {2008: 1}])
+        self.assertEqual(shard.professions["Python"], [{2008: 150.0}, {2008: 1}])
+        self.assertEqual(shard.professions["аналитик"][1], {2008: 0})
+        shard = DataWorker().get_professions_shard(["Программист", "аналитик"], columns, casefold=True)
+        self.assertEqual(shard.professions["Программист"][1], {2008: 2})
+        self.assertEqual(shard.professions["аналитик"][1], {2008: 1})
+
+    def test_partial_salaries_report(self):
+        file_name = write_temp_csv(self, csv_header +
+                                   "Программист,100.0,,RUR,Москва,2007-12-03T17:40:09+0300\n"
+                                   "Аналитик,,300.0,RUR,Москва,2007-12-04T17:40:09+0300\n"
+                                   "Тестировщик,,,RUR,Москва,2007-12-05T17:40:09+0300\n")
+        reader = ColumnsReader(file_name)
+        shard = DataWorker().get_shard("Программист", reader.read())
+        self.assertEqual(reader.rejects["empty"], 1)
+        self.assertEqual((shard.salary, shard.amount), ({2007: 400.0}, {2007: 2}))
+        salary_data, _ = print_data(shard.to_report_data("Программист"), shard.total)
+        self.assertEqual(salary_data[1], {2007: 200})
+
+
+class CheckpointsTests(TestCase):
+    row = "Программист,100.0,200.0,RUR,Москва,2007-12-03T17:40:09+0300\n"
+
+    def setUp(self):
+        self.folder = make_temp_folder(self)
+        self.file_name = write_temp_csv(self, csv_header + self.row)
+
+    def test_checkpoint_reads_appended_rows(self):
+        read_get_data_incremental("Программист", self.folder, self.file_name)
+        with open(self.file_name, "a", encoding="utf-8") as file:
+            file.write("Аналитик,300.0,500.0,RUR,Казань,2008-01-03T17:40:09+0300\n\"Недописанная")
+        shard = read_get_data_incremental("Программист", self.folder, self.file_name)
+        self.assertEqual(shard.total, 2)
+        self.assertEqual((shard.salary, shard.amount), ({2007: 150.0, 2008: 400.0}, {2007: 1, 2008: 1}))
+        self.assertEqual(shard.professions, {"Программист": [{2007: 150.0, 2008: 0.0}, {2007: 1, 2008: 0}]})
+
+    def test_checkpoint_reset_on_rewrite(self):
+        read_get_data_incremental("Программист", self.folder, self.file_name)
+        with open(self.file_name, "w", encoding="utf-8-sig") as file:
+            file.write(csv_header + self.row.replace("Москва", "Казань"))
+        shard = read_get_data_incremental("Программист", self.folder, self.file_name)
+        self.assertEqual(shard.total, 1)
+        self.assertEqual(shard.cities_amount, {"Казань": 1})
+
+    def test_checkpoint_last_row_without_newline(self):
+        file_name = write_temp_csv(self, csv_header + self.row + self.row.replace("Москва", "Казань").rstrip("\n"))
+        self.assertEqual(read_get_data_incremental("Программист", self.folder, file_name).total, 1)
+        os.utime(file_name, (os.stat(file_name).st_atime, os.stat(file_name).st_mtime - 10))
+        shard = read_get_data_incremental("Программист", self.folder, file_name)
+        fresh = read_get_data("Программист", None, file_name)
+        self.assertEqual(shard.to_report_data("Программист"), fresh.to_report_data("Программист"))
+        with open(file_name, "a", encoding="utf-8") as file:
+            file.write("\n" + self.row.replace("Москва", "Самара"))
+        shard = read_get_data_incremental("Программист", self.folder, file_name)
+        self.assertEqual(shard.cities_amount, {"Москва": 1, "Казань": 1, "Самара": 1})
+
+
+class StatsShardTests(TestCase):
+    def test_shard_merge_associative(self):
+        shards = [StatsShard.from_years("Аналитик", [[year, 10.0 * year, 1, 5.0, 1, {city: 10.0}, {city: 1}]], 1)
+                  for year, city in [(2007, "Москва"), (2008, "Казань"), (2007, "Казань")]]
+        left = shards[0].merge(shards[1]).merge(shards[2])
+        right = shards[0].merge(shards[1].merge(shards[2]))
+        self.assertEqual(left.to_dict(), right.to_dict())
+        self.assertEqual(StatsShard.reduce(shards).to_dict(), left.to_dict())
+        self.assertEqual(left.cities_amount, {"Москва": 1, "Казань": 2})
+
+    def test_shard_quantiles_merge(self):
+        values = np.random.default_rng(0).lognormal(11, 0.5, 20000)
+        shards = []
+        for part in np.array_split(values, 4):
+            digest = TDigest()
+            digest.add(part)
+            shards.append(StatsShard(year_digests={2007: digest}))
+        shard = StatsShard.loads(StatsShard.reduce(shards).dumps())
+        for q, value in zip((0.25, 0.5, 0.75, 0.9), shard.get_quantiles("Аналитик")[0][2007]):
+            self.assertAlmostEqual(value / np.quantile(values, q), 1, delta=0.01)
+
+    def test_space_saving_bounds(self):
+        counts = {"город " + str(i): (1000 if i < 5 else 1) for i in range(2000)}
+        top = SpaceSaving(50)
+        keys = list(counts)
+        for start in range(0, len(keys), 300):
+            part = SpaceSaving(50)
+            part.add(keys[start:start + 300], [counts[key] for key in keys[start:start + 300]])
+            top = top.merge(part)
+        rows = top.top(5)
+        self.assertEqual(sorted(row[0] for row in rows), ["город " + str(i) for i in range(5)])
+        for key, count, error, _, _ in rows:
+            self.assertTrue(count - error <= counts[key] <= count)
+        sketch = CountMinSketch(256, 4)
+        sketch.add(keys, [counts[key] for key in keys])
+        estimates = sketch.estimate(keys[:10])
+        self.assertTrue(all(estimates >= [counts[key] for key in keys[:10]]))
+
+    def test_shard_top_k(self):
+        shard = StatsShard(4, {2007: 40.0}, {2007: 4}, {"Москва": 30.0, "Казань": 10.0}, {"Москва": 3, "Казань": 1})
+        shard.to_top_k(1)
+        shard = StatsShard.loads(shard.merge(shard).dumps())
+        self.assertEqual(shard.to_report_data("Аналитик")["amount_city"], {"Москва": 6})
+        self.assertEqual(shard.to_report_data("Аналитик")["salary_city"], {"Москва": 60.0})
+        self.assertEqual(shard.city_counts.estimate(["Казань"]).tolist(), [2])
+
+    def test_shard_top_k_from_batches(self):
+        indexes = {"name": 0, "salary_from": 1, "salary_to": 2, "salary_currency": 3, "area_name": 4, "published_at": 5}
+        rows = [["Программист", "100", "300", "RUR", city, "2007-12-03T17:40:09+0300"]
+                for city in ["Москва"] * 5 + ["Казань"] * 2 + ["Самара"]]
+        columns = VacancyColumns.from_rows(rows, indexes)
+        city_top, city_counts = DataWorker().get_city_sketches(columns, 2, batch_size=3)
+        self.assertEqual([row[:2] for row in city_top.top(2)], [("Москва", 5), ("Казань", 2)])
+        self.assertEqual(city_counts.estimate(["Самара"]).tolist(), [1])
+        shard = DataWorker().get_shard("Программист", columns, quantiles=True, top_k=2)
+        self.assertEqual((shard.cities_salary, shard.cities_amount), ({}, {}))
+        self.assertEqual(shard.get_cities()[1], {"Москва": 5, "Казань": 2})
+        self.assertEqual(set(shard.city_digests), {"Москва", "Казань"})
+
+    def test_shard_merge_exact_with_top_k(self):
+        exact = StatsShard(1, {2007: 10.0}, {2007: 1}, {"Казань": 10.0}, {"Казань": 1})
+        top = StatsShard(2, {2007: 40.0}, {2007: 2}, {"Москва": 40.0}, {"Москва": 2})
+        top.to_top_k(2)
+        for merged in (exact.merge(top), top.merge(exact)):
+            self.assertEqual(merged.get_cities()[1], {"Москва": 2, "Казань": 1})
+            self.assertEqual(merged.cities_amount, {})
+        self.assertEqual(exact.cities_amount, {"Казань": 1})
+
+    def test_shard_serialization(self):
+        shard = StatsShard.from_years("Аналитик", [[2007, 10.0, 1, 5.0, 1, {"Москва": 10.0}, {"Москва": 1}]], 1)
+        loaded = StatsShard.loads(shard.dumps())
+        self.assertEqual(loaded.to_report_data("Аналитик"), shard.to_report_data("Аналитик"))
+
+
+class AggregateCubeTests(TestCase):
+    indexes = {"name": 0, "salary_from": 1, "salary_to": 2, "salary_currency": 3, "area_name": 4, "published_at": 5}
+
+    def get_cube(self, rows):
+        columns = VacancyColumns.from_rows(rows, self.indexes)
+        return AggregateCube.build(columns, (columns.salary_from + columns.salary_to) / 2, ["Программист", "Аналитик"])
+
+    def test_cube_slice_rollup(self):
+        cube = self.get_cube([["Программист", "100", "300", "RUR", "Москва", "2007-12-03T17:40:09+0300"],
+                              ["Аналитик", "300", "500", "RUR", "Москва", "2007-12-04T17:40:09+0300"],
+                              ["Программист-аналитик", "500", "700", "RUR", "Казань", "2008-01-03T17:40:09+0300"]])
+        self.assertEqual(cube.rollup(["year"]), {2007: [600.0, 2, 200.0, 400.0], 2008: [600.0, 1, 600.0, 600.0]})
+        self.assertEqual(cube.slice(professions="Программист").rollup(["area_name", "month"]),
+                         {("Москва", 12): [200.0, 1, 200.0, 200.0], ("Казань", 1): [600.0, 1, 600.0, 600.0]})
+        self.assertEqual(cube.slice(area_name=["Казань"], year=2008).total, 1)
+
+    def test_cube_merge_save(self):
+        first = self.get_cube([["Программист", "100", "300", "RUR", "Москва", "2007-12-03T17:40:09+0300"]])
+        second = self.get_cube([["Аналитик", "300", "500", "RUR", "Казань", "2008-01-04T17:40:09+0300"],
+                                ["Программист", "500", "700", "RUR", "Москва", "2008-01-03T17:40:09+0300"]])
+        path = os.path.join(make_temp_folder(self), "cube.npz")
+        first.merge(second).save(path)
+        cube = AggregateCube.load(path)
+        self.assertEqual(cube.rollup(["area_name"]), {"Москва": [800.0, 2, 200.0, 600.0], "Казань": [400.0, 1, 400.0, 400.0]})
+        self.assertEqual(cube.to_report_data("Программист")["amount_prof"], {2007: 1, 2008: 1})
+
+    def test_get_cube_files(self):
+        self.assertEqual(get_cube([], ["Программист"], make_temp_folder(self)).total, 0)
+        file_name = write_temp_csv(self, csv_header +
+                                   "Программист,100.0,300.0,RUR,Москва,2007-12-03T17:40:09+0300\n"
+                                   "Аналитик,300.0,500.0,RUR,Казань,2008-01-04T17:40:09+0300\n")
+        cube = get_cube([file_name], ["Программист"], make_temp_folder(self))
+        self.assertEqual(cube.rollup(["year"]), {2007: [200.0, 1, 200.0, 200.0], 2008: [400.0, 1, 400.0, 400.0]})
+
+
+class SkillStatsTests(TestCase):
+    def test_read_skills(self):
+        file_name = write_temp_csv(self, "name,key_skills,salary_from,salary_to,salary_currency,area_name,published_at\n"
+                                   '"Программист","Python\nSQL\nPython",100,200,RUR,Москва,2007-12-03T17:40:09+0300\n'
+                                   '"Аналитик","SQL\nExcel",100,200,RUR,Москва,2007-12-03T17:40:09+0300\n'
+                                   "Программист,Git,100,200,RUR,Москва,2008-12-03T17:40:09+0300\n")
+        stats = read_skills(["Программист"], file_name)
+        self.assertEqual(stats.years, {2007: {"Python": 1, "SQL": 2, "Excel": 1}, 2008: {"Git": 1}})
+        self.assertEqual(stats.top(2007, "Программист"), [("Python", 1), ("SQL", 1)])
+        self.assertEqual(stats.get_related("SQL"), [("Excel", 1), ("Python", 1)])
+
+    def test_read_skills_without_salary(self):
+        file_name = write_temp_csv(self, "Column1;Name;Skills;salary_from;salary_to;salary_currency;area_name;published_at\n"
+                                   '0;Программист;"Python\nSQL";100;200;RUR;Москва;2022-12-03T17:40:09+0300\n'
+                                   "1;Программист;Git;;;;Москва;2022-12-04T17:40:09+0300\n"
+                                   "2;Программист;;;;;Москва;2022-12-04T17:40:09+0300\n")
+        stats = read_skills(["Программист"], file_name)
+        self.assertEqual(stats.years, {2022: {"Python": 1, "SQL": 1, "Git": 1}})
+        self.assertEqual(stats.top(2022, "Программист"), [("Git", 1), ("Python", 1), ("SQL", 1)])
+
+    def test_skills_merge(self):
+        first = SkillStats.build(np.array(["Программист"], dtype=object), ["Python\nSQL"], np.array([2007]), ["Программист"])
+        second = SkillStats.build(np.array(["Аналитик", "Программист"], dtype=object), ["Excel\nSQL", "SQL\nPython"],
+                                  np.array([2007, 2008]), ["Программист"])
+        stats = first.merge(second)
+        self.assertEqual(stats.skills, ["Python", "SQL", "Excel"])
+        self.assertEqual(stats.get_related("SQL"), [("Python", 2), ("Excel", 1)])
+        self.assertEqual(stats.professions["Программист"], {2007: {"Python": 1, "SQL": 1}, 2008: {"SQL": 1, "Python": 1}})
+        self.assertEqual(np.diff(stats.indptr).sum(), len(stats.data))
+
+
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        self.folder = make_temp_folder(self)
+
+    def test_result_key_invalidation(self):
+        file_name = write_temp_csv(self, csv_header)
+        results = ResultCache(self.folder)
+        key = results.get_key([file_name], {"prof_name": "Программист", "top_k": None})
+        self.assertEqual(key, results.get_key([file_name], {"prof_name": " Программист"}))
+        results.put(key, b"shard")
+        self.assertEqual(results.get(key), b"shard")
+        with open(file_name, "a", encoding="utf-8") as file:
+            file.write("Программист,100,200,RUR,Москва,2007-12-03T17:40:09+0300\n")
+        self.assertNotEqual(key, results.get_key([file_name], {"prof_name": "Программист"}))
+
+    def test_cached_result_equals_fresh(self):
+        file_name = write_temp_csv(self, csv_header +
+                                   "Программист,100.0,200.0,RUR,Москва,2007-12-03T17:40:09+0300\n"
+                                   "Ведущий Программист,300.0,500.0,RUR,Москва,2008-12-04T17:40:09+0300\n")
+        fresh = get_futures_shard([file_name], " Программист", None, use_processes=False)
+        get_futures_shard([file_name], "Программист", None, use_processes=False, result_folder=self.folder)
+        cached = get_futures_shard([file_name], " Программист", None, use_processes=False, result_folder=self.folder)
+        self.assertEqual(cached.to_report_data("Программист"), fresh.to_report_data("Программист"))
+        self.assertEqual(fresh.professions["Программист"][1], {2007: 1, 2008: 1})
+
+    def test_result_key_checkpoint_mode(self):
+        file_name = write_temp_csv(self, csv_header + "Программист,100.0,200.0,RUR,Москва,2007-12-03T17:40:09+0300\n")
+        checkpoint_folder = make_temp_folder(self)
+        get_futures_shard([file_name], "Программист", None, use_processes=False, result_folder=self.folder)
+        shard = get_futures_shard([file_name], "Программист", None, use_processes=False,
+                                  checkpoint_folder=checkpoint_folder, result_folder=self.folder)
+        self.assertNotEqual(os.listdir(checkpoint_folder), [])
+        self.assertEqual(shard.amount, {2007: 1})
+
+    def test_result_lru_eviction(self):
+        results = ResultCache(self.folder, max_bytes=20)
+        results.put("first", b"0123456789")
+        results.put("second", b"0123456789")
+        os.utime(results.get_path("first"), ns=(1000 * 10 ** 9, 1000 * 10 ** 9))
+        os.utime(results.get_path("second"), ns=(2000 * 10 ** 9, 2000 * 10 ** 9))
+        results.get("first")
+        results.put("third", b"0123456789")
+        self.assertIsNone(results.get("second"))
+        self.assertEqual(results.get("first"), b"0123456789")
+        self.assertEqual(results.get("third"), b"0123456789")
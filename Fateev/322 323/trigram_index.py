@@ -0,0 +1,198 @@
+import numpy as np
+from aggregation import encode
+
+chunk_size = 100000
+
+
+def normalize(text : str):
+    """Приводит строку к виду, по которому строится индекс
+
+        Args:
+            text (str): Строка
+
+        Returns:
+            str: Строка без учета регистра
+
+    >>> normalize("Ведущий ПРОГРАММИСТ")
+    'ведущий программист'
+    """
+    return text.casefold()
+
+
+def get_trigrams(texts : list):
+    """Находит коды всех триграмм строк. Код триграммы - три номера символов по 21 биту
+
+        Args:
+            texts (list): Строки
+
+        Returns:
+            np.ndarray, np.ndarray: Коды триграмм и номера строк, в которых они встречаются
+
+    >>> codes, numbers = get_trigrams(["abcd", "ab"])
+    >>> len(codes), numbers.tolist()
+    (2, [0, 0])
+    """
+    if len(texts) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    array = np.array(texts, dtype=str)
+    width = max(array.dtype.itemsize // 4, 1)
+    chars = np.ascontiguousarray(array).view(np.uint32).reshape(len(texts), width).astype(np.int64)
+    if width < 3:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    codes = (chars[:, :-2] << 42) | (chars[:, 1:-1] << 21) | chars[:, 2:]
+    valid = chars[:, 2:] != 0
+    numbers = np.broadcast_to(np.arange(len(texts))[:, None], codes.shape)
+    return codes[valid], numbers[valid]
+
+
+class TrigramIndex:
+    """Класс индекса триграмм по названиям вакансий для быстрого поиска подстроки.
+    Одинаковые названия хранятся один раз, для каждой триграммы хранится список названий (CSR),
+    для каждого названия - список строк. Запрос пересекает списки триграмм, а затем проверяет кандидатов
+
+    Attributes:
+        names (np.ndarray): Уникальные названия
+        keys (np.ndarray): Коды триграмм по возрастанию
+        offsets (np.ndarray): Начала списков названий для каждой триграммы
+        postings (np.ndarray): Номера названий для всех триграмм подряд
+        row_offsets (np.ndarray): Начала списков строк для каждого названия
+        rows (np.ndarray): Номера строк для всех названий подряд
+    """
+    def __init__(self, names, keys, offsets, postings, row_offsets, rows):
+        """Инициализирует объект TrigramIndex
+
+            Args:
+                names (np.ndarray): Уникальные названия
+                keys (np.ndarray): Коды триграмм по возрастанию
+                offsets (np.ndarray): Начала списков названий для каждой триграммы
+                postings (np.ndarray): Номера названий для всех триграмм подряд
+                row_offsets (np.ndarray): Начала списков строк для каждого названия
+                rows (np.ndarray): Номера строк для всех названий подряд
+        """
+        self.names = names
+        self.keys = keys
+        self.offsets = offsets
+        self.postings = postings
+        self.row_offsets = row_offsets
+        self.rows = rows
+
+    @staticmethod
+    def build(names):
+        """Строит индекс по столбцу названий
+
+            Args:
+                names (np.ndarray): Названия вакансий
+
+            Returns:
+                TrigramIndex: Индекс
+        """
+        uniques, name_codes = encode(names)
+        normalized = [normalize(name) for name in uniques.tolist()]
+        codes = []
+        numbers = []
+        for start in range(0, len(normalized), chunk_size):
+            chunk_codes, chunk_numbers = get_trigrams(normalized[start:start + chunk_size])
+            codes.append(chunk_codes)
+            numbers.append(chunk_numbers + start)
+        codes = np.concatenate(codes) if len(codes) != 0 else np.zeros(0, dtype=np.int64)
+        numbers = np.concatenate(numbers) if len(numbers) != 0 else np.zeros(0, dtype=np.int64)
+        order = np.lexsort((numbers, codes))
+        codes = codes[order]
+        numbers = numbers[order]
+        unique_pairs = np.ones(len(codes), dtype=bool)
+        unique_pairs[1:] = (codes[1:] != codes[:-1]) | (numbers[1:] != numbers[:-1])
+        codes = codes[unique_pairs]
+        numbers = numbers[unique_pairs]
+        keys, starts = np.unique(codes, return_index=True)
+        row_order = np.argsort(name_codes, kind="stable")
+        row_offsets = np.searchsorted(name_codes[row_order], np.arange(len(uniques) + 1))
+        return TrigramIndex(uniques.astype(str), keys, np.append(starts, len(codes)), numbers.astype(np.int32),
+                            row_offsets, row_order.astype(np.int64))
+
+    def save(self, path : str):
+        """Сохраняет индекс в npz файл
+
+            Args:
+                path (str): Путь к файлу индекса
+        """
+        with open(path, "wb") as file:
+            np.savez(file, names=self.names, keys=self.keys, offsets=self.offsets, postings=self.postings,
+                     row_offsets=self.row_offsets, rows=self.rows)
+
+    @staticmethod
+    def load(path : str):
+        """Читает индекс из npz файла
+
+            Args:
+                path (str): Путь к файлу индекса
+
+            Returns:
+                TrigramIndex: Индекс
+        """
+        with np.load(path, allow_pickle=False) as data:
+            return TrigramIndex(data["names"], data["keys"], data["offsets"], data["postings"],
+                                data["row_offsets"], data["rows"])
+
+    def get_postings(self, code : int):
+        """Возвращает номера названий, в которых встречается триграмма
+
+            Args:
+                code (int): Код триграммы
+
+            Returns:
+                np.ndarray: Номера названий
+        """
+        position = np.searchsorted(self.keys, code)
+        if position == len(self.keys) or self.keys[position] != code:
+            return np.zeros(0, dtype=np.int32)
+        return self.postings[self.offsets[position]:self.offsets[position + 1]]
+
+    def search_names(self, query : str, casefold : bool = False):
+        """Находит номера названий, содержащих подстроку
+
+            Args:
+                query (str): Подстрока
+                casefold (bool): Искать без учета регистра
+
+            Returns:
+                np.ndarray: Номера названий
+        """
+        codes, _ = get_trigrams([normalize(query)])
+        if len(codes) == 0:
+            candidates = np.arange(len(self.names))
+        else:
+            lists = sorted((self.get_postings(code) for code in np.unique(codes).tolist()), key=len)
+            candidates = lists[0]
+            for postings in lists[1:]:
+                if len(candidates) == 0:
+                    break
+                candidates = np.intersect1d(candidates, postings, assume_unique=True)
+        if casefold:
+            query = query.casefold()
+            found = [number for number in candidates.tolist() if query in self.names[number].casefold()]
+        else:
+            found = [number for number in candidates.tolist() if query in self.names[number]]
+        return np.array(found, dtype=np.int64)
+
+    def search(self, query : str, casefold : bool = False):
+        """Находит номера строк, название которых содержит подстроку
+
+            Args:
+                query (str): Подстрока
+                casefold (bool): Искать без учета регистра
+
+            Returns:
+                np.ndarray: Номера строк по возрастанию
+
+        >>> index = TrigramIndex.build(np.array(["Программист", "Аналитик", "Программист 1С", "Программист"], dtype=object))
+        >>> index.search("Программист").tolist()
+        [0, 2, 3]
+        >>> index.search("программист").tolist(), index.search("программист", casefold=True).tolist()
+        ([], [0, 2, 3])
+        """
+        names = self.search_names(query, casefold)
+        if len(names) == 0:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.concatenate([self.rows[self.row_offsets[number]:self.row_offsets[number + 1]]
+                               for number in names.tolist()])
+        return np.sort(rows)
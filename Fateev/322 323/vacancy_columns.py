@@ -0,0 +1,473 @@
+import copy
+import csv
+import io
+import mmap
+import os
+import concurrent.futures
+import numpy as np
+from validation import RowValidator, reject_reasons
+
+block_size = 64 * 1024 * 1024
+
+default_values = {
+    "name": "",
+    "salary_from": "",
+    "salary_to": "",
+    "salary_currency": "RUR",
+    "area_name": "",
+    "published_at": ""
+}
+
+field_aliases = {
+    "name": ("name", "vacancy", "название"),
+    "salary_from": ("salary_from", "salary"),
+    "salary_to": ("salary_to", "salary"),
+    "salary_currency": ("salary_currency", "currency"),
+    "area_name": ("area_name", "area", "city"),
+    "published_at": ("published_at", "date"),
+    "key_skills": ("key_skills", "skills", "навыки")
+}
+
+
+def find_field(fields, field):
+    """Находит столбец поля по заголовкам файла с учетом других названий поля, регистра и пробелов
+
+        Args:
+            fields (list): Заголовки CSV файла
+            field (str): Название поля
+
+        Returns:
+            int: Номер столбца, None если поля нет в файле
+
+    >>> find_field(["Column1", "Name", " Skills"], "key_skills")
+    2
+    """
+    normalized = [header.strip().lower() for header in fields]
+    return next((normalized.index(alias) for alias in field_aliases.get(field, (field,)) if alias in normalized), None)
+
+
+def to_float(values):
+    """Переводит столбец строк в массив float, пустые строки и None становятся nan
+
+        Args:
+            values (list): Значения столбца
+
+        Returns:
+            np.ndarray: Массив float64
+
+    >>> to_float(["100", "", "2000.5", "None"]).tolist()
+    [100.0, nan, 2000.5, nan]
+    """
+    array = np.array(values, dtype=str)
+    return np.where((array == "") | (array == "None"), "nan", array).astype(np.float64)
+
+
+date_positions = {
+    "iso": (0, 5, 8),
+    "dmy": (6, 3, 0)
+}
+
+
+def parse_dates(values, date_format="iso"):
+    """Получает год, месяц и день из дат без разбора каждой строки.
+    Поддерживаются форматы yyyy-mm-ddTHH:MM:SS+zzzz (iso) и dd.mm.yyyy H:MM (dmy)
+
+        Args:
+            values (list): Значения столбца published_at
+            date_format (str): Формат дат: iso или dmy
+
+        Returns:
+            np.ndarray, np.ndarray, np.ndarray: Годы, месяцы и дни
+
+    >>> year, month, day = parse_dates(["2007-12-03T17:40:09+0300", "2022-01-10T10:00:00+0300"])
+    >>> year.tolist(), month.tolist(), day.tolist()
+    ([2007, 2022], [12, 1], [3, 10])
+    >>> year, month, day = parse_dates(["01.12.2022 0:38"], "dmy")
+    >>> year.tolist(), month.tolist(), day.tolist()
+    ([2022], [12], [1])
+    """
+    year_at, month_at, day_at = date_positions[date_format]
+    digits = np.array(values, dtype="U10")
+    digits = np.ascontiguousarray(digits).view(np.uint32).reshape(len(digits), 10).astype(np.int32) - ord("0")
+    year = digits[:, year_at] * 1000 + digits[:, year_at + 1] * 100 + digits[:, year_at + 2] * 10 + digits[:, year_at + 3]
+    month = digits[:, month_at] * 10 + digits[:, month_at + 1]
+    day = digits[:, day_at] * 10 + digits[:, day_at + 1]
+    return year.astype(np.int32), month.astype(np.int8), day.astype(np.int8)
+
+
+def count_quotes(data, start, end):
+    """Считает количество кавычек в диапазоне байт, читая его блоками
+
+        Args:
+            data (mmap.mmap): Содержимое файла
+            start (int): Начало диапазона
+            end (int): Конец диапазона
+
+        Returns:
+            int: Количество кавычек
+
+    >>> count_quotes(b'a,"b""c",d', 0, 10)
+    4
+    """
+    count = 0
+    for position in range(start, end, block_size):
+        count += data[position:min(position + block_size, end)].count(b'"')
+    return count
+
+
+def find_line_end(data, start, quoted=False):
+    """Находит начало следующей строки CSV, пропуская переводы строк внутри кавычек
+
+        Args:
+            data (mmap.mmap): Содержимое файла
+            start (int): Позиция, с которой начинается поиск
+            quoted (bool): Находится ли start внутри поля в кавычках
+
+        Returns:
+            int: Позиция сразу после конца строки или длина данных
+
+    >>> find_line_end(b'a,"b\\nc"\\nd\\n', 0)
+    8
+    """
+    position = start
+    while True:
+        newline = data.find(b"\n", position)
+        if newline == -1:
+            return len(data)
+        quoted ^= count_quotes(data, position, newline) % 2 == 1
+        position = newline + 1
+        if not quoted:
+            return position
+
+
+def split_ranges(data, start, parts):
+    """Делит данные на диапазоны байт, границы которых совпадают с концами строк CSV
+
+        Args:
+            data (mmap.mmap): Содержимое файла
+            start (int): Начало первой строки с данными
+            parts (int): Желаемое количество диапазонов
+
+        Returns:
+            list: Пары (начало, конец) для каждого диапазона
+
+    >>> split_ranges(b'h\\n1\\n"2\\n2"\\n3\\n', 2, 3)
+    [(2, 10), (10, 12)]
+    """
+    size = len(data)
+    bounds = [start]
+    position = start
+    quoted = False
+    for part in range(1, parts):
+        target = start + (size - start) * part // parts
+        if target <= position:
+            continue
+        quoted ^= count_quotes(data, position, target) % 2 == 1
+        position = find_line_end(data, target, quoted)
+        quoted = False
+        if position >= size:
+            break
+        bounds.append(position)
+    bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+
+
+def read_range(columns_reader, start, end, fields):
+    """Читает диапазон байт файла в пакет столбцов, используется процессами-обработчиками
+
+        Args:
+            columns_reader (ColumnsReader): Настроенный читатель файла
+            start (int): Начало диапазона
+            end (int): Конец диапазона
+            fields (list): Заголовки CSV файла
+
+        Returns:
+            VacancyColumns, dict: Вакансии из диапазона и количество отброшенных в этом диапазоне строк по причинам
+    """
+    columns_reader = copy.copy(columns_reader)
+    columns_reader.rejects = dict.fromkeys(reject_reasons, 0)
+    encoding = columns_reader.encoding
+    encoding = "UTF-8" if encoding.lower() == "utf-8-sig" else encoding
+    with open(columns_reader.file_name, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            text = data[start:end].decode(encoding)
+    reader = csv.reader(io.StringIO(text, newline=""), delimiter=columns_reader.delimiter)
+    columns = VacancyColumns.concat(list(columns_reader.rows_to_batches(reader, fields, end - start)))
+    return columns, columns_reader.rejects
+
+
+class VacancyColumns:
+    """Класс для представления пакета вакансий в виде столбцов
+
+    Attributes:
+        name (np.ndarray): Названия вакансий
+        salary_from (np.ndarray): Нижние границы вилки оклада
+        salary_to (np.ndarray): Верхние границы вилки оклада
+        salary_currency (np.ndarray): Валюты оклада
+        area_name (np.ndarray): Города работы
+        year (np.ndarray): Годы публикации вакансий
+        month (np.ndarray): Месяцы публикации вакансий
+        day (np.ndarray): Дни публикации вакансий
+    """
+    def __init__(self, name, salary_from, salary_to, salary_currency, area_name, year, month, day):
+        """Инициализирует объект VacancyColumns
+
+            Args:
+                name (np.ndarray): Названия вакансий
+                salary_from (np.ndarray): Нижние границы вилки оклада
+                salary_to (np.ndarray): Верхние границы вилки оклада
+                salary_currency (np.ndarray): Валюты оклада
+                area_name (np.ndarray): Города работы
+                year (np.ndarray): Годы публикации вакансий
+                month (np.ndarray): Месяцы публикации вакансий
+                day (np.ndarray): Дни публикации вакансий
+        """
+        self.name = name
+        self.salary_from = salary_from
+        self.salary_to = salary_to
+        self.salary_currency = salary_currency
+        self.area_name = area_name
+        self.year = year
+        self.month = month
+        self.day = day
+
+    def __len__(self):
+        return len(self.name)
+
+    @staticmethod
+    def from_rows(rows, indexes, date_format="iso"):
+        """Создает пакет из строк CSV файла
+
+            Args:
+                rows (list): Строки CSV файла
+                indexes (dict): Номера столбцов для каждого поля, None если поля нет в файле
+                date_format (str): Формат дат в столбце published_at
+
+            Returns:
+                VacancyColumns: Пакет вакансий, если известна только одна граница оклада, она используется как обе
+
+        >>> columns = VacancyColumns.from_rows([["", "200"]], {"name": None, "salary_from": 0, "salary_to": 1,
+        ...                                    "salary_currency": None, "area_name": None, "published_at": None})
+        >>> columns.salary_from.tolist(), columns.salary_to.tolist()
+        ([200.0], [200.0])
+        """
+        columns = list(zip(*rows)) if len(rows) != 0 else []
+        values = {}
+        for field, index in indexes.items():
+            values[field] = columns[index] if index is not None else [default_values[field]] * len(rows)
+        year, month, day = parse_dates(values["published_at"], date_format)
+        salary_from = to_float(values["salary_from"])
+        salary_to = to_float(values["salary_to"])
+        return VacancyColumns(np.array(values["name"], dtype=object),
+                              np.where(np.isnan(salary_from), salary_to, salary_from),
+                              np.where(np.isnan(salary_to), salary_from, salary_to),
+                              np.array(values["salary_currency"], dtype=object),
+                              np.array(values["area_name"], dtype=object),
+                              year, month, day)
+
+    def take(self, indexes):
+        """Возвращает пакет из выбранных строк
+
+            Args:
+                indexes (np.ndarray): Номера строк или булева маска
+
+            Returns:
+                VacancyColumns: Пакет выбранных вакансий
+        """
+        return VacancyColumns(self.name[indexes], self.salary_from[indexes], self.salary_to[indexes],
+                              self.salary_currency[indexes], self.area_name[indexes],
+                              self.year[indexes], self.month[indexes], self.day[indexes])
+
+    def split_by_year(self):
+        """Делит пакет на пакеты по годам публикации
+
+            Returns:
+                dict: Пакет вакансий для каждого года в порядке возрастания годов
+        """
+        order = np.argsort(self.year, kind="stable")
+        years, starts = np.unique(self.year[order], return_index=True)
+        bounds = list(starts) + [len(order)]
+        return {int(years[i]): self.take(order[bounds[i]:bounds[i + 1]]) for i in range(len(years))}
+
+    @staticmethod
+    def concat(batches):
+        """Склеивает несколько пакетов в один
+
+            Args:
+                batches (list): Пакеты вакансий
+
+            Returns:
+                VacancyColumns: Общий пакет вакансий
+        """
+        if len(batches) == 0:
+            return VacancyColumns.from_rows([], {field: None for field in default_values})
+        return VacancyColumns(*(np.concatenate([getattr(batch, field) for batch in batches])
+                                for field in ("name", "salary_from", "salary_to", "salary_currency",
+                                              "area_name", "year", "month", "day")))
+
+
+class ColumnsReader:
+    """Класс для потокового чтения CSV файла пакетами столбцов
+
+    Attributes:
+        file_name (str): Имя файла
+        batch_size (int): Количество строк в одном пакете
+        encoding (str): Кодировка файла
+        delimiter (str): Разделитель столбцов
+        indexes (dict): Номера столбцов для каждого поля, None чтобы искать их по заголовку
+        date_format (str): Формат дат в столбце published_at
+        rejects (dict): Количество отброшенных при чтении строк по причинам
+    """
+    def __init__(self, file_name : str, batch_size : int = 100000, encoding : str = "UTF-8-sig", delimiter : str = ",",
+                 indexes : dict = None, date_format : str = "iso"):
+        """Инициализирует объект ColumnsReader
+
+            Args:
+                file_name (str): Имя файла
+                batch_size (int): Количество строк в одном пакете
+                encoding (str): Кодировка файла
+                delimiter (str): Разделитель столбцов
+                indexes (dict): Номера столбцов для каждого поля, None чтобы искать их по заголовку
+                date_format (str): Формат дат в столбце published_at
+        """
+        self.file_name = file_name
+        self.batch_size = batch_size
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.indexes = indexes
+        self.date_format = date_format
+        self.rejects = dict.fromkeys(reject_reasons, 0)
+
+    @staticmethod
+    def get_indexes(fields):
+        """Находит номера нужных столбцов один раз для всего файла
+
+            Args:
+                fields (list): Заголовки CSV файла
+
+            Returns:
+                dict: Номер столбца для каждого поля, None если поля нет в файле
+
+        >>> ColumnsReader.get_indexes(["name", "area_name", "published_at"])["area_name"]
+        1
+        >>> ColumnsReader.get_indexes(["name", "area_name", "published_at"])["salary_to"] is None
+        True
+        """
+        return {field: fields.index(field) if field in fields else None for field in default_values}
+
+    def validated_rows(self, reader, fields, batch_size, validator=None):
+        """Собирает строки CSV в пакеты строк. Каждый пакет проверяется RowValidator,
+        отброшенные строки учитываются в rejects по причинам
+
+            Args:
+                reader (csv.reader): Строки CSV файла без заголовка
+                fields (list): Заголовки CSV файла
+                batch_size (int): Количество строк в одном пакете
+                validator (RowValidator): Проверка строк, по умолчанию все правила для полей вакансии
+
+            Returns:
+                generator: Непустые пакеты проверенных строк
+        """
+        if validator is None:
+            indexes = self.indexes if self.indexes is not None else self.get_indexes(fields)
+            validator = RowValidator(len(fields), indexes, date_format=self.date_format)
+        validator.rejects = self.rejects
+        rows = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) == batch_size:
+                rows = validator.check(rows)
+                if len(rows) != 0:
+                    yield rows
+                rows = []
+        rows = validator.check(rows)
+        if len(rows) != 0:
+            yield rows
+
+    def rows_to_batches(self, reader, fields, batch_size):
+        """Собирает проверенные строки CSV в пакеты столбцов
+
+            Args:
+                reader (csv.reader): Строки CSV файла без заголовка
+                fields (list): Заголовки CSV файла
+                batch_size (int): Количество строк в одном пакете
+
+            Returns:
+                generator: Пакеты VacancyColumns
+        """
+        indexes = self.indexes if self.indexes is not None else self.get_indexes(fields)
+        for rows in self.validated_rows(reader, fields, batch_size):
+            yield VacancyColumns.from_rows(rows, indexes, self.date_format)
+
+    def read_batches(self):
+        """Читает файл и возвращает вакансии пакетами столбцов
+
+            Returns:
+                generator: Пакеты VacancyColumns
+        """
+        with open(self.file_name, encoding=self.encoding, newline="") as file:
+            reader = csv.reader(file, delimiter=self.delimiter)
+            fields = next(reader, [])
+            yield from self.rows_to_batches(reader, fields, self.batch_size)
+
+    def read_extra_batches(self, extra_fields : list, required : list = None):
+        """Читает файл пакетами столбцов вместе с дополнительными полями, которых нет в VacancyColumns
+        (например key_skills). Дополнительные поля ищутся по заголовкам с учетом других названий поля
+        и остаются строками, если поля нет в файле - пустыми строками
+
+            Args:
+                extra_fields (list): Названия дополнительных полей
+                required (list): Если указаны, строки проверяются только на непустые значения этих полей,
+                    а оклад не читается (зарплаты nan), None чтобы проверять строки по всем правилам
+
+            Returns:
+                generator: Пары (VacancyColumns, словарь поле - список значений) для каждого пакета
+        """
+        with open(self.file_name, encoding=self.encoding, newline="") as file:
+            reader = csv.reader(file, delimiter=self.delimiter)
+            fields = next(reader, [])
+            indexes = self.indexes if self.indexes is not None else self.get_indexes(fields)
+            extra_indexes = {field: find_field(fields, field) for field in extra_fields}
+            validator = None
+            if required is not None:
+                indexes = dict(indexes, salary_from=None, salary_to=None, salary_currency=None)
+                validator = RowValidator(len(fields), dict(indexes, **extra_indexes), required,
+                                         date_format=self.date_format)
+            for rows in self.validated_rows(reader, fields, self.batch_size, validator):
+                extra = {field: [row[index] for row in rows] if index is not None else [""] * len(rows)
+                         for field, index in extra_indexes.items()}
+                yield VacancyColumns.from_rows(rows, indexes, self.date_format), extra
+
+    def read(self):
+        """Читает весь файл в один пакет столбцов
+
+            Returns:
+                VacancyColumns: Все вакансии файла
+        """
+        return VacancyColumns.concat(list(self.read_batches()))
+
+    def read_parallel(self, workers : int = None):
+        """Читает один большой файл параллельно: делит его на диапазоны байт по концам строк
+        и разбирает диапазоны в пуле процессов без предварительного разбиения на файлы
+
+            Args:
+                workers (int): Количество процессов, по умолчанию число ядер
+
+            Returns:
+                VacancyColumns: Все вакансии файла в исходном порядке
+        """
+        workers = workers or os.cpu_count()
+        if os.stat(self.file_name).st_size == 0:
+            return VacancyColumns.concat([])
+        with open(self.file_name, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                start = find_line_end(data, 0)
+                fields = next(csv.reader([data[:start].decode(self.encoding)], delimiter=self.delimiter), [])
+                ranges = split_ranges(data, start, workers * 4)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            queue = [executor.submit(read_range, self, start, end, fields) for start, end in ranges]
+            results = [answer.result() for answer in queue]
+        for _, rejects in results:
+            for reason, count in rejects.items():
+                self.rejects[reason] += count
+        return VacancyColumns.concat([columns for columns, _ in results])
@@ -0,0 +1,163 @@
+import numpy as np
+
+reject_reasons = ("columns", "empty", "salary", "currency", "bad_date")
+
+known_currencies = ("AZN", "BYR", "EUR", "GEL", "KGS", "KZT", "RUR", "UAH", "USD", "UZS")
+
+date_digits = {
+    "iso": (0, 1, 2, 3, 5, 6, 8, 9),
+    "dmy": (0, 1, 3, 4, 6, 7, 8, 9)
+}
+
+
+def is_missing(values):
+    """Проверяет, какие значения столбца пустые
+
+        Args:
+            values (np.ndarray): Значения столбца
+
+        Returns:
+            np.ndarray: Булева маска пустых значений
+
+    >>> is_missing(np.array(["100", "", "None"], dtype=object)).tolist()
+    [False, True, True]
+    """
+    return (values == "") | (values == "None")
+
+
+def is_number(values):
+    """Проверяет, какие значения столбца являются неотрицательными числами
+
+        Args:
+            values (np.ndarray): Значения столбца
+
+        Returns:
+            np.ndarray: Булева маска числовых значений
+
+    >>> is_number(np.array(["100", "2000.5", "abc", "1.2.3"], dtype=object)).tolist()
+    [True, True, False, False]
+    """
+    return np.char.isdigit(np.char.replace(values.astype(str), ".", "", 1))
+
+
+def is_date(values, date_format="iso"):
+    """Проверяет, что на местах года, месяца и дня в датах стоят цифры, как ожидает parse_dates
+
+        Args:
+            values (np.ndarray): Значения столбца published_at
+            date_format (str): Формат дат: iso или dmy
+
+        Returns:
+            np.ndarray: Булева маска правильных дат
+
+    >>> is_date(np.array(["2007-12-03T17:40:09+0300", "2007-1-3", "вчера"], dtype=object)).tolist()
+    [True, False, False]
+    >>> is_date(np.array(["01.12.2022 0:38", "2022-12-01"], dtype=object), "dmy").tolist()
+    [True, False]
+    """
+    codes = np.ascontiguousarray(values.astype("U10")).view(np.uint32).reshape(len(values), 10)
+    digits = codes[:, list(date_digits[date_format])]
+    return ((digits >= ord("0")) & (digits <= ord("9"))).all(axis=1)
+
+
+class RowValidator:
+    """Класс для проверки строк CSV пакетами до создания объектов.
+    Правила проверяются сразу для всего пакета в виде масок, для каждой отброшенной строки
+    запоминается первая нарушенная причина: columns (неверное число столбцов), empty (пустое обязательное поле, валюта
+    или обе границы оклада), salary (оклад не число), currency (неизвестная валюта),
+    bad_date (дата публикации не в формате date_format)
+
+    Attributes:
+        fields_count (int): Число столбцов в файле
+        indexes (dict): Номер столбца для каждого поля, None если поля нет в файле
+        required (list): Поля, которые не могут быть пустыми
+        currencies (tuple): Известные валюты
+        date_format (str): Формат дат в столбце published_at
+        rejects (dict): Количество отброшенных строк по причинам
+    """
+    def __init__(self, fields_count : int, indexes : dict, required : list = ("name", "area_name", "published_at"),
+                 currencies : tuple = known_currencies, date_format : str = "iso"):
+        """Инициализирует объект RowValidator
+
+            Args:
+                fields_count (int): Число столбцов в файле
+                indexes (dict): Номер столбца для каждого поля, None если поля нет в файле
+                required (list): Поля, которые не могут быть пустыми
+                currencies (tuple): Известные валюты
+                date_format (str): Формат дат в столбце published_at
+        """
+        self.fields_count = fields_count
+        self.indexes = indexes
+        self.required = required
+        self.currencies = currencies
+        self.date_format = date_format
+        self.rejects = dict.fromkeys(reject_reasons, 0)
+
+    def get_index(self, field : str):
+        """Возвращает номер столбца поля
+
+            Args:
+                field (str): Название поля
+
+            Returns:
+                int: Номер столбца, None если поля нет в файле
+        """
+        return self.indexes.get(field)
+
+    def check(self, rows : list):
+        """Проверяет пакет строк и возвращает только правильные строки
+
+            Args:
+                rows (list): Строки CSV файла
+
+            Returns:
+                list: Строки, прошедшие проверку
+
+        >>> validator = RowValidator(3, {"name": 0, "salary_from": 1, "salary_currency": 2}, ["name"])
+        >>> validator.check([["a", "1", "RUR"], ["b"], ["", "1", "RUR"], ["c", "x", "RUR"], ["d", "2", "ABC"], ["e", "3", ""],
+        ...                  ["f", "", "RUR"]])
+        [['a', '1', 'RUR']]
+        >>> validator.rejects
+        {'columns': 1, 'empty': 3, 'salary': 1, 'currency': 1, 'bad_date': 0}
+        """
+        lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        right_length = lengths == self.fields_count
+        self.rejects["columns"] += int(len(rows) - np.count_nonzero(right_length))
+        rows = [rows[i] for i in np.flatnonzero(right_length)] if not right_length.all() else rows
+        if len(rows) == 0:
+            return rows
+        table = np.array(rows, dtype=object).reshape(len(rows), self.fields_count)
+        bad = np.zeros(len(rows), dtype=bool)
+        for field in self.required:
+            if self.get_index(field) is not None:
+                bad |= is_missing(table[:, self.get_index(field)])
+        self.rejects["empty"] += int(np.count_nonzero(bad))
+
+        salary_bad = np.zeros(len(rows), dtype=bool)
+        salary_indexes = {self.get_index("salary_from"), self.get_index("salary_to")} - {None}
+        salary_missing = np.full(len(rows), len(salary_indexes) != 0)
+        for index in salary_indexes:
+            values = table[:, index]
+            salary_bad |= ~is_missing(values) & ~is_number(values)
+            salary_missing &= is_missing(values)
+        salary_bad &= ~bad
+        self.rejects["salary"] += int(np.count_nonzero(salary_bad))
+        bad |= salary_bad
+        salary_missing &= ~bad
+        self.rejects["empty"] += int(np.count_nonzero(salary_missing))
+        bad |= salary_missing
+
+        if self.get_index("salary_currency") is not None:
+            currencies = table[:, self.get_index("salary_currency")]
+            currency_missing = is_missing(currencies) & ~bad
+            self.rejects["empty"] += int(np.count_nonzero(currency_missing))
+            bad |= currency_missing
+            currency_bad = ~np.isin(currencies.astype(str), self.currencies) & ~bad
+            self.rejects["currency"] += int(np.count_nonzero(currency_bad))
+            bad |= currency_bad
+
+        if self.get_index("published_at") is not None:
+            date_bad = ~is_date(table[:, self.get_index("published_at")], self.date_format) & ~bad
+            self.rejects["bad_date"] += int(np.count_nonzero(date_bad))
+            bad |= date_bad
+        return [rows[i] for i in np.flatnonzero(~bad)] if bad.any() else rows
@@ -0,0 +1,210 @@
+import concurrent.futures
+import datetime
+import hashlib
+import os
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+cbr_url = "http://www.cbr.ru/scripts/"
+retry_statuses = (429, 500, 502, 503, 504)
+end_params = ("date_req2", "date_req")
+
+
+class CbrFetcher:
+    """Класс для загрузки XML курсов Центрального банка.
+    Запросы выполняются в пуле потоков через одну сессию с пулом соединений, число одновременных запросов
+    ограничено max_workers, при ошибках запрос повторяется с экспоненциальной задержкой.
+    Ответы хранятся на диске по хэшу содержимого (objects), для каждого адреса запроса хранится
+    хэш его ответа (urls), поэтому одинаковые ответы хранятся один раз, а повторные запросы не идут в сеть.
+    Кэшируются только запросы за периоды, закончившиеся до сегодняшнего дня: курсы на сегодня и будущие даты
+    еще могут измениться
+
+    Attributes:
+        cache_folder (str): Папка кэша ответов, None чтобы не использовать кэш
+        base_url (str): Адрес сервиса курсов
+        max_workers (int): Наибольшее число одновременных запросов
+        retries (int): Число повторов запроса при ошибке
+        backoff (float): Задержка перед первым повтором в секундах, каждый следующий повтор ждет вдвое дольше
+        timeout (float): Время ожидания ответа в секундах
+        session (requests.Session): Сессия с пулом соединений
+    """
+    def __init__(self, cache_folder : str = "cbr_cache", base_url : str = cbr_url, max_workers : int = 8,
+                 retries : int = 3, backoff : float = 0.5, timeout : float = 10):
+        """Инициализирует объект CbrFetcher
+
+            Args:
+                cache_folder (str): Папка кэша ответов, None чтобы не использовать кэш
+                base_url (str): Адрес сервиса курсов
+                max_workers (int): Наибольшее число одновременных запросов
+                retries (int): Число повторов запроса при ошибке
+                backoff (float): Задержка перед первым повтором в секундах
+                timeout (float): Время ожидания ответа в секундах
+        """
+        self.cache_folder = cache_folder
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.session.close()
+
+    def get_url(self, script : str, params : dict):
+        """Собирает адрес запроса
+
+            Args:
+                script (str): Название скрипта, например XML_daily.asp
+                params (dict): Параметры запроса
+
+            Returns:
+                str: Адрес запроса
+
+        >>> CbrFetcher(None).get_url("XML_daily.asp", {"date_req": "01/02/2003"})
+        'http://www.cbr.ru/scripts/XML_daily.asp?date_req=01/02/2003'
+        """
+        return self.base_url + script + "?" + "&".join(f"{key}={value}" for key, value in params.items())
+
+    def is_final(self, params : dict, today : datetime.date = None):
+        """Проверяет, что период запроса закончился до сегодняшнего дня и ответ больше не изменится
+
+            Args:
+                params (dict): Параметры запроса
+                today (datetime.date): Сегодняшняя дата, по умолчанию текущая
+
+            Returns:
+                bool: Можно ли хранить ответ в кэше
+
+        >>> fetcher = CbrFetcher(None)
+        >>> fetcher.is_final({"date_req": "01/02/2003"}), fetcher.is_final({"date_req1": "01/01/2003", "date_req2": "01/01/2100"})
+        (True, False)
+        """
+        end = next((params[key] for key in end_params if key in params), None)
+        if end is None:
+            return False
+        today = today if today is not None else datetime.date.today()
+        return datetime.datetime.strptime(end, "%d/%m/%Y").date() < today
+
+    def read_cache(self, url : str):
+        """Возвращает сохраненный ответ на запрос
+
+            Args:
+                url (str): Адрес запроса
+
+            Returns:
+                bytes: Ответ или None, если его нет в кэше
+        """
+        if self.cache_folder is None:
+            return None
+        url_path = os.path.join(self.cache_folder, "urls", hashlib.sha1(url.encode("utf-8")).hexdigest())
+        try:
+            with open(url_path, encoding="utf-8") as file:
+                content_key = file.read()
+            with open(os.path.join(self.cache_folder, "objects", content_key + ".xml"), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def write_cache(self, url : str, content : bytes):
+        """Сохраняет ответ по хэшу содержимого и связывает с ним адрес запроса, файлы заменяются целиком
+
+            Args:
+                url (str): Адрес запроса
+                content (bytes): Ответ
+        """
+        if self.cache_folder is None:
+            return
+        content_key = hashlib.blake2b(content, digest_size=16).hexdigest()
+        for folder in ("objects", "urls"):
+            os.makedirs(os.path.join(self.cache_folder, folder), exist_ok=True)
+        object_path = os.path.join(self.cache_folder, "objects", content_key + ".xml")
+        if not os.path.exists(object_path):
+            with open(object_path + "." + str(os.getpid()) + ".tmp", "wb") as file:
+                file.write(content)
+            os.replace(object_path + "." + str(os.getpid()) + ".tmp", object_path)
+        url_path = os.path.join(self.cache_folder, "urls", hashlib.sha1(url.encode("utf-8")).hexdigest())
+        with open(url_path + "." + str(os.getpid()) + ".tmp", "w", encoding="utf-8") as file:
+            file.write(content_key)
+        os.replace(url_path + "." + str(os.getpid()) + ".tmp", url_path)
+
+    def fetch(self, script : str, params : dict):
+        """Загружает ответ на один запрос: из кэша или из сети с повторами.
+        Ответ сохраняется в кэш, только если период запроса уже закончился
+
+            Args:
+                script (str): Название скрипта
+                params (dict): Параметры запроса
+
+            Returns:
+                bytes: XML ответа
+        """
+        url = self.get_url(script, params)
+        final = self.is_final(params)
+        content = self.read_cache(url) if final else None
+        if content is not None:
+            return content
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+                if response.status_code not in retry_statuses:
+                    response.raise_for_status()
+                    break
+                error = requests.HTTPError(f"{response.status_code} для {url}", response=response)
+            except (requests.ConnectionError, requests.Timeout) as exception:
+                error = exception
+            if attempt == self.retries:
+                raise error
+            time.sleep(self.backoff * 2 ** attempt)
+        if final:
+            self.write_cache(url, response.content)
+        return response.content
+
+    def fetch_many(self, queries : list, return_exceptions : bool = False):
+        """Загружает ответы на несколько запросов параллельно, не больше max_workers одновременно
+
+            Args:
+                queries (list): Пары (название скрипта, параметры запроса)
+                return_exceptions (bool): Возвращать ошибку запроса вместо ответа, иначе первая ошибка выбрасывается
+
+            Returns:
+                list: XML ответов (или ошибки) в порядке запросов
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            queue = [executor.submit(self.fetch, *query) for query in queries]
+        if not return_exceptions:
+            return [answer.result() for answer in queue]
+        return [answer.exception() if answer.exception() is not None else answer.result() for answer in queue]
+
+    def get_daily(self, dates : list, return_exceptions : bool = False):
+        """Загружает курсы всех валют на каждую дату
+
+            Args:
+                dates (list): Даты в формате dd/mm/yyyy
+                return_exceptions (bool): Возвращать ошибку запроса вместо ответа, иначе первая ошибка выбрасывается
+
+            Returns:
+                list: XML ответов XML_daily.asp (или ошибки)
+        """
+        return self.fetch_many([("XML_daily.asp", {"date_req": date}) for date in dates], return_exceptions)
+
+    def get_dynamic(self, currency_ids : list, start : str, end : str):
+        """Загружает динамику курса каждой валюты за период
+
+            Args:
+                currency_ids (list): Коды валют ЦБ, например R01235
+                start (str): Начало периода в формате dd/mm/yyyy
+                end (str): Конец периода в формате dd/mm/yyyy
+
+            Returns:
+                list: XML ответов XML_dynamic.asp
+        """
+        return self.fetch_many([("XML_dynamic.asp", {"date_req1": start, "date_req2": end, "VAL_NM_RQ": currency_id})
+                                for currency_id in currency_ids])
@@ -0,0 +1,183 @@
+import datetime
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+stub_currencies = {
+    "R01235": ("USD", 1),
+    "R01239": ("EUR", 1),
+    "R01335": ("KZT", 100),
+    "R01720": ("UAH", 10),
+    "R01090": ("BYR", 1000)
+}
+
+
+def stub_rate(currency_id : str, date : datetime.date):
+    """Возвращает выдуманный, но одинаковый при каждом запросе курс валюты на дату
+
+        Args:
+            currency_id (str): Код валюты ЦБ
+            date (datetime.date): Дата
+
+        Returns:
+            str: Курс в формате ЦБ, с запятой
+
+    >>> stub_rate("R01235", datetime.date(2003, 1, 1))
+    '30,0101'
+    """
+    value = 30 + list(stub_currencies).index(currency_id) * 5 + date.month / 100 + date.day / 10000 + (date.year - 2003) / 10
+    return f"{value:.4f}".replace(".", ",")
+
+
+def parse_date(text : str):
+    """Переводит дату из формата dd/mm/yyyy в datetime.date
+
+        Args:
+            text (str): Дата
+
+        Returns:
+            datetime.date: Дата
+    """
+    return datetime.datetime.strptime(text, "%d/%m/%Y").date()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Класс обработчика запросов заглушки сервиса курсов ЦБ: XML_daily.asp и XML_dynamic.asp.
+    Соединения не закрываются после ответа, как и у настоящего сервиса
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def send_empty(self, status : int):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests_count += 1
+            number = server.requests_count
+        if server.delay:
+            time.sleep(server.delay)
+        if server.fail_every and number % server.fail_every == 0:
+            self.send_empty(503)
+            return
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path.endswith("XML_daily.asp"):
+            body = self.get_daily(params)
+        elif url.path.endswith("XML_dynamic.asp"):
+            body = self.get_dynamic(params)
+        else:
+            self.send_empty(404)
+            return
+        content = body.encode("windows-1251")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml; charset=windows-1251")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def get_daily(self, params : dict):
+        date = parse_date(params["date_req"])
+        valutes = "".join(f'<Valute ID="{currency_id}"><CharCode>{code}</CharCode><Nominal>{nominal}</Nominal>'
+                          f'<Value>{stub_rate(currency_id, date)}</Value></Valute>'
+                          for currency_id, (code, nominal) in stub_currencies.items())
+        return f'<?xml version="1.0" encoding="windows-1251"?><ValCurs Date="{date:%d.%m.%Y}" name="Foreign Currency Market">{valutes}</ValCurs>'
+
+    def get_dynamic(self, params : dict):
+        start = parse_date(params["date_req1"])
+        end = parse_date(params["date_req2"])
+        currency_id = params["VAL_NM_RQ"]
+        records = []
+        date = start
+        while date <= end and currency_id in stub_currencies:
+            records.append(f'<Record Date="{date:%d.%m.%Y}" Id="{currency_id}"><Nominal>{stub_currencies[currency_id][1]}</Nominal>'
+                           f'<Value>{stub_rate(currency_id, date)}</Value></Record>')
+            date += datetime.timedelta(days=1)
+        return (f'<?xml version="1.0" encoding="windows-1251"?><ValCurs ID="{currency_id}" DateRange1="{start:%d.%m.%Y}" '
+                f'DateRange2="{end:%d.%m.%Y}" name="Foreign Currency Market Dynamic">{"".join(records)}</ValCurs>')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    """Класс HTTP сервера заглушки с длинной очередью соединений для параллельных запросов
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class StubServer:
+    """Класс локальной заглушки сервиса курсов ЦБ для проверки и замеров загрузчика без сети.
+    Может добавлять задержку к каждому ответу и отвечать ошибкой 503 на каждый n-й запрос
+
+    Attributes:
+        delay (float): Задержка ответа в секундах
+        fail_every (int): Номер запроса, на каждый кратный которому приходит ошибка, 0 чтобы не ошибаться
+        base_url (str): Адрес заглушки для CbrFetcher, известен после start
+    """
+    def __init__(self, delay : float = 0, fail_every : int = 0):
+        """Инициализирует объект StubServer
+
+            Args:
+                delay (float): Задержка ответа в секундах
+                fail_every (int): Каждый fail_every-й запрос завершается ошибкой 503, 0 чтобы не ошибаться
+        """
+        self.delay = delay
+        self.fail_every = fail_every
+        self.base_url = None
+        self.__server = None
+        self.__thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def requests_count(self):
+        """Возвращает число полученных запросов
+
+            Returns:
+                int: Число запросов
+        """
+        return self.__server.requests_count
+
+    def start(self):
+        """Запускает заглушку на свободном порту в отдельном потоке
+
+            Returns:
+                StubServer: Запущенная заглушка
+        """
+        self.__server = StubHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.__server.delay = self.delay
+        self.__server.fail_every = self.fail_every
+        self.__server.requests_count = 0
+        self.__server.lock = threading.Lock()
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+        self.base_url = f"http://127.0.0.1:{self.__server.server_address[1]}/scripts/"
+        return self
+
+    def stop(self):
+        """Останавливает заглушку
+        """
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__thread.join()
+
+
+if __name__ == "__main__":
+    from cbr_fetcher import CbrFetcher
+    dates = [f"01/{month:02d}/{year}" for year in range(2003, 2023) for month in range(1, 13)]
+    with StubServer(delay=0.02, fail_every=25) as server:
+        for workers in (1, 16):
+            start = time.time()
+            with CbrFetcher(None, server.base_url, max_workers=workers, backoff=0.01) as fetcher:
+                fetcher.get_daily(dates)
+            print(f"{len(dates)} запросов, потоков {workers}: {time.time() - start:.2f} с")
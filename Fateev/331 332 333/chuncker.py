@@ -1,27 +1,109 @@
-def write_chunk(file_name, lines, header):
-    """Сохраняет файл в виде csv файла 
+import csv
+import os
+from collections import OrderedDict
+
+partition_keys = {
+    "year": lambda row, indexes: row[indexes["published_at"]][0:4],
+    "month": lambda row, indexes: row[indexes["published_at"]][0:7],
+    "currency": lambda row, indexes: (row[indexes["salary_currency"]] if "salary_currency" in indexes else "") or "none"
+}
+
+
+class CsvPartitioner:
+    """Класс для потоковой записи строк CSV в файлы-разделы.
+    Для каждого раздела держит буферизованный файл, число открытых файлов ограничено,
+    поэтому память не зависит от размера исходного файла.
+
+    Attributes:
+        folder (str): Папка для файлов-разделов
+        header (list): Заголовки CSV файла
+        max_open_files (int): Максимальное число одновременно открытых файлов
+        buffer_size (int): Размер буфера записи для одного файла
+    """
+    def __init__(self, folder : str, header : list, max_open_files : int = 64, buffer_size : int = 1024 * 1024):
+        """Инициализирует объект CsvPartitioner
+
+            Args:
+                folder (str): Папка для файлов-разделов
+                header (list): Заголовки CSV файла
+                max_open_files (int): Максимальное число одновременно открытых файлов
+                buffer_size (int): Размер буфера записи для одного файла
+        """
+        self.folder = folder
+        self.header = header
+        self.max_open_files = max_open_files
+        self.buffer_size = buffer_size
+        self.file_names = {}
+        self.__files = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_writer(self, key : str):
+        """Возвращает writer для раздела, при необходимости закрывая давно не использованный файл
+
+            Args:
+                key (str): Ключ раздела
+
+            Returns:
+                csv.writer: Writer для файла раздела
+        """
+        if key in self.__files:
+            self.__files.move_to_end(key)
+            return self.__files[key][1]
+        if len(self.__files) >= self.max_open_files:
+            self.__files.popitem(last=False)[1][0].close()
+        if key not in self.file_names:
+            self.file_names[key] = os.path.join(self.folder, "vacancies_" + key + ".csv")
+            print("Saving", self.file_names[key])
+            file = open(self.file_names[key], "w", encoding="utf-8-sig", newline="", buffering=self.buffer_size)
+            writer = csv.writer(file, lineterminator="\n")
+            writer.writerow(self.header)
+        else:
+            file = open(self.file_names[key], "a", encoding="utf-8-sig", newline="", buffering=self.buffer_size)
+            writer = csv.writer(file, lineterminator="\n")
+        self.__files[key] = (file, writer)
+        return writer
+
+    def write(self, key : str, row : list):
+        """Записывает строку в раздел
+
+            Args:
+                key (str): Ключ раздела
+                row (list): Строка CSV файла
+        """
+        self.get_writer(key).writerow(row)
+
+    def close(self):
+        """Сбрасывает буферы и закрывает все открытые файлы
+        """
+        while self.__files:
+            self.__files.popitem()[1][0].close()
+
+
+def сsv_chuncker(file_name, key="year", folder="csv", max_open_files=64):
+    """Потоково разделяет вакансии по годам, месяцам или валютам и сохраняет их
+
         Args:
-            file_name (str): Название файла
-            fields (str): Поля csv файла
-            lines (str): Вакансии через \n
+            file_name (str): Название файла для разделения
+            key (str): Ключ разделения: year, month или currency (если столбца валюты нет, раздел none)
+            folder (str): Папка для файлов-разделов
+            max_open_files (int): Максимальное число одновременно открытых файлов
+
+        Returns:
+            dict: Названия созданных файлов для каждого ключа
     """
-    print("Saving", file_name)
-    with open('csv//vacancies_'+ file_name +'.csv', 'w', encoding="utf-8-sig") as f_out:
-        f_out.write(header)
-        f_out.writelines(lines)
-        f_out.close()
-
-def сsv_chuncker(file_name):
-    dictionary = {}
-    with open(file_name, 'r', encoding="utf-8-sig") as f:
-        header = f.readline()
-        for x in f:
-            listLine = x.split(",")
-            year = listLine[-1].split('-')[0]
-            if (year in dictionary.keys()):
-                dictionary[year].append(x)
-            else:
-                dictionary[year] = [x]
-
-        for data in dictionary:
-            write_chunk(data, dictionary[data], header)
\ No newline at end of file
+    get_key = partition_keys[key]
+    with open(file_name, 'r', encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        indexes = {field: header.index(field) for field in header}
+        with CsvPartitioner(folder, header, max_open_files) as partitioner:
+            for row in reader:
+                if len(row) != len(header):
+                    continue
+                partitioner.write(get_key(row, indexes), row)
+    return partitioner.file_names
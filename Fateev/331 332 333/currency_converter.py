@@ -0,0 +1,243 @@
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+
+class RateTable:
+    """Класс таблицы курсов валют в виде двумерного массива период x валюта, период - месяц или день.
+    Курс для каждой строки находится по паре (номер периода, номер валюты) одной выборкой из массива,
+    номера периодов находятся двоичным поиском сразу для всех вакансий.
+    Первый столбец - рубль с курсом 1, последний столбец и последняя строка заполнены nan:
+    туда попадают неизвестные валюты и месяцы
+
+    Attributes:
+        months (np.ndarray): Периоды по возрастанию: месяцы yyyy-mm или дни yyyy-mm-dd
+        currencies (list): Валюты, номер валюты - номер столбца rates
+        rates (np.ndarray): Курсы валют, форма (число месяцев + 1, число валют + 1)
+        memory (SharedMemory): Общая память, в которой лежит rates, если таблица к ней подключена
+    """
+    def __init__(self, months, currencies, rates, memory=None):
+        """Инициализирует объект RateTable
+
+            Args:
+                months (np.ndarray): Периоды по возрастанию: месяцы yyyy-mm или дни yyyy-mm-dd
+                currencies (list): Валюты, первая - рубль
+                rates (np.ndarray): Курсы валют с дополнительными строкой и столбцом nan
+                memory (SharedMemory): Общая память, в которой лежит rates, если таблица к ней подключена
+        """
+        self.months = months
+        self.currencies = currencies
+        self.rates = rates
+        self.memory = memory
+
+    @staticmethod
+    def from_arrays(months, currencies, rates):
+        """Создает таблицу курсов из месяцев, валют и курсов в любом порядке месяцев
+
+            Args:
+                months (np.ndarray): Периоды: месяцы yyyy-mm или дни yyyy-mm-dd
+                currencies (list): Валюты без рубля
+                rates (np.ndarray): Курсы валют, форма (число месяцев, число валют)
+
+            Returns:
+                RateTable: Таблица курсов
+        """
+        months = np.array([str(month) for month in months], dtype=str)
+        order = np.argsort(months, kind="stable")
+        table = np.full((len(months) + 1, len(currencies) + 2), np.nan)
+        table[:, 0] = 1.0
+        table[:-1, 1:-1] = np.asarray(rates, dtype=np.float64).reshape(len(months), len(currencies))[order]
+        return RateTable(months[order], ["RUR"] + list(currencies), table)
+
+    def share(self):
+        """Копирует курсы в общую память один раз. Процессы подключаются к ней методом attach
+        и читают одни и те же страницы памяти без копирования и сериализации таблицы
+
+            Returns:
+                SharedMemory, dict: Общая память (ее нужно закрыть и удалить после работы пула)
+                    и описание таблицы для attach
+
+        >>> memory, description = RateTable.from_arrays(["2003-01"], ["USD"], [[30.0]]).share()
+        >>> table = RateTable.attach(description)
+        >>> table.get_rates(["2003-01"], ["USD"]).tolist()
+        [30.0]
+        >>> table.close(); memory.close(); memory.unlink()
+        """
+        memory = shared_memory.SharedMemory(create=True, size=max(self.rates.nbytes, 1))
+        np.ndarray(self.rates.shape, dtype=self.rates.dtype, buffer=memory.buf)[:] = self.rates
+        description = {"name": memory.name, "shape": self.rates.shape, "months": self.months.tolist(),
+                       "currencies": self.currencies}
+        return memory, description
+
+    @staticmethod
+    def attach(description : dict):
+        """Подключается к таблице курсов в общей памяти без копирования
+
+            Args:
+                description (dict): Описание таблицы, полученное методом share
+
+            Returns:
+                RateTable: Таблица курсов, rates которой лежит в общей памяти
+        """
+        memory = shared_memory.SharedMemory(name=description["name"])
+        rates = np.ndarray(description["shape"], dtype=np.float64, buffer=memory.buf)
+        return RateTable(np.array(description["months"], dtype=str), description["currencies"], rates, memory)
+
+    def close(self):
+        """Отключается от общей памяти, если таблица к ней подключена
+        """
+        if self.memory is not None:
+            self.rates = None
+            self.memory.close()
+            self.memory = None
+
+    @staticmethod
+    def from_dataframe(dataframe):
+        """Создает таблицу курсов из DataFrame со столбцом date и столбцом для каждой валюты,
+        столбец RUR не нужен и пропускается
+
+            Args:
+                dataframe (pd.DataFrame): Курсы валют по месяцам
+
+            Returns:
+                RateTable: Таблица курсов
+
+        >>> table = RateTable.from_dataframe(pd.DataFrame({"date": ["2003-02", "2003-01"], "USD": [31.8, 31.7]}))
+        >>> table.get_rates(["2003-01", "2003-03", "2003-02"], ["USD", "USD", "RUR"]).tolist()
+        [31.7, nan, 1.0]
+        """
+        currencies = [column for column in dataframe.columns if column not in ("date", "RUR")]
+        rates = dataframe[currencies].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+        return RateTable.from_arrays(dataframe["date"].astype(str).to_numpy(), currencies, rates)
+
+    @staticmethod
+    def from_series(series : dict, periods, fill : str = None):
+        """Создает таблицу курсов из рядов курсов валют, приведенных к месяцам или дням
+
+            Args:
+                series (dict): RateSeries для каждой валюты
+                periods (np.ndarray): Периоды datetime64[M] (месяцы) или datetime64[D] (дни)
+                fill (str): Способ заполнения пропусков: None, ffill или interpolate
+
+            Returns:
+                RateTable: Таблица курсов
+
+        >>> from rate_series import RateSeries
+        >>> series = {"USD": RateSeries(["2003-01-02", "2003-01-04"], [30.0, 32.0])}
+        >>> table = RateTable.from_series(series, np.arange("2003-01-01", "2003-01-05", dtype="datetime64[D]"), "ffill")
+        >>> table.get_rates(["2003-01-01T10:00:00+0300", "2003-01-03T10:00:00+0300"], ["USD", "USD"]).tolist()
+        [nan, 30.0]
+        """
+        periods = np.asarray(periods)
+        rates = np.column_stack([series[currency].resample(periods, fill) for currency in series]) if len(series) != 0 \
+            else np.zeros((len(periods), 0))
+        return RateTable.from_arrays(periods.astype(str), list(series), rates)
+
+    @staticmethod
+    def from_csv(file_name : str):
+        """Читает таблицу курсов из файла currencies.csv
+
+            Args:
+                file_name (str): Имя файла
+
+            Returns:
+                RateTable: Таблица курсов
+        """
+        return RateTable.from_dataframe(pd.read_csv(file_name))
+
+    def get_month_indexes(self, months):
+        """Находит номера строк для периодов двоичным поиском, неизвестные периоды получают номер последней строки
+
+            Args:
+                months (np.ndarray): Периоды или даты публикации, они обрезаются до длины периодов таблицы
+
+            Returns:
+                np.ndarray: Номера строк rates
+        """
+        months = np.asarray(months, dtype=self.months.dtype)
+        positions = np.searchsorted(self.months, months)
+        found = positions < len(self.months)
+        found[found] = self.months[positions[found]] == months[found]
+        return np.where(found, positions, len(self.months))
+
+    def get_currency_indexes(self, currencies):
+        """Находит номера столбцов для валют, неизвестные валюты получают номер последнего столбца
+
+            Args:
+                currencies (np.ndarray): Валюты
+
+            Returns:
+                np.ndarray: Номера столбцов rates
+        """
+        uniques, codes = np.unique(np.asarray(currencies, dtype=str), return_inverse=True)
+        known = {currency: number for number, currency in enumerate(self.currencies)}
+        columns = np.array([known.get(currency, len(self.currencies)) for currency in uniques.tolist()], dtype=np.int64)
+        return columns[codes.ravel()] if len(uniques) != 0 else np.zeros(0, dtype=np.int64)
+
+    def get_rates(self, months, currencies):
+        """Возвращает курс для каждой пары месяц - валюта одной выборкой из массива
+
+            Args:
+                months (np.ndarray): Месяцы или даты публикации
+                currencies (np.ndarray): Валюты
+
+            Returns:
+                np.ndarray: Курсы, nan для неизвестных валют и месяцев
+        """
+        return self.rates[self.get_month_indexes(months), self.get_currency_indexes(currencies)]
+
+
+def convert_salaries(table : RateTable, published_at, currencies, salary_from, salary_to):
+    """Переводит зарплаты в рубли за один проход по столбцам. Отсутствующая граница вилки задается -1,
+    если известна одна граница - берется она, если обе - их среднее.
+    Рублевая зарплата с одной границей остается целым числом, как и в исходных данных.
+    Если зарплату перевести нельзя, возвращается пустая строка
+
+        Args:
+            table (RateTable): Таблица курсов
+            published_at (np.ndarray): Даты публикации вакансий
+            currencies (np.ndarray): Валюты оклада
+            salary_from (np.ndarray): Нижние границы вилки оклада, -1 если нет
+            salary_to (np.ndarray): Верхние границы вилки оклада, -1 если нет
+
+        Returns:
+            list: Зарплата в рублях или пустая строка для каждой вакансии
+
+    >>> table = RateTable.from_dataframe(pd.DataFrame({"date": ["2003-01"], "USD": [30.0]}))
+    >>> convert_salaries(table, ["2003-01-07T00:00:00+0400"] * 5, ["USD", "RUR", "RUR", "GEL", "USD"],
+    ...                  np.array([100, -1, 100, 100, -1]), np.array([300, 500, 300, 300, -1]))
+    [6000.0, 500, 200.0, '', '']
+    """
+    salary_from = np.asarray(salary_from, dtype=np.float64)
+    salary_to = np.asarray(salary_to, dtype=np.float64)
+    values = np.where(salary_from == -1, salary_to, np.where(salary_to == -1, salary_from, (salary_to + salary_from) / 2))
+    values[(salary_from == -1) & (salary_to == -1)] = np.nan
+    currency_indexes = table.get_currency_indexes(currencies)
+    salaries = table.rates[table.get_month_indexes(published_at), currency_indexes] * values
+    result = salaries.astype(object)
+    integers = (currency_indexes == 0) & ((salary_from == -1) != (salary_to == -1))
+    result[integers] = values[integers].astype(np.int64).astype(object)
+    result[np.isnan(salaries)] = ""
+    return result.tolist()
+
+
+worker_table = None
+
+
+def init_worker(description : dict):
+    """Инициализатор процесса пула: один раз подключает процесс к таблице курсов в общей памяти
+
+        Args:
+            description (dict): Описание таблицы, полученное методом RateTable.share
+    """
+    global worker_table
+    worker_table = RateTable.attach(description)
+
+
+def get_worker_table():
+    """Возвращает таблицу курсов, к которой подключен процесс пула
+
+        Returns:
+            RateTable: Таблица курсов
+    """
+    return worker_table
@@ -0,0 +1,208 @@
+import concurrent.futures
+import csv
+import io
+import mmap
+import os
+import pandas as pd
+
+scan_fields = ["published_at", "salary_currency"]
+block_size = 64 * 1024 * 1024
+
+
+class CurrencyScan:
+    """Класс итогов просмотра файла: самая ранняя и самая поздняя даты публикации и количество вакансий
+    для каждой валюты. Итоги частей файла объединяются методом merge
+
+    Attributes:
+        min_date (str): Самая ранняя дата публикации или None
+        max_date (str): Самая поздняя дата публикации или None
+        counts (dict): Количество вакансий для каждой валюты, пустая строка - валюта не указана
+    """
+    def __init__(self, min_date : str = None, max_date : str = None, counts : dict = None):
+        """Инициализирует объект CurrencyScan
+
+            Args:
+                min_date (str): Самая ранняя дата публикации
+                max_date (str): Самая поздняя дата публикации
+                counts (dict): Количество вакансий для каждой валюты
+        """
+        self.min_date = min_date
+        self.max_date = max_date
+        self.counts = counts if counts is not None else {}
+
+    def add(self, chunk : pd.DataFrame):
+        """Учитывает очередной пакет строк
+
+            Args:
+                chunk (pd.DataFrame): Пакет со столбцами published_at и salary_currency
+        """
+        dates = chunk["published_at"]
+        dates = dates[dates != ""]
+        if len(dates) != 0:
+            self.merge(CurrencyScan(dates.min(), dates.max()))
+        for currency, count in chunk["salary_currency"].value_counts(sort=False).items():
+            self.counts[currency] = self.counts.get(currency, 0) + int(count)
+
+    def merge(self, other):
+        """Добавляет итоги другой части файла
+
+            Args:
+                other (CurrencyScan): Итоги другой части
+
+            Returns:
+                CurrencyScan: Этот объект с общими итогами
+
+        >>> scan = CurrencyScan("2007-12-03", "2008-01-01", {"RUR": 2}).merge(CurrencyScan("2005-01-01", "2006-01-01", {"RUR": 1, "USD": 1}))
+        >>> scan.min_date, scan.max_date, scan.counts
+        ('2005-01-01', '2008-01-01', {'RUR': 3, 'USD': 1})
+        """
+        dates = [date for date in (self.min_date, self.max_date, other.min_date, other.max_date) if date is not None]
+        self.min_date = min(dates, default=None)
+        self.max_date = max(dates, default=None)
+        for currency, count in other.counts.items():
+            self.counts[currency] = self.counts.get(currency, 0) + count
+        return self
+
+
+class ByteRangeReader(io.RawIOBase):
+    """Класс для чтения диапазона байт файла как отдельного файла, pandas читает его пакетами,
+    поэтому диапазон не загружается в память целиком
+
+    Attributes:
+        file (io.BufferedReader): Открытый файл
+        remaining (int): Сколько байт диапазона осталось прочитать
+    """
+    def __init__(self, file_name : str, start : int, end : int):
+        """Инициализирует объект ByteRangeReader
+
+            Args:
+                file_name (str): Имя файла
+                start (int): Начало диапазона
+                end (int): Конец диапазона
+        """
+        self.file = open(file_name, "rb")
+        self.file.seek(start)
+        self.remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        read = self.file.readinto(memoryview(buffer)[:size])
+        self.remaining -= read
+        return read
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+def get_header(file_name : str, encoding : str = "utf-8-sig"):
+    """Читает заголовки CSV файла и находит начало данных
+
+        Args:
+            file_name (str): Имя файла
+            encoding (str): Кодировка файла
+
+        Returns:
+            list, int: Заголовки и позиция первой строки с данными
+    """
+    with open(file_name, "rb") as file:
+        line = file.readline()
+    return next(csv.reader([line.decode(encoding)]), []), len(line)
+
+
+def split_ranges(file_name : str, start : int, parts : int):
+    """Делит файл на диапазоны байт, границы которых совпадают с концами строк CSV.
+    Кавычки считаются блоками, чтобы не резать поле с переводом строки внутри
+
+        Args:
+            file_name (str): Имя файла
+            start (int): Позиция первой строки с данными
+            parts (int): Желаемое количество диапазонов
+
+        Returns:
+            list: Пары (начало, конец) для каждого диапазона
+    """
+    size = os.stat(file_name).st_size
+    if size <= start:
+        return []
+    bounds = [start]
+    with open(file_name, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            position = start
+            quoted = False
+            for part in range(1, parts):
+                target = start + (size - start) * part // parts
+                if target <= position:
+                    continue
+                for block in range(position, target, block_size):
+                    quoted ^= data[block:min(block + block_size, target)].count(b'"') % 2 == 1
+                position = target
+                while True:
+                    newline = data.find(b"\n", position)
+                    if newline == -1:
+                        position = size
+                        break
+                    quoted ^= data[position:newline].count(b'"') % 2 == 1
+                    position = newline + 1
+                    if not quoted:
+                        break
+                if position >= size:
+                    break
+                bounds.append(position)
+    bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+
+
+def scan_range(file_name : str, fields : list, start : int, end : int, chunk_size : int = 100000,
+               encoding : str = "utf-8-sig"):
+    """Просматривает диапазон байт файла пакетами, читая только столбцы published_at и salary_currency как строки
+
+        Args:
+            file_name (str): Имя файла
+            fields (list): Заголовки CSV файла
+            start (int): Начало диапазона (после заголовка)
+            end (int): Конец диапазона
+            chunk_size (int): Количество строк в пакете
+            encoding (str): Кодировка файла
+
+        Returns:
+            CurrencyScan: Итоги диапазона
+    """
+    scan = CurrencyScan()
+    with io.BufferedReader(ByteRangeReader(file_name, start, end), buffer_size=1024 * 1024) as file:
+        chunks = pd.read_csv(file, header=None, names=fields, usecols=scan_fields, dtype=str, na_filter=False,
+                             chunksize=chunk_size, encoding="utf-8" if encoding.lower() == "utf-8-sig" else encoding)
+        for chunk in chunks:
+            scan.add(chunk)
+    return scan
+
+
+def scan_file(file_name : str, workers : int = 1, chunk_size : int = 100000, encoding : str = "utf-8-sig"):
+    """Находит диапазон дат публикации и количество вакансий по валютам за один проход по файлу.
+    Память ограничена размером пакета, при workers > 1 диапазоны байт файла просматриваются параллельно
+
+        Args:
+            file_name (str): Имя файла
+            workers (int): Количество процессов
+            chunk_size (int): Количество строк в пакете
+            encoding (str): Кодировка файла
+
+        Returns:
+            CurrencyScan: Итоги файла
+    """
+    fields, start = get_header(file_name, encoding)
+    ranges = split_ranges(file_name, start, workers)
+    if workers == 1 or len(ranges) <= 1:
+        return scan_range(file_name, fields, start, os.stat(file_name).st_size, chunk_size, encoding)
+    scan = CurrencyScan()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        queue = [executor.submit(scan_range, file_name, fields, range_start, range_end, chunk_size, encoding)
+                 for range_start, range_end in ranges]
+        for answer in queue:
+            scan.merge(answer.result())
+    return scan
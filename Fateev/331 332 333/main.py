@@ -1,4 +1,3 @@
-from multiprocessing import Pool, cpu_count
 import csv
 import os
 import re
@@ -7,12 +6,13 @@ import numpy as np
 from os import path
 import pandas as pd
 import concurrent.futures
-from functools import partial
 import chuncker
+from currency_converter import RateTable, convert_salaries, init_worker, get_worker_table
+from cbr_fetcher import CbrFetcher
+from rate_series import RateSeries
+from currency_scan import CurrencyScan, scan_file
 from dataclasses import dataclass
 from time import time
-import requests
-import xmltodict
 
 currency_to_id = {
     "AZN": "R01020",
@@ -25,6 +25,8 @@ currency_to_id = {
     "UZS": "R01717"
 }
 
+html_tag = re.compile(r"<[^>]+>")
+
 experienceToRus = {
     "noExperience": "Нет опыта",
     "between1And3": "От 1 года до 3 лет",
@@ -128,7 +130,7 @@ class TextEditor:
             Returns:
                 str: Текст с удаленными HTML тегами
         """
-        return ' '.join(re.sub(r"<[^>]+>", '', string).split()).replace("  ", " ").replace(" ", " ")
+        return ' '.join(html_tag.sub('', string).split()).replace("  ", " ").replace(" ", " ")
 
     def line_trim(string : str):
         """Обрезает str до 100 символов
@@ -290,6 +292,8 @@ class Salary:
         salary_gross (str): Наличие включенного налога
         salary_currency (str): Валюта оклада
     """
+    __slots__ = ("salary_from", "salary_to", "salary_gross", "salary_currency")
+
     def __init__(self, salary_from : str, salary_to : str, salary_gross : str, salary_currency : str):
         """Инициализирует объект Salary, выполняет конвертацию для полей.
 
@@ -347,6 +351,9 @@ class Vacancy:
         area_name (str): Город работы
         published_at (str): Дата публикации вакансии
     """
+    __slots__ = ("name", "_description_raw", "_description", "_key_skills_raw", "_key_skills", "experience_id",
+                 "premium", "employer_name", "salary", "area_name", "published_at")
+
     def __init__(self, name : str, description : str, key_skills : str, experience_id : str, 
                     premium : str, employer_name : str, salary : Salary, area_name : str, published_at : str):
         """Инициализирует объект Vacancy, выполняет конвертацию дляполей.
@@ -368,8 +375,10 @@ class Vacancy:
         'xyz'
         """
         self.name = name
-        self.description = TextEditor.beautifulStr(description)
-        self.key_skills = list(key_skills.split("\n"))
+        self._description_raw = description
+        self._description = None
+        self._key_skills_raw = key_skills
+        self._key_skills = None
         self.experience_id = experience_id
         self.premium = premium
         self.employer_name = employer_name
@@ -377,6 +386,28 @@ class Vacancy:
         self.area_name = area_name
         self.published_at = published_at
 
+    @property
+    def description(self):
+        """Описание вакансии без HTML тегов, очищается при первом обращении
+
+            Returns:
+                str: Описание вакансии
+        """
+        if self._description is None:
+            self._description = TextEditor.beautifulStr(self._description_raw)
+        return self._description
+
+    @property
+    def key_skills(self):
+        """Ключевые навыки вакансии, разделяются при первом обращении
+
+            Returns:
+                list: Ключевые навыки
+        """
+        if self._key_skills is None:
+            self._key_skills = list(self._key_skills_raw.split("\n"))
+        return self._key_skills
+
     def date_to_string(self):
         """Переводит аттрибут published_at класса Vacancy в формат dd.mm.yyyy
 
@@ -418,7 +449,7 @@ class Vacancy:
         >>> Vacancy("x", "<br><b>x</b>yz</br>", 'z', "noExperience", "true", "x", Salary("100", "2000", "true", "RUR"), "x", "2012-10-03T17:12:09+0300").date_get_year()
         2012
         """
-        return int(self.date_to_string().split(".")[-1])
+        return int(self.published_at[0:4])
 
     def premium_to_string(self):
         """Переводит аттрибут premium класса Vacancy в строку на Русском языке
@@ -803,6 +834,22 @@ class CurrencyWorker:
             sorted_vacancies += vacancy[1]
         return currencies, sorted_vacancies
 
+    def scan_currencies(self, file_names, workers=1):
+        """Считает вакансии по валютам и находит диапазон дат публикации за один проход по каждому файлу,
+        не создавая объекты Vacancy: читаются только столбцы published_at и salary_currency
+
+            Args:
+                file_names (list): Названия файлов
+                workers (int): Количество процессов для просмотра одного файла
+
+            Returns:
+                dict, CurrencyScan: Валюты, встречающиеся не реже 5000 раз, и общие итоги просмотра
+        """
+        scan = CurrencyScan()
+        for file_name in file_names:
+            scan.merge(scan_file(file_name, workers))
+        return self.filter_currencies(scan.counts), scan
+
     def create_date_range(self, start, end):
         start = start.split(".")
         startMonth = int(start[1])
@@ -820,48 +867,50 @@ class CurrencyWorker:
             startMonth += 1    
         return date_range
 
-    def get_exchange_rate(self, currencies, start, end):
-        currencies = list(currencies.keys())
+    def get_exchange_rate(self, currencies, start, end, fetcher=None):
+        """Загружает курсы валют за период, запросы для всех валют выполняются параллельно
+
+            Args:
+                currencies (dict): Валюты
+                start (str): Начало периода в формате dd.mm.yyyy
+                end (str): Конец периода в формате dd.mm.yyyy
+                fetcher (CbrFetcher): Загрузчик курсов ЦБ, по умолчанию новый загрузчик с кэшем в папке cbr_cache,
+                    который закрывается после загрузки
+
+            Returns:
+                dict: Ряд курсов RateSeries для каждой валюты, у которой есть курсы за период
+        """
+        if fetcher is None:
+            with CbrFetcher() as fetcher:
+                return self.get_exchange_rate(currencies, start, end, fetcher)
+        currencies = [currency for currency in currencies.keys() if currency != "RUR"]
         start = start.replace(".", "/")     
         end = end.replace(".", "/")
+        responses = fetcher.get_dynamic([currency_to_id[currency] for currency in currencies], start, end)
         out = {}
-        for currency in currencies:
-
-            if currency == "RUR":
-                continue
-            url = f"http://www.cbr.ru/scripts/XML_dynamic.asp?date_req1={start}&date_req2={end}&VAL_NM_RQ={currency_to_id[currency]}"
-            response = requests.get(url)
-            dict_data = xmltodict.parse(response.content)
-
-            if "Record" not in dict_data["ValCurs"]:
-                continue
-            records = dict_data["ValCurs"]["Record"]
-            used = []
-            dicts = []
-            for record in records:
-                date = record["@Date"].split(".")
-                for i in range(1, 30):
-                    if f"{date[1]}.{date[2]}" not in used and date[0] == str(i).zfill(2):
-                        used.append(f"{date[1]}.{date[2]}")
-                        dicts.append({"Date" : f"{date[1]}.{date[2]}", "Value" : record['Value'], "Nominal" : record['Nominal']})
-                        break
-            out[currency] = dicts
+        for currency, content in zip(currencies, responses):
+            series = RateSeries.from_xml(content)
+            if len(series.dates) != 0:
+                out[currency] = series
         return out
     
-    def create_dataframe(self, currencies, start, end):
-        dataframe = pd.DataFrame(columns=["date"])
+    def create_dataframe(self, currencies, start, end, fill=None):
+        """Создает таблицу курсов по месяцам: курс месяца - первый курс внутри месяца
+
+            Args:
+                currencies (dict): Ряд курсов RateSeries для каждой валюты
+                start (str): Начало периода в формате dd.mm.yyyy
+                end (str): Конец периода в формате dd.mm.yyyy
+                fill (str): Способ заполнения месяцев без курса: None (пусто), ffill или interpolate
+
+            Returns:
+                pd.DataFrame: Таблица курсов со столбцом date и столбцом для каждой валюты
+        """
         date_column = self.create_date_range(start, end)
-        dataframe["date"] = date_column
-        for currency in currencies:
-            column = list("" for _ in range(len(date_column)))
-            for month in currencies[currency]:
-                date = month["Date"].split(".")
-                date = date[1]+"-"+date[0]
-                value = month["Value"]
-                nominal = month["Nominal"]
-                actual_value = float(value.replace(',','.')) / float(nominal)
-                column[date_column.index(date)] = actual_value
-            dataframe[currency] = column
+        periods = np.array(date_column, dtype="datetime64[M]")
+        dataframe = pd.DataFrame({"date": date_column})
+        for currency, series in currencies.items():
+            dataframe[currency] = series.resample(periods, fill)
         return dataframe.astype({'date': str})   
 
 def main_futures(file_names):
@@ -882,44 +931,71 @@ def main_futures(file_names):
             total_vacancies += result
     return total_vacancies
        
-def form_new_line(currencies, vacancy):
-    
-    date = vacancy.get_month_year()
-    if vacancy.salary.salary_currency == "RUR":
-        exchange_rate = 1
-    elif vacancy.salary.salary_currency in currencies.columns:
-        exchange_rate = float(currencies.loc[((currencies['date'])) == date][vacancy.salary.salary_currency])
-    else:
-        return [vacancy.name,"",vacancy.area_name,vacancy.published_at]
+def form_dataframe(table, vacancies):
+    """Формирует таблицу вакансий с зарплатой в рублях: name, salary, area_name, published_at.
+    Зарплаты переводятся одной векторной выборкой курсов из таблицы курсов
 
-    if vacancy.salary.salary_from == -1 and vacancy.salary.salary_to == -1:
-        return [vacancy.name,"",vacancy.area_name,vacancy.published_at]
+        Args:
+            table (RateTable): Таблица курсов валют по месяцам
+            vacancies (list): Вакансии
+
+        Returns:
+            pd.DataFrame: Таблица вакансий
+    """
+    published_at = [vacancy.published_at for vacancy in vacancies]
+    salaries = convert_salaries(table, published_at,
+                                [vacancy.salary.salary_currency for vacancy in vacancies],
+                                [vacancy.salary.salary_from for vacancy in vacancies],
+                                [vacancy.salary.salary_to for vacancy in vacancies])
+    return pd.DataFrame(data={"name": [vacancy.name for vacancy in vacancies], "salary": salaries,
+                              "area_name": [vacancy.area_name for vacancy in vacancies], "published_at": published_at})
+
+def convert_file(file_name):
+    """Считывает файл и переводит зарплаты его вакансий в рубли, выполняется в процессе пула,
+    подключенном к таблице курсов в общей памяти
+
+        Args:
+            file_name (str): Название файла
 
-    if vacancy.salary.salary_from == -1:
-        return [vacancy.name,exchange_rate * vacancy.salary.salary_to,vacancy.area_name,vacancy.published_at]
-# 
-    if vacancy.salary.salary_to == -1:
-        return [vacancy.name,exchange_rate * vacancy.salary.salary_from,vacancy.area_name,vacancy.published_at]
+        Returns:
+            pd.DataFrame: Таблица вакансий файла
+    """
+    vacancies = CSVReader().get_vacancies(file_name)[1]
+    return form_dataframe(get_worker_table(), vacancies)
+
+def main_convert(file_names, rates_file="currencies.csv", table=None):
+    """Переводит зарплаты вакансий из нескольких файлов в рубли в пуле процессов.
+    Таблица курсов публикуется в общей памяти один раз, процессы подключаются к ней в инициализаторе,
+    поэтому курсы не сериализуются для каждой задачи
 
-    return [vacancy.name,exchange_rate * (vacancy.salary.salary_to + vacancy.salary.salary_from) / 2,vacancy.area_name,vacancy.published_at]
+        Args:
+            file_names (list): Названия файлов
+            rates_file (str): Файл курсов валют по месяцам
+            table (RateTable): Готовая таблица курсов, например из RateStore, тогда rates_file не читается
+
+        Returns:
+            pd.DataFrame: Таблица вакансий всех файлов
+    """
+    table = table if table is not None else RateTable.from_csv(rates_file)
+    memory, description = table.share()
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(len(file_names), os.cpu_count()) or 1,
+                                                    initializer=init_worker, initargs=(description,)) as executor:
+            frames = list(executor.map(convert_file, file_names))
+    finally:
+        memory.close()
+        memory.unlink()
+    if len(frames) == 0:
+        return pd.DataFrame(columns=["name", "salary", "area_name", "published_at"])
+    return pd.concat(frames, ignore_index=True)
 
 if __name__ == "__main__":
     file_name = input("Введите название файла: ")
     #chuncker.сsv_chuncker(file_name)
     currencyWorker = CurrencyWorker()
-    vacancies = main_futures(list(files("csv")))
-    df = pd.read_csv("currencies.csv")
-    p = Pool(cpu_count())
-    lines = p.map(partial(form_new_line, df), vacancies)
-    data = {'name': [], 'salary': [], 'area_name': [], 'published_at': []}
-    for line in lines:
-        data["name"].append(line[0])
-        data["salary"].append(line[1])
-        data["area_name"].append(line[2])
-        data["published_at"].append(line[3])
-    df = pd.DataFrame(data=data)
+    df = main_convert(list(files("csv")))
     df.to_csv("out.csv",index=False)
-    #currencies, vacancies = currencyWorker.get_currencies(list(files("csv")))
-    #currencies = currencyWorker.get_exchange_rate(currencies, f"01.01.{vacancies[0].date_get_year()}", f"10.12.{vacancies[-1].date_get_year()}")
-    #df = currencyWorker.create_dataframe(currencies, f"01.01.{vacancies[0].date_get_year()}", f"10.12.{vacancies[-1].date_get_year()}")
+    #currencies, scan = currencyWorker.scan_currencies(list(files("csv")), os.cpu_count())
+    #currencies = currencyWorker.get_exchange_rate(currencies, f"01.01.{scan.min_date[:4]}", f"10.12.{scan.max_date[:4]}")
+    #df = currencyWorker.create_dataframe(currencies, f"01.01.{scan.min_date[:4]}", f"10.12.{scan.max_date[:4]}")
     #df.to_csv("currencies.csv", index=False)
\ No newline at end of file
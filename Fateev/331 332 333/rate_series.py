@@ -0,0 +1,153 @@
+from xml.etree import ElementTree
+import numpy as np
+
+fill_methods = (None, "ffill", "interpolate")
+
+
+def parse_cbr_dates(values):
+    """Переводит даты ЦБ dd.mm.yyyy в массив дней без разбора каждой строки
+
+        Args:
+            values (list): Даты в формате dd.mm.yyyy
+
+        Returns:
+            np.ndarray: Даты datetime64[D]
+
+    >>> parse_cbr_dates(["03.12.2007", "01.01.2003"]).tolist()
+    [datetime.date(2007, 12, 3), datetime.date(2003, 1, 1)]
+    """
+    chars = np.ascontiguousarray(np.asarray(values, dtype="U10")).view(np.uint32).reshape(-1, 10)
+    iso = chars[:, [6, 7, 8, 9, 2, 3, 4, 5, 0, 1]].copy()
+    iso[:, [4, 7]] = ord("-")
+    return iso.view("U10").ravel().astype("datetime64[D]")
+
+
+def fill_gaps(values, fill : str = None):
+    """Заполняет пропуски (nan) в ряду значений
+
+        Args:
+            values (np.ndarray): Значения по периодам
+            fill (str): None - оставить пропуски, ffill - взять последнее известное значение,
+                interpolate - линейная интерполяция между известными значениями (после последнего - ffill)
+
+        Returns:
+            np.ndarray: Значения без пропусков там, где их можно заполнить
+
+    >>> fill_gaps(np.array([np.nan, 1.0, np.nan, 3.0, np.nan]), "ffill").tolist()
+    [nan, 1.0, 1.0, 3.0, 3.0]
+    >>> fill_gaps(np.array([np.nan, 1.0, np.nan, 3.0, np.nan]), "interpolate").tolist()
+    [nan, 1.0, 2.0, 3.0, 3.0]
+    """
+    if fill not in fill_methods:
+        raise ValueError(f"Неизвестный способ заполнения пропусков: {fill}")
+    known = ~np.isnan(values)
+    if fill is None or known.all() or not known.any():
+        return values
+    if fill == "interpolate":
+        positions = np.flatnonzero(known)
+        return np.interp(np.arange(len(values)), positions, values[positions], left=np.nan, right=values[positions[-1]])
+    last = np.maximum.accumulate(np.where(known, np.arange(len(values)), -1))
+    return np.where(last >= 0, values[np.maximum(last, 0)], np.nan)
+
+
+class RateSeries:
+    """Класс ряда курса одной валюты на отсортированных массивах дат и значений.
+    Курс на любые даты находится двоичным поиском (searchsorted) сразу для всего массива дат,
+    ряд можно привести к месяцам или дням с заполнением пропусков
+
+    Attributes:
+        dates (np.ndarray): Даты курсов datetime64[D] по возрастанию
+        values (np.ndarray): Курс за одну единицу валюты на каждую дату
+    """
+    def __init__(self, dates, values):
+        """Инициализирует объект RateSeries, даты сортируются
+
+            Args:
+                dates (np.ndarray): Даты курсов datetime64[D]
+                values (np.ndarray): Курсы на эти даты
+        """
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        order = np.argsort(dates, kind="stable")
+        self.dates = dates[order]
+        self.values = np.asarray(values, dtype=np.float64)[order]
+
+    @staticmethod
+    def from_xml(content : bytes):
+        """Создает ряд из ответа XML_dynamic.asp
+
+            Args:
+                content (bytes): XML ответа
+
+            Returns:
+                RateSeries: Ряд курса валюты
+
+        >>> series = RateSeries.from_xml('<ValCurs><Record Date="02.01.2003"><Nominal>10</Nominal><Value>59,419</Value></Record></ValCurs>'.encode())
+        >>> series.dates.tolist(), series.values.tolist()
+        ([datetime.date(2003, 1, 2)], [5.9418999999999995])
+        """
+        records = list(ElementTree.fromstring(content).iter("Record"))
+        dates = parse_cbr_dates([record.get("Date") for record in records])
+        values = np.array([record.findtext("Value").replace(",", ".") for record in records], dtype=np.float64)
+        nominals = np.array([record.findtext("Nominal").replace(",", ".") for record in records], dtype=np.float64)
+        return RateSeries(dates, values / nominals if len(records) != 0 else values)
+
+    def lookup(self, dates, fill : str = "ffill"):
+        """Находит курс на каждую дату двоичным поиском
+
+            Args:
+                dates (np.ndarray): Даты datetime64[D] или строки yyyy-mm-dd
+                fill (str): None - только курс ровно на эту дату, ffill - последний курс не позже даты,
+                    interpolate - линейная интерполяция между соседними курсами
+
+            Returns:
+                np.ndarray: Курсы, nan если курс найти нельзя
+
+        >>> series = RateSeries(["2003-01-01", "2003-01-03"], [30.0, 32.0])
+        >>> series.lookup(["2002-12-31", "2003-01-02", "2003-01-03", "2003-02-01"]).tolist()
+        [nan, 30.0, 32.0, 32.0]
+        >>> series.lookup(["2003-01-02"], None).tolist(), series.lookup(["2003-01-02"], "interpolate").tolist()
+        ([nan], [31.0])
+        """
+        if fill not in fill_methods:
+            raise ValueError(f"Неизвестный способ заполнения пропусков: {fill}")
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        if len(self.dates) == 0:
+            return np.full(len(dates), np.nan)
+        if fill == "interpolate":
+            days = self.dates.astype(np.int64)
+            return np.interp(dates.astype(np.int64), days, self.values, left=np.nan, right=self.values[-1])
+        positions = np.searchsorted(self.dates, dates, side="right") - 1
+        found = positions >= 0
+        if fill is None:
+            found &= self.dates[np.maximum(positions, 0)] == dates
+        return np.where(found, self.values[np.maximum(positions, 0)], np.nan)
+
+    def resample(self, periods, fill : str = None):
+        """Приводит ряд к месяцам или дням. Значение периода - первый курс внутри периода,
+        пропуски заполняются способом fill
+
+            Args:
+                periods (np.ndarray): Периоды datetime64[M] (месяцы) или datetime64[D] (дни) по возрастанию
+                fill (str): Способ заполнения пропусков: None, ffill или interpolate
+
+            Returns:
+                np.ndarray: Курс для каждого периода
+
+        >>> series = RateSeries(["2003-01-09", "2003-01-10", "2003-03-01"], [30.0, 31.0, 33.0])
+        >>> series.resample(np.arange("2003-01", "2003-05", dtype="datetime64[M]")).tolist()
+        [30.0, nan, 33.0, nan]
+        >>> series.resample(np.arange("2003-01", "2003-05", dtype="datetime64[M]"), "interpolate").tolist()
+        [30.0, 31.5, 33.0, 33.0]
+        """
+        periods = np.asarray(periods)
+        unit = np.datetime_data(periods.dtype)[0] if periods.dtype.kind == "M" else "D"
+        periods = periods.astype(f"datetime64[{unit}]")
+        starts = periods.astype("datetime64[D]")
+        ends = (periods + 1).astype("datetime64[D]")
+        if len(self.dates) == 0:
+            return np.full(len(periods), np.nan)
+        positions = np.searchsorted(self.dates, starts, side="left")
+        inside = positions < len(self.dates)
+        positions = np.minimum(positions, len(self.dates) - 1)
+        inside &= self.dates[positions] < ends
+        return fill_gaps(np.where(inside, self.values[positions], np.nan), fill)
@@ -0,0 +1,171 @@
+import datetime
+import sqlite3
+from contextlib import closing
+from xml.etree import ElementTree
+import numpy as np
+import pandas as pd
+from currency_converter import RateTable
+
+
+def month_range(start : str, end : str):
+    """Возвращает все месяцы периода включительно
+
+        Args:
+            start (str): Первый месяц в формате yyyy-mm (или дата, начинающаяся с yyyy-mm)
+            end (str): Последний месяц в формате yyyy-mm (или дата, начинающаяся с yyyy-mm)
+
+        Returns:
+            list: Месяцы в формате yyyy-mm
+
+    >>> month_range("2003-11", "2004-02-10T00:00:00+0300")
+    ['2003-11', '2003-12', '2004-01', '2004-02']
+    """
+    first = int(start[0:4]) * 12 + int(start[5:7]) - 1
+    last = int(end[0:4]) * 12 + int(end[5:7]) - 1
+    return [f"{number // 12}-{number % 12 + 1:02d}" for number in range(first, last + 1)]
+
+
+def parse_daily(content : bytes):
+    """Получает курсы всех валют из ответа XML_daily.asp, курс приводится к одной единице валюты
+
+        Args:
+            content (bytes): XML ответа
+
+        Returns:
+            dict: Курс для каждой валюты
+
+    >>> parse_daily('<ValCurs><Valute><CharCode>KZT</CharCode><Nominal>100</Nominal><Value>20,3925</Value></Valute></ValCurs>'.encode())
+    {'KZT': 0.203925}
+    """
+    rates = {}
+    for valute in ElementTree.fromstring(content).iter("Valute"):
+        value = float(valute.findtext("Value").replace(",", "."))
+        nominal = float(valute.findtext("Nominal").replace(",", "."))
+        rates[valute.findtext("CharCode")] = value / nominal
+    return rates
+
+
+class RateStore:
+    """Класс хранилища курсов валют в SQLite с ключом (месяц, валюта).
+    Отдельно хранятся уже загруженные месяцы, поэтому при обновлении загружаются только недостающие,
+    а повторный запрос того же периода не обращается к сети
+
+    Attributes:
+        path (str): Путь к файлу базы
+        day (str): День месяца, на который берется курс
+    """
+    def __init__(self, path : str = "rates.sqlite", day : str = "02"):
+        """Инициализирует объект RateStore и создает таблицы, если их нет
+
+            Args:
+                path (str): Путь к файлу базы
+                day (str): День месяца, на который берется курс
+        """
+        self.path = path
+        self.day = day
+        with closing(self.connect()) as connection, connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS rates (month TEXT NOT NULL, currency TEXT NOT NULL, "
+                               "rate REAL NOT NULL, PRIMARY KEY (month, currency)) WITHOUT ROWID")
+            connection.execute("CREATE TABLE IF NOT EXISTS months (month TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def connect(self):
+        """Открывает соединение с базой
+
+            Returns:
+                sqlite3.Connection: Соединение
+        """
+        return sqlite3.connect(self.path)
+
+    def get_missing(self, start : str, end : str):
+        """Находит месяцы периода, курсы за которые еще не загружены
+
+            Args:
+                start (str): Первый месяц периода
+                end (str): Последний месяц периода
+
+            Returns:
+                list: Недостающие месяцы в формате yyyy-mm
+        """
+        months = month_range(start, end)
+        with closing(self.connect()) as connection, connection:
+            loaded = {row[0] for row in connection.execute("SELECT month FROM months WHERE month BETWEEN ? AND ?",
+                                                           (months[0], months[-1]))} if len(months) != 0 else set()
+        return [month for month in months if month not in loaded]
+
+    def refresh(self, start : str, end : str, fetcher, today : datetime.date = None):
+        """Загружает курсы только за недостающие месяцы периода, месяцы загружаются параллельно.
+        Месяц, который не удалось загрузить или разобрать, не отмечается загруженным и запрашивается в следующий раз,
+        курсы остальных месяцев сохраняются. Месяц, день курса которого еще не наступил, тоже не отмечается
+        загруженным: на будущие даты ЦБ отвечает последними курсами
+
+            Args:
+                start (str): Первый месяц периода
+                end (str): Последний месяц периода
+                fetcher (CbrFetcher): Загрузчик курсов ЦБ
+                today (datetime.date): Сегодняшняя дата, по умолчанию текущая
+
+            Returns:
+                list: Загруженные месяцы
+        """
+        missing = self.get_missing(start, end)
+        if len(missing) == 0:
+            return []
+        today = today if today is not None else datetime.date.today()
+        responses = fetcher.get_daily([f"{self.day}/{month[5:7]}/{month[0:4]}" for month in missing],
+                                      return_exceptions=True)
+        loaded = []
+        rows = []
+        for month, content in zip(missing, responses):
+            if isinstance(content, Exception):
+                continue
+            try:
+                rates = parse_daily(content)
+            except (ElementTree.ParseError, AttributeError, ValueError):
+                continue
+            rows += [(month, currency, rate) for currency, rate in rates.items()]
+            if f"{month}-{self.day}" < today.isoformat():
+                loaded.append(month)
+        with closing(self.connect()) as connection, connection:
+            connection.executemany("INSERT OR REPLACE INTO rates (month, currency, rate) VALUES (?, ?, ?)", rows)
+            connection.executemany("INSERT OR IGNORE INTO months (month) VALUES (?)", [(month,) for month in loaded])
+        return loaded
+
+    def to_dataframe(self, start : str, end : str, currencies : list):
+        """Возвращает курсы за период в виде таблицы currencies.csv: столбец date и столбец для каждой валюты
+
+            Args:
+                start (str): Первый месяц периода
+                end (str): Последний месяц периода
+                currencies (list): Валюты
+
+            Returns:
+                pd.DataFrame: Курсы валют по месяцам, пустые значения для неизвестных курсов
+        """
+        months = month_range(start, end)
+        rates = np.full((len(months), len(currencies)), np.nan)
+        rows_by_month = {month: number for number, month in enumerate(months)}
+        columns = {currency: number for number, currency in enumerate(currencies)}
+        if len(months) != 0 and len(currencies) != 0:
+            with closing(self.connect()) as connection, connection:
+                query = ("SELECT month, currency, rate FROM rates WHERE month BETWEEN ? AND ? AND currency IN (" +
+                         ",".join("?" * len(currencies)) + ")")
+                for month, currency, rate in connection.execute(query, [months[0], months[-1]] + list(currencies)):
+                    rates[rows_by_month[month], columns[currency]] = rate
+        if "RUR" in columns:
+            rates[:, columns["RUR"]] = 1
+        dataframe = pd.DataFrame(rates, columns=list(currencies))
+        dataframe.insert(0, "date", months)
+        return dataframe
+
+    def to_table(self, start : str, end : str, currencies : list):
+        """Возвращает курсы за период в виде таблицы курсов для перевода зарплат
+
+            Args:
+                start (str): Первый месяц периода
+                end (str): Последний месяц периода
+                currencies (list): Валюты
+
+            Returns:
+                RateTable: Таблица курсов
+        """
+        return RateTable.from_dataframe(self.to_dataframe(start, end, currencies))
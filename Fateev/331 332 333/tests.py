@@ -0,0 +1,224 @@
+from unittest import TestCase
+import concurrent.futures
+import datetime
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import requests
+from cbr_fetcher import CbrFetcher
+from chuncker import CsvPartitioner, сsv_chuncker
+from cbr_stub import StubServer
+from currency_converter import RateTable, convert_salaries, init_worker, get_worker_table
+from currency_scan import scan_file, split_ranges
+from rate_series import RateSeries, fill_gaps
+from rate_store import RateStore
+
+
+def get_worker_rates(months, currencies):
+    return get_worker_table().get_rates(months, currencies).tolist()
+
+
+class CbrFetcherTests(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+
+    def start_server(self, fail_every=0):
+        server = StubServer(fail_every=fail_every).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def test_fetcher_retries(self):
+        server = self.start_server(2)
+        dates = [f"01/{month:02d}/2003" for month in range(1, 7)]
+        with CbrFetcher(None, server.base_url, max_workers=1, backoff=0.001) as fetcher:
+            responses = fetcher.get_daily(dates)
+        self.assertEqual(len(responses), 6)
+        self.assertTrue(all(b"<CharCode>USD</CharCode>" in response for response in responses))
+        self.assertEqual(server.requests_count, 11)
+
+    def test_fetcher_backoff_gives_up(self):
+        server = self.start_server(1)
+        start = time.time()
+        with CbrFetcher(None, server.base_url, retries=2, backoff=0.05) as fetcher:
+            with self.assertRaises(requests.HTTPError):
+                fetcher.get_daily(["01/01/2003"])
+        self.assertGreaterEqual(time.time() - start, 0.15)
+        self.assertEqual(server.requests_count, 3)
+
+    def test_fetcher_cache_hit(self):
+        server = self.start_server()
+        with CbrFetcher(self.folder, server.base_url) as fetcher:
+            first = fetcher.get_dynamic(["R01235", "R01239"], "01/01/2003", "31/01/2003")
+            count = server.requests_count
+            second = fetcher.get_dynamic(["R01235", "R01239"], "01/01/2003", "31/01/2003")
+        self.assertEqual(first, second)
+        self.assertEqual(server.requests_count, count)
+
+    def test_fetcher_does_not_cache_open_range(self):
+        server = self.start_server()
+        today = datetime.date.today()
+        start = (today - datetime.timedelta(days=10)).strftime("%d/%m/%Y")
+        today = today.strftime("%d/%m/%Y")
+        with CbrFetcher(self.folder, server.base_url) as fetcher:
+            fetcher.get_dynamic(["R01235"], start, today)
+            fetcher.get_dynamic(["R01235"], start, today)
+            fetcher.get_daily([today])
+            fetcher.get_daily([today])
+        self.assertEqual(server.requests_count, 4)
+
+
+class RateStoreTests(TestCase):
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder, ignore_errors=True)
+        self.store = RateStore(os.path.join(folder, "rates.sqlite"))
+
+    def test_refresh_keeps_fetched_months(self):
+        server = StubServer(fail_every=3).start()
+        self.addCleanup(server.stop)
+        with CbrFetcher(None, server.base_url, max_workers=1, retries=0) as fetcher:
+            self.assertEqual(len(self.store.refresh("2003-01", "2003-06", fetcher)), 4)
+            self.assertEqual(len(self.store.get_missing("2003-01", "2003-06")), 2)
+            self.store.refresh("2003-01", "2003-06", fetcher)
+        self.assertEqual(self.store.get_missing("2003-01", "2003-06"), [])
+        self.assertEqual(server.requests_count, 8)
+
+    def test_refresh_skips_future_months(self):
+        server = StubServer().start()
+        self.addCleanup(server.stop)
+        with CbrFetcher(None, server.base_url) as fetcher:
+            loaded = self.store.refresh("2003-01", "2003-02", fetcher, today=datetime.date(2003, 2, 1))
+        self.assertEqual(loaded, ["2003-01"])
+        self.assertEqual(self.store.get_missing("2003-01", "2003-02"), ["2003-02"])
+        self.assertEqual(self.store.to_dataframe("2003-02", "2003-02", ["USD"])["USD"].notna().tolist(), [True])
+
+
+class CsvPartitionerTests(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+
+    def read_file(self, key):
+        with open(os.path.join(self.folder, "vacancies_" + key + ".csv"), "rb") as file:
+            return file.read()
+
+    def test_partitioner_lru_append(self):
+        with CsvPartitioner(self.folder, ["name", "year"], max_open_files=1) as partitioner:
+            partitioner.write("2007", ["a", "2007"])
+            partitioner.write("2008", ["b", "2008"])
+            self.assertEqual(self.read_file("2007"), "\ufeffname,year\na,2007\n".encode("utf-8"))
+            partitioner.write("2007", ["c", "2007"])
+        self.assertEqual(self.read_file("2007"), "\ufeffname,year\na,2007\nc,2007\n".encode("utf-8"))
+        self.assertEqual(self.read_file("2008").count("\ufeff".encode("utf-8")), 1)
+        self.assertEqual(sorted(partitioner.file_names), ["2007", "2008"])
+
+    def test_chuncker_currency_without_column(self):
+        file_name = os.path.join(self.folder, "source.csv")
+        with open(file_name, "w", encoding="utf-8-sig", newline="") as file:
+            file.write("name,salary,area_name,published_at\n"
+                       "a,100,Москва,2007-12-03T17:40:09+0300\nb,200,Казань\n")
+        self.assertEqual(list(сsv_chuncker(file_name, "currency", self.folder)), ["none"])
+        self.assertEqual(self.read_file("none").decode("utf-8-sig").splitlines()[1:],
+                         ["a,100,Москва,2007-12-03T17:40:09+0300"])
+
+
+class RateTableTests(TestCase):
+    def setUp(self):
+        self.table = RateTable.from_arrays(["2003-02", "2003-01"], ["USD", "EUR"], [[31.0, 34.0], [30.0, 33.0]])
+
+    def test_rates_gather(self):
+        rates = self.table.get_rates(["2003-01-10T00:00:00+0300", "2003-02-10T00:00:00+0300",
+                                      "2003-02-11T00:00:00+0300", "2003-03-01T00:00:00+0300",
+                                      "2003-01-10T00:00:00+0300"], ["EUR", "USD", "RUR", "USD", "KZT"])
+        self.assertEqual(rates[:3].tolist(), [33.0, 31.0, 1.0])
+        self.assertTrue(np.isnan(rates[3:]).all())
+
+    def test_convert_salaries(self):
+        salaries = convert_salaries(self.table, ["2003-01-10T00:00:00+0300"] * 4 + ["2004-01-10T00:00:00+0300"],
+                                    ["USD", "EUR", "RUR", "XXX", "USD"],
+                                    np.array([100, -1, 1000, 100, 100]), np.array([300, 10, -1, 200, 200]))
+        self.assertEqual(salaries, [6000.0, 330.0, 1000, "", ""])
+        self.assertIsInstance(salaries[2], int)
+        self.assertEqual(convert_salaries(self.table, ["2003-01-10T00:00:00+0300"], ["USD"], [-1], [-1]), [""])
+
+    def test_shared_table_in_worker(self):
+        memory, description = self.table.share()
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, initializer=init_worker,
+                                                        initargs=(description,)) as executor:
+                self.assertEqual(executor.submit(get_worker_rates, ["2003-02"], ["EUR"]).result(), [34.0])
+                np.ndarray(description["shape"], dtype=np.float64, buffer=memory.buf)[1, 2] = 35.0
+                self.assertEqual(executor.submit(get_worker_rates, ["2003-02"], ["EUR"]).result(), [35.0])
+        finally:
+            memory.close()
+            memory.unlink()
+        with self.assertRaises(FileNotFoundError):
+            RateTable.attach(description)
+
+    def test_attach_close(self):
+        memory, description = self.table.share()
+        self.addCleanup(memory.unlink)
+        self.addCleanup(memory.close)
+        table = RateTable.attach(description)
+        self.assertEqual(table.get_rates(["2003-01"], ["USD"]).tolist(), [30.0])
+        table.close()
+        self.assertIsNone(table.memory)
+        self.assertIsNone(table.rates)
+
+
+class RateSeriesTests(TestCase):
+    def setUp(self):
+        self.series = RateSeries(["2003-01-06", "2003-01-02", "2003-01-03"], [32.0, 30.0, 31.0])
+
+    def test_fill_gaps(self):
+        values = np.array([np.nan, 1.0, np.nan, np.nan, 4.0, np.nan])
+        self.assertTrue(np.isnan(fill_gaps(values)[[0, 2, 3, 5]]).all())
+        self.assertEqual(fill_gaps(values, "ffill")[1:].tolist(), [1.0, 1.0, 1.0, 4.0, 4.0])
+        self.assertEqual(fill_gaps(values, "interpolate")[1:].tolist(), [1.0, 2.0, 3.0, 4.0, 4.0])
+        with self.assertRaises(ValueError):
+            fill_gaps(values, "bfill")
+
+    def test_daily_lookup(self):
+        dates = ["2003-01-01", "2003-01-02", "2003-01-04", "2003-01-06", "2003-01-10"]
+        self.assertEqual(self.series.lookup(dates)[1:].tolist(), [30.0, 31.0, 32.0, 32.0])
+        self.assertTrue(np.isnan(self.series.lookup(dates)[0]))
+        self.assertAlmostEqual(self.series.lookup(["2003-01-05"], "interpolate")[0], 31 + 2 / 3)
+        self.assertTrue(np.isnan(self.series.lookup(["2003-01-04"], None)).all())
+
+    def test_resample_days(self):
+        days = np.arange("2003-01-01", "2003-01-08", dtype="datetime64[D]")
+        self.assertEqual(self.series.resample(days, "ffill")[1:].tolist(), [30.0, 31.0, 31.0, 31.0, 32.0, 32.0])
+        self.assertTrue(np.isnan(self.series.resample(days)[[0, 3, 4]]).all())
+        self.assertEqual(self.series.resample(np.array(["2003-01"], dtype="datetime64[M]")).tolist(), [30.0])
+
+
+class CurrencyScanTests(TestCase):
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder, ignore_errors=True)
+        self.file_name = os.path.join(folder, "vacancies.csv")
+        rows = ['"a\nb",USD,2005-03-01T00:00:00+0300\n', "c,,2003-01-02T00:00:00+0300\n",
+                "d,RUR,2007-12-03T00:00:00+0300\n"] * 20
+        with open(self.file_name, "w", encoding="utf-8-sig", newline="") as file:
+            file.write("name,salary_currency,published_at\n" + "".join(rows))
+        with open(self.file_name, "rb") as file:
+            self.data = file.read()
+
+    def test_ranges_end_on_rows(self):
+        start = self.data.index(b"\n") + 1
+        ranges = split_ranges(self.file_name, start, 7)
+        self.assertEqual((ranges[0][0], ranges[-1][1]), (start, len(self.data)))
+        self.assertTrue(all(first[1] == second[0] for first, second in zip(ranges, ranges[1:])))
+        self.assertTrue(all(self.data[end - 1:end] == b"\n" and self.data[end:end + 2] != b'b"' for _, end in ranges))
+        self.assertEqual(split_ranges(self.file_name, len(self.data), 3), [])
+
+    def test_parallel_scan_same_as_single(self):
+        single = scan_file(self.file_name, chunk_size=7)
+        parallel = scan_file(self.file_name, workers=3, chunk_size=7)
+        self.assertEqual((single.min_date, single.max_date), ("2003-01-02T00:00:00+0300", "2007-12-03T00:00:00+0300"))
+        self.assertEqual(single.counts, {"USD": 20, "": 20, "RUR": 20})
+        self.assertEqual((parallel.min_date, parallel.max_date, parallel.counts),
+                         (single.min_date, single.max_date, single.counts))